@@ -0,0 +1,374 @@
+"""
+Headless arena: matches and tournaments between any players.
+
+A player is any object with a ``name``, a ``new_game()`` method called
+before each game and a ``move(state)`` method returning the move to play
+in a :class:`game_logic.GameState` (it is only asked when it has one).
+:class:`RandomPlayer`, :class:`GreedyPlayer`, :class:`LinearPlayer`
+(linear weights, or an evaluator from :mod:`ntuple` / :mod:`mlp`),
+:class:`SearchPlayer` (fixed-depth alpha-beta) and :class:`MCTSPlayer`
+cover the engines of the project; :func:`load_player` builds one from a
+short text spec such as ``"weights.json@3"``.
+
+Games are played in colour-swapped pairs: both games of a pair start
+from the same random opening of :data:`OPENING_PLIES` plies and seed
+the players' randomness identically, with each player taking black
+once. Pair ``k`` of every pairing uses seed ``seed + k``, so results
+only depend on the players and the seed, also when the pairs are
+spread over worker processes.
+
+:func:`match` compares two players: score, Elo difference with a 95%
+confidence interval and the likelihood of superiority, enough to gate
+a weight update. :func:`round_robin` and :func:`gauntlet` run
+tournaments and rate everybody at once with :func:`elo_ratings`, a
+BayesElo-style Bradley-Terry fit with a prior of virtual draws.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import bitboard
+import game_logic
+import mcts
+import rl_agent
+import search
+from transposition import TranspositionCache
+
+# Random plies played before the players take over, for varied games
+OPENING_PLIES: int = 4
+# Virtual draws added to every pairing by elo_ratings (as BayesElo's prior)
+PRIOR_DRAWS: float = 2.0
+# Two-sided 95% normal quantile
+Z95: float = 1.959963984540054
+# Elo points per natural-log unit of strength ratio
+ELO_SCALE: float = 400.0 / math.log(10.0)
+
+# (wins, draws, losses) of one player against another
+Record = Tuple[int, int, int]
+
+
+class Player:
+    """Base class of arena players; subclasses implement :meth:`move`."""
+
+    name = "player"
+
+    def new_game(self) -> None:
+        """Reset any per-game state (called after the game's seeding)."""
+
+    def move(self, state: game_logic.GameState) -> Tuple[int, int]:
+        raise NotImplementedError
+
+
+class RandomPlayer(Player):
+    """Uniformly random moves."""
+
+    name = "random"
+
+    def move(self, state: game_logic.GameState) -> Tuple[int, int]:
+        return random.choice(state.moves())[0]
+
+
+class GreedyPlayer(Player):
+    """The move that flips most discs (see :func:`rl_agent.greedy_opponent_move`)."""
+
+    name = "greedy"
+
+    def move(self, state: game_logic.GameState) -> Tuple[int, int]:
+        return rl_agent.greedy_opponent_move(state.board, state.player, state.moves())
+
+
+class LinearPlayer(Player):
+    """One-ply agent of :func:`rl_agent.choose_action`.
+
+    ``weights`` are linear weights or an evaluator object; with
+    ``epsilon`` > 0 that share of the moves is random.
+    """
+
+    def __init__(self, weights, name: str = "linear", epsilon: float = 0.0) -> None:
+        self.weights = weights
+        self.name = name
+        self.epsilon = epsilon
+
+    def move(self, state: game_logic.GameState) -> Tuple[int, int]:
+        move, _ = rl_agent.choose_action(state.board, state.player, self.weights, self.epsilon, state.moves())
+        return move
+
+
+class SearchPlayer(Player):
+    """Fixed-depth alpha-beta search (:class:`search.AlphaBetaSearch`).
+
+    A fixed depth, unlike a time budget, gives the same moves on any
+    machine. The transposition table lives for one game.
+    """
+
+    def __init__(self, weights, depth: int, name: Optional[str] = None, tt_size: int = 100_000) -> None:
+        self.weights = weights
+        self.depth = depth
+        self.name = name or f"search{depth}"
+        self.tt_size = tt_size
+        self.searcher: Optional[search.AlphaBetaSearch] = None
+
+    def new_game(self) -> None:
+        self.searcher = search.AlphaBetaSearch(self.weights, TranspositionCache(self.tt_size))
+
+    def move(self, state: game_logic.GameState) -> Tuple[int, int]:
+        scored = self.searcher.search_root(*state.key(), self.depth)
+        return bitboard.coords(scored[0][0])
+
+
+class MCTSPlayer(Player):
+    """:class:`mcts.MCTS` with ``playouts`` playouts per move, seeded per game."""
+
+    def __init__(self, playouts: int = 200, rollout: str = "random", weights=None,
+                 name: Optional[str] = None) -> None:
+        self.playouts = playouts
+        self.rollout = rollout
+        self.weights = weights
+        self.name = name or f"mcts{playouts}"
+        self.engine: Optional[mcts.MCTS] = None
+
+    def new_game(self) -> None:
+        self.engine = mcts.MCTS(self.rollout, self.weights, seed=random.getrandbits(32))
+
+    def move(self, state: game_logic.GameState) -> Tuple[int, int]:
+        return bitboard.coords(self.engine.search(*state.key(), playouts=self.playouts))
+
+
+def load_player(spec: str) -> Player:
+    """Return the player described by ``spec``, which also becomes its name.
+
+    ``random``, ``greedy``, ``mcts:<playouts>``, a linear weights file
+    ``<path>.json``, or ``ntuple:<path>`` / ``mlp:<path>`` for the
+    evaluators. Weights and evaluators play one-ply moves, or search
+    ``d`` plies with a ``@d`` suffix (``weights.json@3``).
+    """
+    if spec == "random":
+        return RandomPlayer()
+    if spec == "greedy":
+        return GreedyPlayer()
+    if spec.startswith("mcts:"):
+        return MCTSPlayer(int(spec[5:]), name=spec)
+    path, _, depth = spec.partition("@")
+    if path.startswith("ntuple:"):
+        import ntuple
+        weights = ntuple.NTupleEvaluator.load(path[7:])
+    elif path.startswith("mlp:"):
+        import mlp
+        weights = mlp.MLPEvaluator.load(path[4:])
+    else:
+        weights = rl_agent.load_weights(path)
+    if depth:
+        return SearchPlayer(weights, int(depth), name=spec)
+    return LinearPlayer(weights, name=spec)
+
+
+def play_game(black: Player, white: Player, seed: int, opening_plies: int = OPENING_PLIES) -> int:
+    """Play one game from the opening of ``seed``; return black's final disc difference.
+
+    The global :mod:`random` module, which the players draw from, is
+    seeded with ``seed`` before the game. With ``opening_plies=0``,
+    ``LinearPlayer`` against ``RandomPlayer`` replays the games of
+    :func:`rl_agent.evaluate_against_random`.
+    """
+    state = game_logic.GameState()
+    opening = random.Random(seed)
+    for _ in range(opening_plies):
+        if state.is_terminal():
+            break
+        state.play_random(opening)
+    random.seed(seed)
+    black.new_game()
+    white.new_game()
+    while not state.is_terminal():
+        if not state.moves():
+            state.pass_turn()
+            continue
+        player = black if state.player == game_logic.BLACK else white
+        state.play(player.move(state))
+    black_count, white_count = game_logic.count_pieces(state.board)
+    return black_count - white_count
+
+
+def _play_pairs(players: Sequence[Player], jobs: Sequence[Tuple[int, int, int]],
+                opening_plies: int) -> List[Tuple[int, int, int, int]]:
+    # Joga os pares de jogos (i, j, semente): i de pretas e depois j de pretas.
+    # Devolve (i, j, diferença de i no 1º jogo, diferença de i no 2º jogo).
+    results = []
+    for i, j, seed in jobs:
+        first = play_game(players[i], players[j], seed, opening_plies)
+        second = -play_game(players[j], players[i], seed, opening_plies)
+        results.append((i, j, first, second))
+    return results
+
+
+def play_pairings(players: Sequence[Player], pairings: Sequence[Tuple[int, int]], pairs: int,
+                  seed: int = 0, workers: int = 1,
+                  opening_plies: int = OPENING_PLIES) -> Dict[Tuple[int, int], Record]:
+    """Play ``pairs`` colour-swapped game pairs for every ``(i, j)`` of ``pairings``.
+
+    Returns ``{(i, j): (wins, draws, losses)}`` of player ``i`` against
+    ``j``. With ``workers > 1`` the pairs are spread over processes
+    (the players are pickled to them); the result does not change.
+    """
+    jobs = [(i, j, seed + k) for i, j in pairings for k in range(pairs)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_pairs, players, jobs[start:stop], opening_plies)
+                       for start, stop in rl_agent.shard_ranges(len(jobs), workers)]
+            results = [r for f in futures for r in f.result()]
+    else:
+        results = _play_pairs(players, jobs, opening_plies)
+    table = {pairing: [0, 0, 0] for pairing in pairings}
+    for i, j, *diffs in results:
+        for diff in diffs:
+            table[i, j][0 if diff > 0 else 1 if diff == 0 else 2] += 1
+    return {pairing: tuple(record) for pairing, record in table.items()}
+
+
+def score_elo(record: Record) -> Tuple[float, float, float]:
+    """Return ``(score, elo, error)`` of a ``(wins, draws, losses)`` record.
+
+    ``score`` is the points share; ``elo`` the Elo difference it implies
+    and ``error`` the half-width of its 95% confidence interval, from the
+    per-game variance of the results (infinite for a clean sweep).
+    Raises ``ValueError`` for a record without games.
+    """
+    wins, draws, losses = record
+    games = wins + draws + losses
+    if games == 0:
+        raise ValueError("no games in the record")
+    score = (wins + 0.5 * draws) / games
+    if score in (0.0, 1.0):
+        return score, math.copysign(math.inf, score - 0.5), math.inf
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = Z95 * math.sqrt(variance / games)
+
+    def elo(s: float) -> float:
+        return -400.0 * math.log10(1.0 / s - 1.0) if 0.0 < s < 1.0 else math.copysign(math.inf, s - 0.5)
+
+    return score, elo(score), (elo(score + margin) - elo(score - margin)) / 2
+
+
+def match(a: Player, b: Player, pairs: int = 100, seed: int = 0, workers: int = 1,
+          opening_plies: int = OPENING_PLIES) -> dict:
+    """Play ``a`` against ``b`` (``2 * pairs`` games); return the result for ``a``.
+
+    Besides the counts, the dict has the score, the Elo difference with
+    its 95% error and ``los``, the likelihood that ``a`` is the stronger
+    player (draws ignored).
+    """
+    record = play_pairings([a, b], [(0, 1)], pairs, seed, workers, opening_plies)[0, 1]
+    wins, draws, losses = record
+    score, elo, error = score_elo(record)
+    decisive = wins + losses
+    los = 0.5 * (1.0 + math.erf((wins - losses) / math.sqrt(2.0 * decisive))) if decisive else 0.5
+    return {"games": 2 * pairs, "wins": wins, "draws": draws, "losses": losses,
+            "score": score, "elo": elo, "elo_error": error, "los": los}
+
+
+def elo_ratings(names: Sequence[str], table: Dict[Tuple[int, int], Record],
+                prior: float = PRIOR_DRAWS, anchor: Optional[int] = None) -> List[dict]:
+    """Rate all players from the ``table`` of :func:`play_pairings`.
+
+    Fits a Bradley-Terry model (draws count half a win) by Newton's
+    method, as BayesElo does, with ``prior`` virtual draws added to every
+    pairing so that clean sweeps still get finite ratings. Ratings have
+    mean 0, or player ``anchor`` at 0; ``error`` is the half-width of the
+    95% interval from the inverse Hessian (relative to the anchor, if
+    any). Returns one dict per player, best first.
+    """
+    n = len(names)
+    games = np.zeros((n, n))
+    points = np.zeros((n, n))
+    for (i, j), (wins, draws, losses) in table.items():
+        total = wins + draws + losses + prior
+        games[i, j] += total
+        games[j, i] += total
+        points[i, j] += wins + 0.5 * (draws + prior)
+        points[j, i] += losses + 0.5 * (draws + prior)
+    ratings = np.zeros(n)
+    for _ in range(100):
+        p = 1.0 / (1.0 + np.exp(ratings[None, :] - ratings[:, None]))
+        gradient = (points - games * p).sum(axis=1)
+        weight = games * p * (1.0 - p)
+        # Negative Hessian: a graph Laplacian, singular along the all-ones vector
+        information = np.diag(weight.sum(axis=1)) - weight
+        covariance = np.linalg.pinv(information)
+        step = covariance @ gradient
+        ratings += step
+        if np.abs(step).max() < 1e-10:
+            break
+    p = 1.0 / (1.0 + np.exp(ratings[None, :] - ratings[:, None]))
+    weight = games * p * (1.0 - p)
+    covariance = np.linalg.pinv(np.diag(weight.sum(axis=1)) - weight)
+    if anchor is not None:
+        ratings = ratings - ratings[anchor]
+        variances = np.diag(covariance) + covariance[anchor, anchor] - 2 * covariance[:, anchor]
+    else:
+        variances = np.diag(covariance)
+    result = []
+    for i, name in enumerate(names):
+        played = [(record, i == a) for (a, b), record in table.items() if i in (a, b)]
+        wins = sum(r[0] if first else r[2] for r, first in played)
+        draws = sum(r[1] for r, _ in played)
+        total = sum(sum(r) for r, _ in played)
+        result.append({"name": name, "elo": float(ELO_SCALE * ratings[i]),
+                       "error": float(Z95 * ELO_SCALE * math.sqrt(max(variances[i], 0.0))),
+                       "games": total, "score": (wins + 0.5 * draws) / total if total else 0.0})
+    return sorted(result, key=lambda r: -r["elo"])
+
+
+def round_robin(players: Sequence[Player], pairs: int = 50, seed: int = 0, workers: int = 1,
+                opening_plies: int = OPENING_PLIES, anchor: Optional[int] = None) -> dict:
+    """Every player against every other; returns ``{"table": ..., "ratings": ...}``."""
+    table = play_pairings(players, list(combinations(range(len(players)), 2)), pairs, seed, workers, opening_plies)
+    return {"table": table, "ratings": elo_ratings([p.name for p in players], table, anchor=anchor)}
+
+
+def gauntlet(challenger: Player, opponents: Sequence[Player], pairs: int = 50, seed: int = 0,
+             workers: int = 1, opening_plies: int = OPENING_PLIES, anchor: Optional[int] = None) -> dict:
+    """``challenger`` (player 0) against each of ``opponents``; returns like :func:`round_robin`."""
+    players = [challenger, *opponents]
+    table = play_pairings(players, [(0, k) for k in range(1, len(players))], pairs, seed, workers, opening_plies)
+    return {"table": table, "ratings": elo_ratings([p.name for p in players], table, anchor=anchor)}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    # Uso: python3 arena.py weights.json greedy random [--gauntlet] [--pares 50] [--processos 4]
+    # Com dois jogadores mostra o resultado do primeiro contra o segundo (para aceitar pesos novos).
+    parser = argparse.ArgumentParser(description="Torneio entre jogadores de Reversi")
+    parser.add_argument("jogadores", nargs="+", help="random, greedy, mcts:N, pesos.json[@prof], ntuple:f.npz, mlp:f.npz")
+    parser.add_argument("--gauntlet", action="store_true", help="só o primeiro contra cada um dos outros")
+    parser.add_argument("--pares", type=int, default=50, help="pares de jogos (cores trocadas) por confronto")
+    parser.add_argument("--processos", type=int, default=1)
+    parser.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    players = [load_player(spec) for spec in args.jogadores]
+    start = time.perf_counter()
+    if len(players) == 2:
+        r = match(*players, pairs=args.pares, seed=args.semente, workers=args.processos)
+        print(f"{players[0].name} vs {players[1].name}: +{r['wins']} ={r['draws']} -{r['losses']}  "
+              f"score {r['score']:.3f}  Elo {r['elo']:+.1f} ± {r['elo_error']:.1f}  LOS {r['los']:.3f}")
+    else:
+        options = dict(pairs=args.pares, seed=args.semente, workers=args.processos)
+        if args.gauntlet:
+            result = gauntlet(players[0], players[1:], **options)
+        else:
+            result = round_robin(players, **options)
+        for (i, j), (w, d, l) in result["table"].items():
+            print(f"{players[i].name} vs {players[j].name}: +{w} ={d} -{l}")
+        print(f"\n{'jogador':<24}{'Elo':>8}{'± 95%':>8}{'jogos':>7}{'score':>7}")
+        for r in result["ratings"]:
+            print(f"{r['name']:<24}{r['elo']:>8.0f}{r['error']:>8.0f}{r['games']:>7}{r['score']:>7.2f}")
+    print(f"\n{time.perf_counter() - start:.1f} s")
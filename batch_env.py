@@ -0,0 +1,380 @@
+"""
+Vectorized Reversi simulator that plays many games at once with NumPy.
+
+:class:`BatchReversi` holds ``N`` games as two ``uint64`` bitboard arrays
+(one entry per game, using the bit layout of :mod:`bitboard`). Legal-move
+masks, flips, the agent's feature vectors and final rewards are computed
+for all games with whole-array shift-and-mask operations, and one call to
+:meth:`BatchReversi.step` applies a move (or a pass) in every game.
+
+:func:`evaluate_batch` uses it to evaluate the linear agent against the
+random or greedy opponent. Every game ``i`` draws from its own
+``random.Random(seed + i)`` in the same order as the serial
+:func:`rl_agent.evaluate_against_random` / :func:`rl_agent.evaluate_against_greedy`,
+and ties are broken the same way, so both paths return the same counts.
+"""
+
+from __future__ import annotations
+
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+import bitboard
+from rl_agent import shard_ranges
+
+BLACK: int = 1
+WHITE: int = -1
+
+_FULL = np.uint64(bitboard.FULL)
+_CORNERS = np.uint64(bitboard.CORNERS)
+_EDGES = np.uint64(bitboard.EDGES)
+_DIRECTIONS = tuple((np.uint64(shift), np.uint64(mask), left)
+                    for shift, mask, left in bitboard.DIRECTIONS)
+_BITS = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+# SQUARE_TABLE[t, sq] is the square sq moves to under symmetry t (see
+# bitboard.symmetries); SYMMETRY_INDEX[t] gathers a flattened board into
+# its image under t, i.e. image = board[..., SYMMETRY_INDEX[t]].
+SQUARE_TABLE = np.array(bitboard.SQUARE_MAPS, dtype=np.intp)
+SYMMETRY_INDEX = SQUARE_TABLE[list(bitboard.INVERSE)]
+
+# Standard starting position (see game_logic.create_board)
+_START_BLACK = (1 << bitboard.square(3, 4)) | (1 << bitboard.square(4, 3))
+_START_WHITE = (1 << bitboard.square(3, 3)) | (1 << bitboard.square(4, 4))
+
+if hasattr(np, "bitwise_count"):
+    def popcount(bb: np.ndarray) -> np.ndarray:
+        """Return the number of set bits of every entry of ``bb``."""
+        return np.bitwise_count(bb).astype(np.int64)
+else:  # NumPy < 2.0
+    _POP8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+    def popcount(bb: np.ndarray) -> np.ndarray:
+        """Return the number of set bits of every entry of ``bb``."""
+        bb = np.ascontiguousarray(bb, dtype=np.uint64)
+        return _POP8[bb.view(np.uint8)].reshape(bb.shape + (8,)).sum(axis=-1)
+
+
+def get_moves(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`bitboard.get_moves` over arrays of bitboards."""
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for shift, mask, left in _DIRECTIONS:
+        m = opp & mask
+        if left:
+            x = (own << shift) & m
+            for _ in range(5):
+                x |= (x << shift) & m
+            moves |= (x << shift) & mask
+        else:
+            x = (own >> shift) & m
+            for _ in range(5):
+                x |= (x >> shift) & m
+            moves |= (x >> shift) & mask
+    return moves & empty
+
+
+def get_flips(own: np.ndarray, opp: np.ndarray, move: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`bitboard.get_flips`; ``move`` holds single-bit masks.
+
+    Entries whose ``move`` is 0 (a pass) get no flips.
+    """
+    flips = np.zeros_like(own)
+    for shift, mask, left in _DIRECTIONS:
+        m = opp & mask
+        if left:
+            x = (move << shift) & m
+            for _ in range(5):
+                x |= (x << shift) & m
+            bounded = (x << shift) & mask & own
+        else:
+            x = (move >> shift) & m
+            for _ in range(5):
+                x |= (x >> shift) & m
+            bounded = (x >> shift) & mask & own
+        flips |= np.where(bounded != 0, x, np.uint64(0))
+    return flips
+
+
+def square_bits(bb: np.ndarray) -> np.ndarray:
+    """Return the ``(N, 64)`` 0/1 ``uint8`` matrix of the squares set in ``bb``."""
+    as_bytes = np.ascontiguousarray(bb, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little")
+
+
+def expand_moves(legal: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(game, square)`` index arrays for every set bit of ``legal``.
+
+    Entries are ordered by game and, within a game, by ascending square
+    (row-major order), like :func:`game_logic.get_valid_moves`.
+    """
+    games, squares = np.nonzero((legal[:, None] & _BITS) != 0)
+    return games, squares
+
+
+def features(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Return the ``(N, 4)`` feature matrix of :func:`rl_agent.compute_features`.
+
+    Features are computed for the side owning ``own``.
+    """
+    piece_diff = popcount(own) - popcount(opp)
+    mobility_diff = popcount(get_moves(own, opp)) - popcount(get_moves(opp, own))
+    corner_diff = popcount(own & _CORNERS) - popcount(opp & _CORNERS)
+    edge_diff = popcount(own & _EDGES) - popcount(opp & _EDGES)
+    return np.stack([piece_diff / 64.0,
+                     mobility_diff / 8.0,
+                     corner_diff / 4.0,
+                     edge_diff / 24.0], axis=1)
+
+
+def linear_scores(feats: np.ndarray, weights: Sequence[float]) -> np.ndarray:
+    """Return ``weights · features`` for every row of ``feats``.
+
+    The terms are accumulated left to right like the ``sum`` in
+    :func:`rl_agent.evaluate_move`, so scores are bit-identical.
+    """
+    scores = np.zeros(len(feats))
+    for i, w in enumerate(weights):
+        scores = scores + w * feats[:, i]
+    return scores
+
+
+def first_argmax(games: np.ndarray, values: np.ndarray, num_games: int) -> np.ndarray:
+    """Return, per game, the index into ``values`` of its first maximum.
+
+    ``games`` must be sorted; games with no entry get -1.
+    """
+    best = np.full(num_games, -1, dtype=np.int64)
+    if len(values) == 0:
+        return best
+    seg_max = np.full(num_games, -np.inf)
+    np.maximum.at(seg_max, games, values)
+    is_max = np.flatnonzero(values == seg_max[games])
+    uniq, first = np.unique(games[is_max], return_index=True)
+    best[uniq] = is_max[first]
+    return best
+
+
+def transform_boards(boards: np.ndarray, t: int) -> np.ndarray:
+    """Return the image of every board under symmetry ``t``.
+
+    ``boards`` has shape ``(..., 8, 8)`` or ``(..., 64)`` (any per-square
+    values: discs, features, move probabilities); the shape is kept.
+    """
+    flat = boards.reshape(boards.shape[:-2] + (64,)) if boards.shape[-2:] == (8, 8) else boards
+    return flat[..., SYMMETRY_INDEX[t]].reshape(boards.shape)
+
+
+def augment_boards(boards: np.ndarray) -> np.ndarray:
+    """Return the 8 symmetric images of ``N`` boards as an ``(8 * N, ...)`` array.
+
+    Rows ``t * N`` to ``(t + 1) * N - 1`` hold the images under symmetry
+    ``t``, so targets can be repeated with ``np.tile(targets, 8)`` and
+    move labels mapped with ``SQUARE_TABLE[t]``.
+    """
+    return np.concatenate([transform_boards(boards, t) for t in range(bitboard.SYMMETRIES)])
+
+
+def symmetries(bb: np.ndarray) -> np.ndarray:
+    """Vectorized :func:`bitboard.symmetries`: an ``(8, N)`` array of images."""
+    t = np.uint64(0x0F0F0F0F00000000) & (bb ^ (bb << np.uint64(28)))
+    transposed = bb ^ t ^ (t >> np.uint64(28))
+    t = np.uint64(0x3333000033330000) & (transposed ^ (transposed << np.uint64(14)))
+    transposed = transposed ^ t ^ (t >> np.uint64(14))
+    t = np.uint64(0x5500550055005500) & (transposed ^ (transposed << np.uint64(7)))
+    transposed = transposed ^ t ^ (t >> np.uint64(7))
+    images = []
+    for base in (bb, transposed):
+        m = base
+        for shift, mask in ((1, 0x5555555555555555), (2, 0x3333333333333333), (4, 0x0F0F0F0F0F0F0F0F)):
+            shift, mask = np.uint64(shift), np.uint64(mask)
+            m = ((m >> shift) & mask) | ((m & mask) << shift)
+        # Byte k of a bitboard is row k, so reversing the bytes flips the rows
+        images += (base, m, base.byteswap(), m.byteswap())
+    return np.stack(images)
+
+
+def canonical(own: np.ndarray, opp: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized :func:`bitboard.canonical`: canonical ``own``, ``opp`` and transform arrays."""
+    own_images = symmetries(own)
+    opp_images = symmetries(opp)
+    # Smallest own image, ties broken by the smallest opp image, then by t
+    candidates = own_images == own_images.min(axis=0)
+    t = np.argmin(np.where(candidates, opp_images, _FULL), axis=0)
+    columns = np.arange(own_images.shape[1])
+    return own_images[t, columns], opp_images[t, columns], t
+
+
+class BatchReversi:
+    """``N`` independent Reversi games advanced in lockstep.
+
+    ``black`` and ``white`` are ``uint64`` bitboard arrays, ``player`` the
+    side to move in each game and ``passes`` its consecutive-pass count.
+    A game is over when its board is full or both sides passed in a row;
+    finished games ignore further moves.
+    """
+
+    def __init__(self, num_games: int) -> None:
+        self.num_games = num_games
+        self.black = np.full(num_games, _START_BLACK, dtype=np.uint64)
+        self.white = np.full(num_games, _START_WHITE, dtype=np.uint64)
+        self.player = np.full(num_games, BLACK, dtype=np.int8)
+        self.passes = np.zeros(num_games, dtype=np.int8)
+
+    def own_opp(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the bitboards of the side to move and of its opponent."""
+        black_to_move = self.player == BLACK
+        own = np.where(black_to_move, self.black, self.white)
+        opp = np.where(black_to_move, self.white, self.black)
+        return own, opp
+
+    def done(self) -> np.ndarray:
+        """Return a boolean array marking finished games."""
+        return ((self.black | self.white) == _FULL) | (self.passes >= 2)
+
+    def legal_moves(self) -> np.ndarray:
+        """Return the legal-move mask of the side to move in every game."""
+        own, opp = self.own_opp()
+        return get_moves(own, opp)
+
+    def step(self, squares: np.ndarray) -> None:
+        """Apply one move per game; ``-1`` means pass.
+
+        Moves must be legal; games that are already over are left as is.
+        """
+        squares = np.asarray(squares, dtype=np.int64)
+        live = ~self.done()
+        playing = live & (squares >= 0)
+        move = np.where(playing, _BITS[np.clip(squares, 0, 63)], np.uint64(0))
+        own, opp = self.own_opp()
+        flips = get_flips(own, opp, move)
+        own = own | move | flips
+        opp = opp & ~flips
+        black_to_move = self.player == BLACK
+        self.black = np.where(black_to_move, own, opp)
+        self.white = np.where(black_to_move, opp, own)
+        self.passes = np.where(playing, 0, np.where(live, self.passes + 1, self.passes)).astype(np.int8)
+        self.player = np.where(live, -self.player, self.player).astype(np.int8)
+
+    def rewards(self) -> np.ndarray:
+        """Return +1/-1/0 per game from black's point of view."""
+        return np.sign(popcount(self.black) - popcount(self.white)).astype(np.float64)
+
+
+def _agent_moves(env: BatchReversi, games: np.ndarray, squares: np.ndarray,
+                 turn: np.ndarray, weights: Sequence[float], epsilon: float,
+                 rngs: List[random.Random], out: np.ndarray) -> None:
+    """Pick the agent's move in every game of ``turn`` (like choose_action).
+
+    ``weights`` are linear weights or an evaluator with ``score_positions``.
+    """
+    sel = turn[games]
+    g, sq = games[sel], squares[sel]
+    own, opp = env.own_opp()
+    own, opp = own[g], opp[g]
+    move = _BITS[sq]
+    flips = get_flips(own, opp, move)
+    if hasattr(weights, "score_positions"):
+        # Evaluator object (ntuple, mlp): all games' candidate moves in one call
+        scores = weights.score_positions(own | move | flips, opp & ~flips)
+    else:
+        scores = linear_scores(features(own | move | flips, opp & ~flips), weights)
+    best = first_argmax(g, scores, env.num_games)
+    starts = np.searchsorted(g, np.arange(env.num_games))
+    counts = np.bincount(g, minlength=env.num_games)
+    for i in np.flatnonzero(turn):
+        rng = rngs[i]
+        if rng.random() < epsilon:
+            out[i] = sq[starts[i] + rng.choice(range(counts[i]))]
+        else:
+            out[i] = sq[best[i]]
+
+
+def _opponent_moves(env: BatchReversi, games: np.ndarray, squares: np.ndarray,
+                    turn: np.ndarray, opponent: str, rngs: List[random.Random],
+                    out: np.ndarray) -> None:
+    """Pick the random or greedy opponent's move in every game of ``turn``."""
+    sel = turn[games]
+    g, sq = games[sel], squares[sel]
+    if opponent == "random":
+        starts = np.searchsorted(g, np.arange(env.num_games))
+        counts = np.bincount(g, minlength=env.num_games)
+        for i in np.flatnonzero(turn):
+            out[i] = sq[starts[i] + rngs[i].choice(range(counts[i]))]
+    elif opponent == "greedy":
+        # Same ranking as rl_agent.greedy_opponent_move: most flips, first in row-major order
+        own, opp = env.own_opp()
+        flips = get_flips(own[g], opp[g], _BITS[sq])
+        best = first_argmax(g, popcount(flips).astype(np.float64), env.num_games)
+        out[turn] = sq[best[turn]]
+    else:
+        raise ValueError(f"Unknown opponent {opponent!r}")
+
+
+def play_batch(weights: Sequence[float], num_games: int, opponent: str = "random",
+               epsilon: float = 0.0, seed: int = 0) -> np.ndarray:
+    """Play ``num_games`` agent-vs-opponent games at once; return black's rewards.
+
+    The agent plays black with ``weights`` and ``epsilon`` exploration;
+    ``opponent`` is ``"random"`` or ``"greedy"``. Game ``i`` uses
+    ``random.Random(seed + i)``.
+    """
+    env = BatchReversi(num_games)
+    rngs = [random.Random(seed + i) for i in range(num_games)]
+    while True:
+        live = ~env.done()
+        if not live.any():
+            break
+        legal = np.where(live, env.legal_moves(), np.uint64(0))
+        games, squares = expand_moves(legal)
+        movers = legal != 0
+        out = np.full(num_games, -1, dtype=np.int64)
+        _agent_moves(env, games, squares, movers & (env.player == BLACK),
+                     weights, epsilon, rngs, out)
+        _opponent_moves(env, games, squares, movers & (env.player == WHITE),
+                        opponent, rngs, out)
+        env.step(out)
+    return env.rewards()
+
+
+def evaluate_batch(weights: Sequence[float], num_games: int = 2000, opponent: str = "random",
+                   epsilon: float = 0.0, seed: int = 0, workers: int = 1) -> dict:
+    """Batched counterpart of ``evaluate_against_random`` / ``evaluate_against_greedy``.
+
+    Returns the same ``games``/``wins``/``losses``/``draws``/``win_rate``
+    dictionary, with the same counts for the same ``seed``. With
+    ``workers > 1`` the game indices are split into contiguous shards,
+    each simulated as its own batch in a separate process.
+    """
+    if workers > 1 and num_games > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(play_batch, weights, stop - start, opponent, epsilon, seed + start)
+                       for start, stop in shard_ranges(num_games, workers)]
+            rewards = np.concatenate([f.result() for f in futures])
+    else:
+        rewards = play_batch(weights, num_games, opponent, epsilon, seed)
+    wins = int((rewards > 0).sum())
+    losses = int((rewards < 0).sum())
+    draws = num_games - wins - losses
+    return {
+        "games": num_games,
+        "wins": wins,
+        "losses": losses,
+        "draws": draws,
+        "win_rate": wins / num_games
+    }
+
+
+def evaluate_against_random_batch(weights, num_games: int = 2000, epsilon: float = 0.0, seed: int = 0,
+                                  workers: int = 1) -> dict:
+    """Batched :func:`rl_agent.evaluate_against_random`."""
+    return evaluate_batch(weights, num_games, "random", epsilon, seed, workers)
+
+
+def evaluate_against_greedy_batch(weights, num_games: int = 2000, epsilon: float = 0.0, seed: int = 0,
+                                  workers: int = 1) -> dict:
+    """Batched :func:`rl_agent.evaluate_against_greedy`."""
+    return evaluate_batch(weights, num_games, "greedy", epsilon, seed, workers)
@@ -0,0 +1,332 @@
+"""
+Bitboard backend for the Reversi rules.
+
+Each side is stored as a 64-bit Python integer where bit ``x * 8 + y``
+is set when that side has a disc on ``board[x][y]`` (``x`` is the row
+and ``y`` the column, as in :mod:`game_logic`). Move generation and
+flip computation work on whole bitboards at once with shift-and-mask
+fills, so a position is analysed in a fixed number of integer
+operations instead of walking every direction from every square.
+
+The functions here are stateless and operate on ``(own, opp)`` pairs:
+``own`` is the bitboard of the side to move and ``opp`` the bitboard of
+its opponent. :mod:`game_logic` wraps them to keep the list-of-lists
+API used by the rest of the project.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, List, Tuple
+
+# Number of board symmetries (rotations and reflections)
+SYMMETRIES: int = 8
+
+FULL: int = 0xFFFFFFFFFFFFFFFF
+# Masks that clear the column a shifted disc would wrap into
+NOT_COL_0: int = 0xFEFEFEFEFEFEFEFE  # no discs with y == 0
+NOT_COL_7: int = 0x7F7F7F7F7F7F7F7F  # no discs with y == 7
+
+CORNERS: int = (1 << 0) | (1 << 7) | (1 << 56) | (1 << 63)
+# The 24 edge squares that are not corners
+EDGES: int = (0x00000000000000FF | 0xFF00000000000000
+              | 0x0101010101010101 | 0x8080808080808080) & ~CORNERS
+
+# Directions as (shift, mask, left). A left shift moves a disc towards
+# higher bit indices; the mask removes discs that wrapped to the other
+# side of the board (and, for left shifts, bits beyond the 64th).
+# Order: N, NE, E, SE, S, SW, W, NW (same as game_logic._get_flips).
+DIRECTIONS: Tuple[Tuple[int, int, bool], ...] = (
+    (8, FULL, False),       # N  (x - 1)
+    (7, NOT_COL_0, False),  # NE (x - 1, y + 1)
+    (1, NOT_COL_0, True),   # E  (y + 1)
+    (9, NOT_COL_0, True),   # SE (x + 1, y + 1)
+    (8, FULL, True),        # S  (x + 1)
+    (7, NOT_COL_7, True),   # SW (x + 1, y - 1)
+    (1, NOT_COL_7, False),  # W  (y - 1)
+    (9, NOT_COL_7, False),  # NW (x - 1, y - 1)
+)
+
+
+def square(x: int, y: int) -> int:
+    """Return the bit index of board coordinate (x, y)."""
+    return x * 8 + y
+
+
+def coords(sq: int) -> Tuple[int, int]:
+    """Return the board coordinate (x, y) of bit index ``sq``."""
+    return sq >> 3, sq & 7
+
+
+def popcount(bb: int) -> int:
+    """Return the number of discs on bitboard ``bb``."""
+    return bb.bit_count()
+
+
+def iter_squares(bb: int) -> Iterator[int]:
+    """Yield the bit indices set in ``bb`` in ascending order.
+
+    Ascending bit order is row-major board order, which matches the
+    order of the nested ``for x`` / ``for y`` loops used elsewhere.
+    """
+    while bb:
+        low = bb & -bb
+        yield low.bit_length() - 1
+        bb ^= low
+
+
+def from_board(board: List[List[int]], black: int = 1, white: int = -1) -> Tuple[int, int]:
+    """Return the ``(black, white)`` bitboards of a list-of-lists board."""
+    black_bb = 0
+    white_bb = 0
+    bit = 1
+    for row in board:
+        for cell in row:
+            if cell == black:
+                black_bb |= bit
+            elif cell == white:
+                white_bb |= bit
+            bit <<= 1
+    return black_bb, white_bb
+
+
+def to_board(black_bb: int, white_bb: int, black: int = 1, white: int = -1, empty: int = 0) -> List[List[int]]:
+    """Return a list-of-lists board built from ``(black, white)`` bitboards."""
+    board = [[empty] * 8 for _ in range(8)]
+    for sq in iter_squares(black_bb):
+        board[sq >> 3][sq & 7] = black
+    for sq in iter_squares(white_bb):
+        board[sq >> 3][sq & 7] = white
+    return board
+
+
+def get_moves(own: int, opp: int) -> int:
+    """Return a bitboard of the legal moves for the side owning ``own``.
+
+    For every direction the opponent discs adjacent to ``own`` are
+    filled outwards (at most six steps, the longest possible capture)
+    and the empty square right after each run is a legal move.
+    """
+    empty = ~(own | opp) & FULL
+    moves = 0
+    for shift, mask, left in DIRECTIONS:
+        m = opp & mask
+        if left:
+            x = (own << shift) & m
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            moves |= (x << shift) & mask
+        else:
+            x = (own >> shift) & m
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            moves |= (x >> shift) & mask
+    return moves & empty
+
+
+def get_flips(own: int, opp: int, sq: int) -> int:
+    """Return the bitboard of opponent discs flipped by playing ``sq``.
+
+    The result is 0 when ``sq`` is occupied or captures nothing. In each
+    direction the run of opponent discs starting next to ``sq`` is
+    filled, and it is kept only if the square after it holds an ``own``
+    disc.
+    """
+    move = 1 << sq
+    if (own | opp) & move:
+        return 0
+    flips = 0
+    for shift, mask, left in DIRECTIONS:
+        m = opp & mask
+        if left:
+            x = (move << shift) & m
+            if not x:
+                continue
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            x |= (x << shift) & m
+            if (x << shift) & mask & own:
+                flips |= x
+        else:
+            x = (move >> shift) & m
+            if not x:
+                continue
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            x |= (x >> shift) & m
+            if (x >> shift) & mask & own:
+                flips |= x
+    return flips
+
+
+def iter_moves(own: int, opp: int) -> Iterator[Tuple[int, int]]:
+    """Yield ``(square, flips)`` for every legal move, in ascending order.
+
+    Flip masks are only computed for the squares of the legal-move mask,
+    which is already restricted to empty squares bordering the opponent.
+    """
+    for sq in iter_squares(get_moves(own, opp)):
+        yield sq, get_flips(own, opp, sq)
+
+
+def mirror_horizontal(bb: int) -> int:
+    """Return ``bb`` mirrored left to right: (x, y) -> (x, 7 - y)."""
+    bb = ((bb >> 1) & 0x5555555555555555) | ((bb & 0x5555555555555555) << 1)
+    bb = ((bb >> 2) & 0x3333333333333333) | ((bb & 0x3333333333333333) << 2)
+    return ((bb >> 4) & 0x0F0F0F0F0F0F0F0F) | ((bb & 0x0F0F0F0F0F0F0F0F) << 4)
+
+
+def flip_vertical(bb: int) -> int:
+    """Return ``bb`` flipped top to bottom: (x, y) -> (7 - x, y)."""
+    return int.from_bytes(bb.to_bytes(8, "little"), "big")
+
+
+def transpose(bb: int) -> int:
+    """Return ``bb`` reflected in the main diagonal: (x, y) -> (y, x)."""
+    t = 0x0F0F0F0F00000000 & (bb ^ (bb << 28))
+    bb ^= t ^ (t >> 28)
+    t = 0x3333000033330000 & (bb ^ (bb << 14))
+    bb ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (bb ^ (bb << 7))
+    return bb ^ t ^ (t >> 7)
+
+
+def symmetries(bb: int) -> List[int]:
+    """Return the 8 symmetric images of ``bb``, indexed by transform.
+
+    Transform ``t`` transposes the board if ``t & 4``, then flips it
+    vertically if ``t & 2`` and mirrors it horizontally if ``t & 1``;
+    ``t == 0`` is the identity. The transforms are inlined here since
+    :func:`canonical` calls this on every lookup.
+    """
+    t = 0x0F0F0F0F00000000 & (bb ^ (bb << 28))
+    transposed = bb ^ t ^ (t >> 28)
+    t = 0x3333000033330000 & (transposed ^ (transposed << 14))
+    transposed ^= t ^ (t >> 14)
+    t = 0x5500550055005500 & (transposed ^ (transposed << 7))
+    transposed ^= t ^ (t >> 7)
+    result = []
+    for base in (bb, transposed):
+        m = ((base >> 1) & 0x5555555555555555) | ((base & 0x5555555555555555) << 1)
+        m = ((m >> 2) & 0x3333333333333333) | ((m & 0x3333333333333333) << 2)
+        m = ((m >> 4) & 0x0F0F0F0F0F0F0F0F) | ((m & 0x0F0F0F0F0F0F0F0F) << 4)
+        result += (base, m, int.from_bytes(base.to_bytes(8, "little"), "big"),
+                   int.from_bytes(m.to_bytes(8, "little"), "big"))
+    return result
+
+
+def transform(bb: int, t: int) -> int:
+    """Return the image of ``bb`` under symmetry ``t`` (see :func:`symmetries`)."""
+    if t & 4:
+        bb = transpose(bb)
+    if t & 2:
+        bb = flip_vertical(bb)
+    if t & 1:
+        bb = mirror_horizontal(bb)
+    return bb
+
+
+# SQUARE_MAPS[t][sq] is the square that ``sq`` moves to under symmetry t,
+# and INVERSE[t] the symmetry that undoes t.
+SQUARE_MAPS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(transform(1 << sq, t).bit_length() - 1 for sq in range(64)) for t in range(SYMMETRIES)
+)
+INVERSE: Tuple[int, ...] = tuple(
+    next(u for u in range(SYMMETRIES) if all(SQUARE_MAPS[u][SQUARE_MAPS[t][sq]] == sq for sq in range(64)))
+    for t in range(SYMMETRIES)
+)
+
+
+def canonical(own: int, opp: int) -> Tuple[int, int, int]:
+    """Return ``(own', opp', t)``: the smallest symmetric image of the position.
+
+    All 8 symmetric positions share the same ``(own', opp')``, so it
+    can key tables that should treat them as one. ``t`` is the
+    transform that produced it; map a square of the canonical position
+    back with ``SQUARE_MAPS[INVERSE[t]]``.
+    """
+    return min(zip(symmetries(own), symmetries(opp), range(SYMMETRIES)))
+
+
+def random_square(moves: int, rng) -> int:
+    """Return a uniformly random square of the non-empty mask ``moves``.
+
+    Draws exactly like ``rng.choice(list(iter_squares(moves)))`` (same
+    random numbers, same square), without building the list.
+    """
+    for _ in range(rng.randrange(moves.bit_count())):
+        moves &= moves - 1
+    return (moves & -moves).bit_length() - 1
+
+
+def random_playout(own: int, opp: int, rng) -> int:
+    """Play uniformly random moves from ``(own, opp)`` to the end of the game.
+
+    ``own`` is the side to move. Returns the final disc difference for
+    that side. Each ply only does integer operations on the two
+    bitboards; no move list is built. See :func:`greedy_playout` for
+    the greedy policy.
+    """
+    sign = 1
+    moves = get_moves(own, opp)
+    while True:
+        if not moves:
+            moves = get_moves(opp, own)
+            if not moves:
+                break
+            # Pass
+            own, opp = opp, own
+            sign = -sign
+            continue
+        k = rng.randrange(moves.bit_count())
+        for _ in range(k):
+            moves &= moves - 1
+        move = moves & -moves
+        flips = get_flips(own, opp, move.bit_length() - 1)
+        own, opp = opp & ~flips, own | flips | move
+        sign = -sign
+        moves = get_moves(own, opp)
+    return sign * (own.bit_count() - opp.bit_count())
+
+
+def greedy_playout(own: int, opp: int) -> int:
+    """Play greedy moves from ``(own, opp)`` to the end of the game.
+
+    Each side plays the move that flips the most discs, the lowest
+    square on ties, as :func:`rl_agent.greedy_opponent_move` does.
+    Returns the final disc difference for ``own``, the side to move;
+    like :func:`random_playout`, no move list is built.
+    """
+    sign = 1
+    moves = get_moves(own, opp)
+    while True:
+        if not moves:
+            moves = get_moves(opp, own)
+            if not moves:
+                break
+            # Pass
+            own, opp = opp, own
+            sign = -sign
+            continue
+        best_flips = 0
+        best_count = -1
+        while moves:
+            move = moves & -moves
+            flips = get_flips(own, opp, move.bit_length() - 1)
+            count = flips.bit_count()
+            if count > best_count:
+                best_count, best_flips, best_move = count, flips, move
+            moves ^= move
+        own, opp = opp & ~best_flips, own | best_flips | best_move
+        sign = -sign
+        moves = get_moves(own, opp)
+    return sign * (own.bit_count() - opp.bit_count())
@@ -0,0 +1,28 @@
+"""Shared helpers for the tests."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import game_logic
+
+
+def _late_position(seed, empties):
+    """Return the state of a random game (seeded) once ``empties`` squares are left, or at its end."""
+    rng = random.Random(seed)
+    state = game_logic.GameState()
+    while not state.is_terminal() and state.empties > empties:
+        moves = state.moves()
+        if moves:
+            state.play(*rng.choice(moves))
+        else:
+            state.pass_turn()
+    return state
+
+
+@pytest.fixture
+def late_position():
+    """``late_position(seed, empties)``: a random game played down to ``empties`` empty squares."""
+    return _late_position
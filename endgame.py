@@ -0,0 +1,251 @@
+"""
+Exact endgame solver for the last empty squares.
+
+With few empty squares left the whole game tree can be searched, so the
+final disc difference under perfect play is known exactly.
+:class:`EndgameSolver` does that with a fail-soft alpha-beta negamax on
+bitboards (see :mod:`bitboard`), using the usual endgame move ordering:
+
+* **fastest first** while many squares are empty: replies that leave the
+  opponent the fewest moves are tried first (corners before anything);
+* **parity** closer to the end: moves into board quadrants with an odd
+  number of empty squares come first, since the last move in a region
+  tends to be worth more;
+* a dedicated routine for the **last four empties**, which walks the
+  list of empty squares directly instead of generating move masks.
+
+Scores are the final disc difference (own minus opponent) for the side
+to move, matching :func:`game_logic.count_pieces`. :func:`exact_score`
+labels positions for training, :func:`endgame_move` picks a move for the
+GUI or an evaluation match, and :data:`ENDGAME_EMPTIES` is the number of
+empties from which the solver is used. Like :class:`search.AlphaBetaSearch`,
+the solver checks an optional ``stop`` event every
+:data:`search.CLOCK_INTERVAL` nodes and raises
+:class:`search.SearchTimeout` once it is set, so a solve running in a
+background thread can be cancelled.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import bitboard
+import game_logic
+from search import CLOCK_INTERVAL, SearchTimeout
+
+# Use the solver when this many squares or fewer are empty
+ENDGAME_EMPTIES: int = 14
+# Above this many empties, order moves fastest-first instead of by parity
+FASTEST_FIRST_EMPTIES: int = 7
+
+_FULL = bitboard.FULL
+_CORNERS = bitboard.CORNERS
+_get_moves = bitboard.get_moves
+_get_flips = bitboard.get_flips
+
+# The four 4x4 quadrants of the board
+_QUADRANTS: Tuple[int, ...] = (
+    0x0F0F0F0F,
+    0xF0F0F0F0,
+    0x0F0F0F0F << 32,
+    0xF0F0F0F0 << 32,
+)
+
+
+def _odd_regions(empty: int) -> int:
+    """Return the union of quadrants holding an odd number of empty squares."""
+    odd = 0
+    for quadrant in _QUADRANTS:
+        if (empty & quadrant).bit_count() & 1:
+            odd |= quadrant
+    return odd
+
+
+def _parity_squares(empty: int) -> List[int]:
+    """Return the empty squares, those in odd quadrants first."""
+    odd = _odd_regions(empty)
+    return list(bitboard.iter_squares(empty & odd)) + list(bitboard.iter_squares(empty & ~odd))
+
+
+class EndgameSolver:
+    """Exact alpha-beta solver; ``nodes`` counts the positions visited.
+
+    Positions with more than four empties keep their proven
+    ``(lower, upper)`` score bounds in a table for the solver's lifetime.
+    Setting the ``stop`` event makes a running solve raise
+    :class:`search.SearchTimeout`.
+    """
+
+    def __init__(self) -> None:
+        self.nodes = 0
+        self._table: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self.stop: Optional[threading.Event] = None
+        self._next_check = 0
+
+    def solve(self, own: int, opp: int, alpha: int = -64, beta: int = 64) -> int:
+        """Return the final disc difference for ``own`` under perfect play.
+
+        The value is exact when it lies strictly between ``alpha`` and
+        ``beta``; otherwise it is a bound on the same side of the window.
+        """
+        empty = ~(own | opp) & _FULL
+        if empty.bit_count() <= 4:
+            return self._solve_last(own, opp, alpha, beta, _parity_squares(empty), False)
+        return self._solve(own, opp, alpha, beta, False)
+
+    def best_move(self, own: int, opp: int) -> Tuple[Optional[int], int]:
+        """Return ``(square, score)`` of a perfect move for ``own``.
+
+        ``square`` is None (and ``score`` the solved value after the
+        pass, or the final result) when ``own`` has no move.
+        """
+        moves = _get_moves(own, opp)
+        if not moves:
+            return None, self.solve(own, opp)
+        best_sq = None
+        alpha = -65
+        for child_own, child_opp, sq in self._ordered_children(own, opp, moves):
+            if best_sq is None:
+                value = -self.solve(child_own, child_opp, -64, 64)
+            else:
+                # Only a move that beats the current best needs an exact score
+                value = -self.solve(child_own, child_opp, -alpha - 1, -alpha)
+                if value > alpha:
+                    value = -self.solve(child_own, child_opp, -64, -value)
+            if value > alpha:
+                alpha = value
+                best_sq = sq
+        return best_sq, alpha
+
+    def _ordered_children(self, own: int, opp: int, moves: int) -> List[Tuple[int, int, int]]:
+        """Return ``(opp', own', square)`` for each move, best candidates first."""
+        empty = ~(own | opp) & _FULL
+        children = []
+        if empty.bit_count() > FASTEST_FIRST_EMPTIES:
+            for sq in bitboard.iter_squares(moves):
+                flips = _get_flips(own, opp, sq)
+                child_own = opp & ~flips
+                child_opp = own | flips | (1 << sq)
+                # Fewest opponent replies first; corners win ties
+                key = 2 * _get_moves(child_own, child_opp).bit_count() - ((1 << sq) & _CORNERS != 0)
+                children.append((key, child_own, child_opp, sq))
+            children.sort(key=lambda child: child[0])
+            return [child[1:] for child in children]
+        odd = _odd_regions(empty)
+        for sq in bitboard.iter_squares(moves & odd):
+            flips = _get_flips(own, opp, sq)
+            children.append((opp & ~flips, own | flips | (1 << sq), sq))
+        for sq in bitboard.iter_squares(moves & ~odd):
+            flips = _get_flips(own, opp, sq)
+            children.append((opp & ~flips, own | flips | (1 << sq), sq))
+        return children
+
+    def _solve(self, own: int, opp: int, alpha: int, beta: int, passed: bool) -> int:
+        self.nodes += 1
+        if self.stop is not None and self.nodes >= self._next_check:
+            # The _solve_last subtrees (four empties at most) are small: checking here is enough
+            self._next_check = self.nodes + CLOCK_INTERVAL
+            if self.stop.is_set():
+                raise SearchTimeout
+        moves = _get_moves(own, opp)
+        if not moves:
+            if passed:
+                return own.bit_count() - opp.bit_count()
+            return -self._solve(opp, own, -beta, -alpha, True)
+        # Bounds from earlier visits of this position: lower <= value <= upper
+        key = (own, opp)
+        bounds = self._table.get(key)
+        if bounds is not None:
+            lower, upper = bounds
+            if lower >= beta:
+                return lower
+            if upper <= alpha:
+                return upper
+            if lower == upper:
+                return lower
+            alpha = max(alpha, lower)
+            beta = min(beta, upper)
+        alpha_start = alpha
+        best = -65
+        first = True
+        for child_own, child_opp, sq in self._ordered_children(own, opp, moves):
+            empty = ~(child_own | child_opp) & _FULL
+            if empty.bit_count() <= 4:
+                squares = _parity_squares(empty)
+                value = -self._solve_last(child_own, child_opp, -beta, -alpha, squares, False)
+            elif first:
+                value = -self._solve(child_own, child_opp, -beta, -alpha, False)
+            else:
+                # Principal variation search: prove the move is no better
+                # with a null window, and re-search only if it is.
+                value = -self._solve(child_own, child_opp, -alpha - 1, -alpha, False)
+                if alpha < value < beta:
+                    value = -self._solve(child_own, child_opp, -beta, -value, False)
+            first = False
+            if value > best:
+                best = value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        lower, upper = bounds if bounds is not None else (-64, 64)
+        if best <= alpha_start:
+            upper = best
+        elif best >= beta:
+            lower = best
+        else:
+            lower = upper = best
+        self._table[key] = (lower, upper)
+        return best
+
+    def _solve_last(self, own: int, opp: int, alpha: int, beta: int,
+                    squares: List[int], passed: bool) -> int:
+        """Solve a position whose empty squares are exactly ``squares`` (at most four)."""
+        self.nodes += 1
+        best = -65
+        for i, sq in enumerate(squares):
+            flips = _get_flips(own, opp, sq)
+            if not flips:
+                continue
+            if len(squares) == 1:
+                # Last empty square: the score follows from the flip count
+                n_flips = flips.bit_count()
+                return own.bit_count() + n_flips + 1 - (opp.bit_count() - n_flips)
+            rest = squares[:i] + squares[i + 1:]
+            value = -self._solve_last(opp & ~flips, own | flips | (1 << sq), -beta, -alpha, rest, False)
+            if value > best:
+                best = value
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        if best == -65:
+            # No move: pass, or the game is over if the opponent passed too
+            if passed:
+                return own.bit_count() - opp.bit_count()
+            return -self._solve_last(opp, own, -beta, -alpha, squares, True)
+        return best
+
+
+def exact_score(board: List[List[int]], player: int) -> int:
+    """Return the final disc difference for ``player`` with perfect play from ``board``.
+
+    ``player`` is the side to move. Meant for positions with at most
+    :data:`ENDGAME_EMPTIES` empty squares, e.g. as exact training labels.
+    """
+    own, opp = game_logic.to_bitboards(board, player)
+    return EndgameSolver().solve(own, opp)
+
+
+def endgame_move(board: List[List[int]], player: int,
+                 stop: Optional[threading.Event] = None) -> Optional[Tuple[int, int]]:
+    """Return a perfect move for ``player``, or None if it has to pass.
+
+    Raises :class:`search.SearchTimeout` if ``stop`` is set during the solve.
+    """
+    own, opp = game_logic.to_bitboards(board, player)
+    solver = EndgameSolver()
+    solver.stop = stop
+    sq, _ = solver.best_move(own, opp)
+    return None if sq is None else bitboard.coords(sq)
@@ -15,18 +15,28 @@ for the end of the game, and count pieces for scoring. They do not
 depend on any graphics library and are intended to be used in
 non-interactive simulations (e.g. training reinforcement learning
 agents) as well as in conjunction with a graphical frontend.
+
+Internally the rules run on the bitboard backend in :mod:`bitboard`;
+the functions here convert the list-of-lists board at the boundary so
+callers keep working with the 8×8 matrix. ``_get_flips`` is kept as the
+straightforward cell-by-cell reference implementation.
 """
 
 from __future__ import annotations
 
-import copy
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional, Sequence
+
+import bitboard
+from transposition import CacheEntry, TranspositionCache
 
 # Constants to represent board cells
 EMPTY: int = 0
 BLACK: int = 1
 WHITE: int = -1
 
+# Undo record returned by make_move: the placed square and the flipped squares
+Undo = Tuple[Tuple[int, int], List[Tuple[int, int]]]
+
 def create_board() -> List[List[int]]:
     """Return a new game board initialized with the standard starting position.
 
@@ -72,43 +82,120 @@ def _get_flips(board: List[List[int]], player: int, x: int, y: int) -> List[Tupl
             flips.extend(captured)
     return flips
 
+def to_bitboards(board: List[List[int]], player: int) -> Tuple[int, int]:
+    """Return the ``(own, opp)`` bitboards of ``board`` from ``player``'s side."""
+    black, white = bitboard.from_board(board, BLACK, WHITE)
+    if player == BLACK:
+        return black, white
+    return white, black
+
+
+def canonical_board(board: List[List[int]]) -> Tuple[List[List[int]], int]:
+    """Return ``(canonical, t)``: the representative of ``board``'s 8 symmetries.
+
+    Symmetric boards give the same ``canonical`` board; ``t`` is the
+    :mod:`bitboard` transform that maps ``board`` onto it (see
+    :func:`transform_move`).
+    """
+    black, white, t = bitboard.canonical(*bitboard.from_board(board, BLACK, WHITE))
+    return bitboard.to_board(black, white, BLACK, WHITE, EMPTY), t
+
+
+def transform_move(move: Tuple[int, int], t: int) -> Tuple[int, int]:
+    """Return the coordinate ``move`` is mapped to by symmetry ``t``.
+
+    Use ``bitboard.INVERSE[t]`` to map a move of the canonical board
+    back to the original one.
+    """
+    return bitboard.coords(bitboard.SQUARE_MAPS[t][bitboard.square(*move)])
+
+
 def get_valid_moves(board: List[List[int]], player: int) -> List[Tuple[int, int]]:
     """Return a list of all valid moves for ``player`` on ``board``.
 
     A move is valid if placing a piece of ``player`` at the coordinate
-    captures at least one of the opponent's pieces.
+    captures at least one of the opponent's pieces. Moves are listed in
+    row-major order.
     """
-    moves: List[Tuple[int, int]] = []
-    for x in range(8):
-        for y in range(8):
-            if board[x][y] != EMPTY:
-                continue
-            if _get_flips(board, player, x, y):
-                moves.append((x, y))
-    return moves
+    own, opp = to_bitboards(board, player)
+    return [(sq >> 3, sq & 7) for sq in bitboard.iter_squares(bitboard.get_moves(own, opp))]
 
-def apply_move(board: List[List[int]], player: int, move: Tuple[int, int]) -> List[List[int]]:
-    """Return a new board after applying ``move`` for ``player``.
+def _bitboard_moves(own: int, opp: int) -> List[Undo]:
+    """Return the ``(move, flips)`` list for the bitboards ``own``/``opp``."""
+    return [((sq >> 3, sq & 7), [(f >> 3, f & 7) for f in bitboard.iter_squares(flips)])
+            for sq, flips in bitboard.iter_moves(own, opp)]
 
-    The returned board reflects the piece placed at ``move`` and all
-    captured opponent pieces flipped. The original board is not
-    modified.
+def to_bitboard_moves(moves: Sequence[Undo]) -> List[Tuple[int, int]]:
+    """Return the ``(square, flip mask)`` pairs of ``(move, flips)`` pairs, in the same order.
+
+    This is the form of :func:`bitboard.iter_moves`, built from a move
+    list already generated instead of generating the moves again.
+    """
+    result = []
+    for (x, y), flips in moves:
+        mask = 0
+        for fx, fy in flips:
+            mask |= 1 << (fx * 8 + fy)
+        result.append((x * 8 + y, mask))
+    return result
+
+def iter_moves(board: List[List[int]], player: int) -> Iterator[Undo]:
+    """Yield ``(move, flips)`` for every valid move of ``player``.
+
+    The board is scanned once: the legal moves and the squares each of
+    them flips come out of the same sweep, in row-major order, so the
+    caller can pass ``flips`` straight to :func:`make_move`.
+    """
+    own, opp = to_bitboards(board, player)
+    for sq, flips in bitboard.iter_moves(own, opp):
+        yield (sq >> 3, sq & 7), [(f >> 3, f & 7) for f in bitboard.iter_squares(flips)]
+
+def make_move(board: List[List[int]], player: int, move: Tuple[int, int],
+              flips: Optional[List[Tuple[int, int]]] = None) -> Undo:
+    """Apply ``move`` for ``player`` to ``board`` in place.
+
+    ``flips`` may be given when it is already known (e.g. from
+    :func:`iter_moves`); otherwise it is computed here. Returns an undo
+    record ``(move, flips)`` that :func:`unmake_move` uses to restore
+    the previous position.
     """
     x, y = move
-    flips = _get_flips(board, player, x, y)
+    if flips is None:
+        own, opp = to_bitboards(board, player)
+        flips = [(sq >> 3, sq & 7)
+                 for sq in bitboard.iter_squares(bitboard.get_flips(own, opp, bitboard.square(x, y)))]
     if not flips:
         raise ValueError(f"Invalid move {move} for player {player}")
-    new_board = copy.deepcopy(board)
     # Place the player's piece
-    new_board[x][y] = player
+    board[x][y] = player
     # Flip captured opponent pieces
     for fx, fy in flips:
-        new_board[fx][fy] = player
+        board[fx][fy] = player
+    return move, flips
+
+def unmake_move(board: List[List[int]], undo: Undo) -> None:
+    """Revert the move described by ``undo`` on ``board`` in place."""
+    (x, y), flips = undo
+    opponent = -board[x][y]
+    board[x][y] = EMPTY
+    for fx, fy in flips:
+        board[fx][fy] = opponent
+
+def apply_move(board: List[List[int]], player: int, move: Tuple[int, int]) -> List[List[int]]:
+    """Return a new board after applying ``move`` for ``player``.
+
+    The returned board reflects the piece placed at ``move`` and all
+    captured opponent pieces flipped. The original board is not
+    modified; use :func:`make_move` to update a board in place.
+    """
+    new_board = [row[:] for row in board]
+    make_move(new_board, player, move)
     return new_board
 
 def has_any_moves(board: List[List[int]], player: int) -> bool:
     """Return True if ``player`` has at least one valid move on ``board``."""
-    return any(_get_flips(board, player, x, y) for x in range(8) for y in range(8) if board[x][y] == EMPTY)
+    own, opp = to_bitboards(board, player)
+    return bitboard.get_moves(own, opp) != 0
 
 def is_terminal(board: List[List[int]]) -> bool:
     """Return True if the game is over.
@@ -116,27 +203,145 @@ def is_terminal(board: List[List[int]]) -> bool:
     The game ends when neither player has a valid move or when the
     board is full.
     """
+    black, white = bitboard.from_board(board, BLACK, WHITE)
     # Check board full
-    for row in board:
-        if any(cell == EMPTY for cell in row):
-            break
-    else:
-        # No empty cells
+    if black | white == bitboard.FULL:
         return True
     # Check no moves for both players
-    return not (has_any_moves(board, BLACK) or has_any_moves(board, WHITE))
+    return not (bitboard.get_moves(black, white) or bitboard.get_moves(white, black))
 
 def count_pieces(board: List[List[int]]) -> Tuple[int, int]:
     """Return a tuple (black_count, white_count) of pieces on ``board``."""
-    black = 0
-    white = 0
-    for row in board:
-        for cell in row:
-            if cell == BLACK:
-                black += 1
-            elif cell == WHITE:
-                white += 1
-    return black, white
+    black, white = bitboard.from_board(board, BLACK, WHITE)
+    return bitboard.popcount(black), bitboard.popcount(white)
+
+class GameState:
+    """A game in progress: the board, the side to move and end-of-game bookkeeping.
+
+    The state keeps the number of empty squares, the number of
+    consecutive passes and the ``(move, flips)`` list of the side to
+    move, so the game loops can ask whether the game is over without
+    rescanning the board. The game ends when the board is full or both
+    sides have passed in a row. Bitboards of both colours are updated
+    alongside ``board`` so move generation needs no conversion.
+
+    With a ``cache``, move lists are looked up by position and shared
+    with other games through :class:`transposition.CacheEntry` records;
+    ``entry`` is the record of the current position, for callers that
+    store more in it (see :func:`rl_agent.choose_action`).
+    """
+
+    def __init__(self, board: Optional[List[List[int]]] = None, player: int = BLACK,
+                 cache: Optional[TranspositionCache] = None) -> None:
+        self.board: List[List[int]] = create_board() if board is None else board
+        self.player: int = player
+        self.black, self.white = bitboard.from_board(self.board, BLACK, WHITE)
+        self.empties: int = 64 - bitboard.popcount(self.black | self.white)
+        self.passes: int = 0
+        self.cache = cache
+        self._moves: Optional[List[Undo]] = None
+        # Cache record of the position, set by moves() when there is a cache
+        self.entry: Optional[CacheEntry] = None
+
+    def key(self) -> Tuple[int, int]:
+        """Return the ``(own, opp)`` bitboards of the side to move."""
+        if self.player == BLACK:
+            return self.black, self.white
+        return self.white, self.black
+
+    def moves(self) -> List[Undo]:
+        """Return the ``(move, flips)`` pairs of the side to move (generated once)."""
+        if self._moves is None:
+            key = self.key()
+            if self.cache is None:
+                self._moves = _bitboard_moves(*key)
+            else:
+                entry = self.cache.get(key)
+                if entry is None:
+                    entry = CacheEntry(_bitboard_moves(*key))
+                    self.cache.put(key, entry)
+                self.entry = entry
+                self._moves = entry.moves
+        return self._moves
+
+    def play(self, move: Tuple[int, int], flips: Optional[List[Tuple[int, int]]] = None) -> Undo:
+        """Play ``move`` for the side to move and hand the turn over."""
+        if flips is None:
+            for m, f in self.moves():
+                if m == move:
+                    flips = f
+                    break
+            else:
+                raise ValueError(f"Invalid move {move} for player {self.player}")
+        undo = make_move(self.board, self.player, move, flips)
+        changed = 1 << bitboard.square(*move)
+        for fx, fy in flips:
+            changed |= 1 << bitboard.square(fx, fy)
+        if self.player == BLACK:
+            self.black |= changed
+            self.white &= ~changed
+        else:
+            self.white |= changed
+            self.black &= ~changed
+        self.empties -= 1
+        self.passes = 0
+        self.player = -self.player
+        self._moves = None
+        self.entry = None
+        return undo
+
+    def play_square(self, sq: int, flips: int) -> None:
+        """Play bit index ``sq`` with the flip mask ``flips`` (see :func:`bitboard.get_flips`).
+
+        Updates ``board`` and the bitboards in place without building
+        move or flip lists; ``flips`` must be the move's actual flips.
+        """
+        board = self.board
+        player = self.player
+        board[sq >> 3][sq & 7] = player
+        rest = flips
+        while rest:
+            low = rest & -rest
+            f = low.bit_length() - 1
+            board[f >> 3][f & 7] = player
+            rest ^= low
+        changed = flips | (1 << sq)
+        if player == BLACK:
+            self.black |= changed
+            self.white &= ~changed
+        else:
+            self.white |= changed
+            self.black &= ~changed
+        self.empties -= 1
+        self.passes = 0
+        self.player = -player
+        self._moves = None
+        self.entry = None
+
+    def play_random(self, rng) -> None:
+        """Play a uniformly random legal move, or pass if there is none.
+
+        Draws from ``rng`` exactly like ``rng.choice(self.moves())``, but
+        from the bitboards, without generating the move list.
+        """
+        own, opp = self.key()
+        moves = bitboard.get_moves(own, opp)
+        if not moves:
+            self.pass_turn()
+            return
+        sq = bitboard.random_square(moves, rng)
+        self.play_square(sq, bitboard.get_flips(own, opp, sq))
+
+    def pass_turn(self) -> None:
+        """Pass: the side to move has no valid move."""
+        self.passes += 1
+        self.player = -self.player
+        self._moves = None
+        self.entry = None
+
+    def is_terminal(self) -> bool:
+        """Return True if the board is full or both sides passed in a row."""
+        return self.empties == 0 or self.passes >= 2
 
 def print_board(board: List[List[int]]) -> None:
     """Print the board to stdout for debugging."""
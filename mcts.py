@@ -0,0 +1,268 @@
+"""
+Monte-Carlo Tree Search (UCT) player.
+
+:class:`MCTS` grows a search tree on bitboards (see :mod:`bitboard`).
+Each playout has four steps:
+
+1. Descend the tree with the UCB1 rule.
+2. Add one new child.
+3. Finish the game from that child with a rollout policy.
+4. Back the result up the path.
+
+Rollouts pick uniformly random moves (``"random"``, the fastest: see
+:func:`bitboard.random_playout`), or
+epsilon-greedy moves of the linear evaluator of :mod:`search`
+(``"linear"``). The move played is the root child with the most visits.
+
+The tree is kept between calls: when the next search starts from a
+position already in the tree (usually two plies below the old root),
+that subtree becomes the new root, with its statistics.
+
+With ``workers > 1`` the search is root-parallel. Worker processes
+build independent trees from the same root while the calling process
+keeps searching its own reused tree, and the root visit counts are
+summed. A budget is a number of playouts (split among the processes)
+or a time limit in milliseconds (given to each). Setting the ``stop``
+event ends the search in this process early.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import bitboard
+import game_logic
+import search
+
+# UCB1 exploration constant
+EXPLORATION: float = 1.4
+# Chance of a random move in a "linear" rollout
+ROLLOUT_EPSILON: float = 0.1
+
+_get_moves = bitboard.get_moves
+_get_flips = bitboard.get_flips
+
+# Visits and summed results of the root children: {square: (visits, wins)}
+RootStats = Dict[int, Tuple[int, float]]
+
+
+class Node:
+    """Tree node for the position ``(own, opp)`` with ``own`` to move.
+
+    ``wins`` is summed from the point of view of the player who moved
+    into this node (1 win, 0.5 draw, 0 loss); ``untried`` is the mask of
+    moves without a child yet. A node whose side must pass has a single
+    pass move, square -1.
+    """
+
+    __slots__ = ("own", "opp", "children", "untried", "visits", "wins", "terminal")
+
+    def __init__(self, own: int, opp: int) -> None:
+        self.own = own
+        self.opp = opp
+        self.children: Dict[int, Node] = {}
+        self.visits = 0
+        self.wins = 0.0
+        moves = _get_moves(own, opp)
+        self.terminal = not moves and not _get_moves(opp, own)
+        self.untried: List[int] = list(bitboard.iter_squares(moves)) if moves else ([] if self.terminal else [-1])
+
+    def play(self, sq: int) -> Tuple[int, int]:
+        """Return the ``(own, opp)`` position after ``sq`` (-1 passes)."""
+        if sq < 0:
+            return self.opp, self.own
+        flips = _get_flips(self.own, self.opp, sq)
+        return self.opp & ~flips, self.own | flips | (1 << sq)
+
+
+def _result(own: int, opp: int) -> float:
+    """Return the result of a finished game for the owner of ``own``."""
+    diff = own.bit_count() - opp.bit_count()
+    return 1.0 if diff > 0 else 0.0 if diff < 0 else 0.5
+
+
+class MCTS:
+    """UCT search; see the module docstring.
+
+    ``weights`` are the linear weights for ``rollout="linear"``.
+    ``playouts`` counts the playouts of the last search across all
+    processes. ``stop`` is an optional :class:`threading.Event` that
+    ends a search in this process when set.
+    """
+
+    def __init__(self, rollout: str = "random", weights: Optional[Sequence[float]] = None,
+                 exploration: float = EXPLORATION, workers: int = 1, seed: Optional[int] = None) -> None:
+        if rollout not in ("random", "linear"):
+            raise ValueError(f"Unknown rollout {rollout!r}")
+        if rollout == "linear" and weights is None:
+            raise ValueError("linear rollouts need weights")
+        self.rollout = rollout
+        self.weights = weights
+        self.exploration = exploration
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.root: Optional[Node] = None
+        self.playouts = 0
+        self._evaluate = search.AlphaBetaSearch(weights).evaluate if weights is not None else None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stop: Optional[threading.Event] = None
+
+    def close(self) -> None:
+        """Shut down the worker processes, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> "MCTS":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _set_root(self, own: int, opp: int) -> Node:
+        """Make ``(own, opp)`` the root, reusing a subtree of the old root if possible."""
+        root = self.root
+        if root is not None:
+            # Look up to two plies down (our move, then the opponent's)
+            frontier = [root]
+            for _ in range(3):
+                for node in frontier:
+                    if node.own == own and node.opp == opp:
+                        self.root = node
+                        return node
+                frontier = [child for node in frontier for child in node.children.values()]
+        self.root = Node(own, opp)
+        return self.root
+
+    def _rollout(self, own: int, opp: int) -> float:
+        """Play the game out from ``(own, opp)``; return the result for the owner of ``own``."""
+        rng = self.rng
+        if self.rollout == "random":
+            diff = bitboard.random_playout(own, opp, rng)
+            return 1.0 if diff > 0 else 0.0 if diff < 0 else 0.5
+        evaluate = self._evaluate
+        flipped = False  # True when own/opp are swapped with respect to the start
+        while True:
+            moves = _get_moves(own, opp)
+            if not moves:
+                if not _get_moves(opp, own):
+                    break
+                own, opp = opp, own
+                flipped = not flipped
+                continue
+            if rng.random() < ROLLOUT_EPSILON:
+                sq = bitboard.random_square(moves, rng)
+            else:
+                best = -math.inf
+                for candidate in bitboard.iter_squares(moves):
+                    flips = _get_flips(own, opp, candidate)
+                    value = evaluate(own | flips | (1 << candidate), opp & ~flips)
+                    if value > best:
+                        best, sq = value, candidate
+            flips = _get_flips(own, opp, sq)
+            own, opp = opp & ~flips, own | flips | (1 << sq)
+            flipped = not flipped
+        result = _result(own, opp)
+        return 1.0 - result if flipped else result
+
+    def _playout(self, root: Node) -> None:
+        node = root
+        path = [node]
+        c = self.exploration
+        # Selection
+        while not node.untried and node.children:
+            log_n = math.log(node.visits)
+            node = max(node.children.values(),
+                       key=lambda child: child.wins / child.visits + c * math.sqrt(log_n / child.visits))
+            path.append(node)
+        # Expansion
+        if node.untried:
+            sq = node.untried.pop(self.rng.randrange(len(node.untried)))
+            child = Node(*node.play(sq))
+            node.children[sq] = child
+            node = child
+            path.append(node)
+        # Simulation: result for the side to move at the leaf
+        value = _result(node.own, node.opp) if node.terminal else self._rollout(node.own, node.opp)
+        # Backpropagation: each node scores for the player who moved into it
+        for visited in reversed(path):
+            visited.visits += 1
+            visited.wins += 1.0 - value
+            value = 1.0 - value
+
+    def run(self, own: int, opp: int, playouts: Optional[int] = None,
+            time_ms: Optional[float] = None) -> RootStats:
+        """Search from ``(own, opp)`` in this process; return the root statistics.
+
+        With neither ``playouts`` nor ``time_ms``, searches until ``stop`` is set.
+        """
+        root = self._set_root(own, opp)
+        deadline = None if time_ms is None else time.perf_counter() + time_ms / 1000.0
+        stop = self.stop
+        done = 0
+        while (playouts is None or done < playouts) and (deadline is None or time.perf_counter() < deadline) \
+                and not (stop is not None and stop.is_set()):
+            self._playout(root)
+            done += 1
+        return {sq: (child.visits, child.wins) for sq, child in root.children.items()}
+
+    def search(self, own: int, opp: int, playouts: Optional[int] = 1000,
+               time_ms: Optional[float] = None) -> Optional[int]:
+        """Return the most visited move for ``own`` (-1 for a forced pass, None at the end).
+
+        Stops after ``playouts`` playouts, after ``time_ms`` milliseconds,
+        or at whichever comes first if both are given. If no playout ran
+        (a zero budget, or ``stop`` already set), returns the lowest legal square.
+        """
+        if playouts is None and time_ms is None:
+            raise ValueError("give playouts or time_ms")
+        moves = _get_moves(own, opp)
+        if not moves:
+            return None if not _get_moves(opp, own) else -1
+        stats: List[RootStats] = []
+        local_playouts = playouts
+        futures = []
+        if self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers - 1)
+            if playouts is not None:
+                local_playouts = -(-playouts // self.workers)
+            futures = [self._pool.submit(_worker_search, own, opp, local_playouts, time_ms, self.rng.getrandbits(32),
+                                         self.rollout, self.weights, self.exploration)
+                       for _ in range(self.workers - 1)]
+        stats.append(self.run(own, opp, local_playouts, time_ms))
+        stats.extend(f.result() for f in futures)
+        visits: Dict[int, int] = {}
+        for root_stats in stats:
+            for sq, (n, _) in root_stats.items():
+                visits[sq] = visits.get(sq, 0) + n
+        self.playouts = sum(visits.values())
+        if not visits:
+            # No playout was run (zero budget, or stopped at once): lowest legal square
+            return (moves & -moves).bit_length() - 1
+        # Most visits; ties go to the lowest square
+        return max(sorted(visits), key=lambda sq: visits[sq])
+
+
+def _worker_search(own: int, opp: int, playouts: Optional[int], time_ms: Optional[float], seed: int,
+                   rollout: str, weights: Optional[Sequence[float]], exploration: float) -> RootStats:
+    """Root-parallel worker: a fresh tree searched from ``(own, opp)``."""
+    return MCTS(rollout, weights, exploration, seed=seed).run(own, opp, playouts, time_ms)
+
+
+def mcts_move(board: List[List[int]], player: int, playouts: Optional[int] = 1000,
+              time_ms: Optional[float] = None, player_mcts: Optional[MCTS] = None) -> Optional[Tuple[int, int]]:
+    """Return the MCTS move for ``player`` on ``board``, or None if it has no move.
+
+    Pass the same ``player_mcts`` on every move to reuse its tree (and
+    worker processes) between moves.
+    """
+    if player_mcts is None:
+        player_mcts = MCTS()
+    sq = player_mcts.search(*game_logic.to_bitboards(board, player), playouts=playouts, time_ms=time_ms)
+    return None if sq is None or sq < 0 else bitboard.coords(sq)
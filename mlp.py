@@ -0,0 +1,189 @@
+"""
+Small neural-network (MLP) value evaluator, run with plain NumPy.
+
+The input of a position is 128 values, the own and opponent discs of
+:func:`batch_env.square_bits`, for the player owning ``own``. One hidden
+ReLU layer feeds a ``tanh`` output, the expected result (+1 win, -1
+loss) for that player. Positions are always scored in batches, so
+scoring every candidate move of a position, or of many games at once
+(see :mod:`batch_env`), is two matrix products.
+
+Like :class:`ntuple.NTupleEvaluator`, an evaluator can stand in for the
+linear ``weights`` of :func:`rl_agent.choose_action`,
+:class:`search.AlphaBetaSearch` and the batched evaluation.
+
+Parameters are stored in an ``.npz`` file. :meth:`MLPEvaluator.load`
+only records the path; the arrays are read on first use. Training
+(:func:`train_mlp`) fits the value of the AI's afterstates to the
+final result. It uses mini-batches from a :class:`replay.ReplayBuffer`
+and augments every game with its 8 symmetric versions.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+import game_logic
+from batch_env import augment_boards, square_bits
+from replay import ReplayBuffer
+
+HIDDEN: int = 64
+PARAMS = ("w1", "b1", "w2", "b2")
+
+
+def inputs(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Return the ``(N, 128)`` network inputs of ``uint64`` bitboard arrays."""
+    return np.concatenate([square_bits(own), square_bits(opp)], axis=1).astype(np.float32)
+
+
+class MLPEvaluator:
+    """Value network ``tanh(relu(x @ w1 + b1) @ w2 + b2)``.
+
+    Give either ``params`` (a dict of the arrays in :data:`PARAMS`) or
+    the ``path`` of an ``.npz`` file to read them from when first needed.
+    """
+
+    def __init__(self, params: Optional[Dict[str, np.ndarray]] = None, path: Optional[str] = None) -> None:
+        if params is None and path is None:
+            raise ValueError("give params or path")
+        self._params = params
+        self.path = path
+
+    @classmethod
+    def create(cls, hidden: int = HIDDEN, seed: Optional[int] = None) -> "MLPEvaluator":
+        """Return a network with small random weights."""
+        rng = np.random.default_rng(seed)
+        return cls({
+            "w1": (rng.standard_normal((128, hidden)) * np.sqrt(2.0 / 128)).astype(np.float32),
+            "b1": np.zeros(hidden, dtype=np.float32),
+            "w2": (rng.standard_normal((hidden, 1)) * np.sqrt(1.0 / hidden)).astype(np.float32),
+            "b2": np.zeros(1, dtype=np.float32),
+        })
+
+    @classmethod
+    def load(cls, path: str) -> "MLPEvaluator":
+        """Return an evaluator for the ``.npz`` file at ``path`` (read lazily)."""
+        return cls(path=path)
+
+    @property
+    def params(self) -> Dict[str, np.ndarray]:
+        if self._params is None:
+            with np.load(self.path) as data:
+                self._params = {name: data[name] for name in PARAMS}
+        return self._params
+
+    def save(self, path: str) -> None:
+        np.savez(path, **self.params)
+
+    def forward(self, x: np.ndarray) -> np.ndarray:
+        """Return the values of the ``(N, 128)`` inputs ``x``."""
+        p = self.params
+        hidden = np.maximum(x @ p["w1"] + p["b1"], 0.0)
+        return np.tanh(hidden @ p["w2"] + p["b2"])[:, 0]
+
+    def score_positions(self, own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+        """Return the values of many positions given as ``uint64`` bitboard arrays."""
+        return self.forward(inputs(own, opp))
+
+    def evaluate(self, own: int, opp: int) -> float:
+        """Return the value of the position for the side owning ``own``."""
+        return float(self.score_positions(np.array([own], dtype=np.uint64), np.array([opp], dtype=np.uint64))[0])
+
+    def score_moves(self, own: int, opp: int,
+                    moves: Sequence[Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Score the ``(square, flips)`` moves of the side owning ``own`` in one forward pass.
+
+        Returns ``(values, inputs)``: the value after each move for the
+        mover and the network input of each successor position.
+        """
+        after_own = np.array([own | flips | (1 << sq) for sq, flips in moves], dtype=np.uint64)
+        after_opp = np.array([opp & ~flips for _, flips in moves], dtype=np.uint64)
+        x = inputs(after_own, after_opp)
+        return self.forward(x), x
+
+    def train_step(self, x: np.ndarray, targets: np.ndarray, lr: float) -> float:
+        """Take one gradient step on the mean squared error; return the loss."""
+        p = self.params
+        pre = x @ p["w1"] + p["b1"]
+        hidden = np.maximum(pre, 0.0)
+        y = np.tanh(hidden @ p["w2"] + p["b2"])[:, 0]
+        error = y - targets
+        d_out = (error * (1.0 - y * y) / len(x))[:, None].astype(np.float32)
+        d_hidden = (d_out @ p["w2"].T) * (pre > 0)
+        p["w2"] -= lr * (hidden.T @ d_out)
+        p["b2"] -= lr * d_out.sum(axis=0)
+        p["w1"] -= lr * (x.T @ d_hidden)
+        p["b1"] -= lr * d_hidden.sum(axis=0)
+        return float(np.mean(error * error) / 2)
+
+
+def play_game(evaluator: MLPEvaluator, epsilon: float) -> Tuple[np.ndarray, float]:
+    """Play one game as black against the random opponent.
+
+    Returns the network inputs of the AI's afterstates and the result.
+    """
+    state = game_logic.GameState()
+    trajectory = []
+    while not state.is_terminal():
+        moves = state.moves()
+        if not moves:
+            state.pass_turn()
+            continue
+        if state.player == game_logic.BLACK:
+            own, opp = state.key()
+            values, x = evaluator.score_moves(own, opp, game_logic.to_bitboard_moves(moves))
+            if random.random() < epsilon:
+                choice = random.randrange(len(moves))
+            else:
+                choice = int(np.argmax(values))
+            trajectory.append(x[choice])
+            state.play(*moves[choice])
+        else:
+            state.play(*random.choice(moves))
+    black, white = game_logic.count_pieces(state.board)
+    return np.array(trajectory), float((black > white) - (black < white))
+
+
+def train_mlp(num_games: int, epsilon_start: float = 1.0, epsilon_end: float = 0.1, lr: float = 0.05,
+              batch_size: int = 128, replay_ratio: float = 1.0, evaluator: Optional[MLPEvaluator] = None,
+              buffer: Optional[ReplayBuffer] = None, seed: Optional[int] = None) -> MLPEvaluator:
+    """Train an evaluator (new, or ``evaluator`` in place) by self-play against the random opponent.
+
+    Every game is stored in ``buffer`` together with its 8 symmetric
+    versions. The network then takes one gradient step per ``batch_size``
+    positions added, times ``replay_ratio``, on batches sampled from the
+    buffer. Epsilon decays linearly as in :func:`rl_agent.train_agent`.
+    """
+    if evaluator is None:
+        evaluator = MLPEvaluator.create(seed=seed)
+    if buffer is None:
+        buffer = ReplayBuffer(capacity=100_000, num_features=128, dtype=np.uint8)
+    rng = np.random.default_rng(seed)
+    pending = 0.0
+    for game_index in range(num_games):
+        t = game_index / max(1, num_games - 1)
+        trajectory, reward = play_game(evaluator, epsilon_start * (1 - t) + epsilon_end * t)
+        if len(trajectory) == 0:
+            continue
+        # (n, 2, 64) own/opp planes -> their images under the 8 symmetries
+        planes = augment_boards(trajectory.reshape(-1, 2, 64))
+        buffer.add_game(planes.reshape(-1, 128), reward)
+        pending += replay_ratio * len(planes)
+        while pending >= batch_size:
+            x, targets, _ = buffer.sample(batch_size, rng)
+            evaluator.train_step(x.astype(np.float32), targets.astype(np.float32), lr)
+            pending -= batch_size
+    return evaluator
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python3 mlp.py [jogos] [ficheiro.npz]
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    path = sys.argv[2] if len(sys.argv) > 2 else "mlp.npz"
+    train_mlp(games, seed=0).save(path)
+    print(f"Rede guardada em {path}")
@@ -0,0 +1,229 @@
+"""
+Pattern-based (n-tuple) position evaluator.
+
+The board is covered by a fixed set of square patterns: the second to
+fourth rows, the diagonals of length 4 to 8, the 3x3 corner, the edge
+with its two X squares and the 2x5 corner block. Every pattern is used
+in all its symmetric placements (see :func:`bitboard.symmetries`), 46
+instances in all, and the placements of one pattern share a table of
+weights.
+
+For the player owning ``own``, each square of an instance is a base-3
+digit (0 empty, 1 own disc, 2 opponent disc) and the instance's digits
+form an index into its table. The value of a position is the sum of the
+46 table entries, one NumPy gather over a flat weight array.
+
+The indices change only on the squares a move touches. To score
+candidate moves, :meth:`NTupleEvaluator.score_moves` therefore adds
+each move's index change (the placed disc plus its flips) to the
+indices of the current position, instead of recomputing them. The
+training game carries the indices along in the same way: the chosen
+afterstate's indices plus the opponent's reply
+(:func:`after_opponent_move`) are the indices of the AI's next
+position. Callers that see unrelated positions, such as
+:func:`rl_agent.choose_action`, compute them from the bitboards.
+Training is a sparse update of the entries that were read
+(:meth:`update`).
+
+An evaluator can stand in for the linear ``weights`` of
+:func:`rl_agent.choose_action`, :class:`search.AlphaBetaSearch` and the
+batched evaluation in :mod:`batch_env`.
+Tables are stored with :meth:`save` and :meth:`load` as ``.npz`` files.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import bitboard
+import game_logic
+from batch_env import square_bits
+
+# Base shape of every pattern, as (x, y) squares in digit order
+PATTERNS: Dict[str, Tuple[Tuple[int, int], ...]] = {
+    "hv2": tuple((1, y) for y in range(8)),
+    "hv3": tuple((2, y) for y in range(8)),
+    "hv4": tuple((3, y) for y in range(8)),
+    "diag4": tuple((i, i + 4) for i in range(4)),
+    "diag5": tuple((i, i + 3) for i in range(5)),
+    "diag6": tuple((i, i + 2) for i in range(6)),
+    "diag7": tuple((i, i + 1) for i in range(7)),
+    "diag8": tuple((i, i) for i in range(8)),
+    "corner3x3": tuple((x, y) for x in range(3) for y in range(3)),
+    "edge2x": tuple((0, y) for y in range(8)) + ((1, 1), (1, 6)),
+    "corner2x5": tuple((x, y) for x in range(2) for y in range(5)),
+}
+
+
+def _instances(base: Sequence[Tuple[int, int]]) -> List[Tuple[int, ...]]:
+    """Return the distinct placements of a pattern under the board symmetries."""
+    squares = [bitboard.square(x, y) for x, y in base]
+    placements: List[Tuple[int, ...]] = []
+    seen = set()
+    for t in range(bitboard.SYMMETRIES):
+        placement = tuple(bitboard.SQUARE_MAPS[t][sq] for sq in squares)
+        if frozenset(placement) not in seen:
+            seen.add(frozenset(placement))
+            placements.append(placement)
+    return placements
+
+
+def _layout() -> Tuple[np.ndarray, np.ndarray, int]:
+    """Return ``(contrib, offsets, size)`` for :data:`PATTERNS`.
+
+    ``contrib[sq, k]`` is the power of 3 that square ``sq`` contributes
+    to instance ``k`` (0 if it is not part of it); ``offsets[k]`` is the
+    start of instance ``k``'s table in the flat weight array.
+    """
+    columns = []
+    offsets = []
+    size = 0
+    for base in PATTERNS.values():
+        for placement in _instances(base):
+            column = np.zeros(64, dtype=np.int64)
+            for i, sq in enumerate(placement):
+                column[sq] = 3 ** i
+            columns.append(column)
+            offsets.append(size)
+        size += 3 ** len(base)
+    return np.stack(columns, axis=1), np.array(offsets, dtype=np.int64), size
+
+
+CONTRIB, OFFSETS, TABLE_SIZE = _layout()
+NUM_INSTANCES: int = len(OFFSETS)
+
+
+class NTupleEvaluator:
+    """Sum of pattern-table weights; ``weights`` is the flat array of all tables."""
+
+    def __init__(self, weights: Optional[np.ndarray] = None) -> None:
+        if weights is None:
+            weights = np.zeros(TABLE_SIZE)
+        elif weights.shape != (TABLE_SIZE,):
+            raise ValueError(f"expected {TABLE_SIZE} weights, got {weights.shape}")
+        self.weights = weights
+
+    def indices(self, own: int, opp: int) -> np.ndarray:
+        """Return the flat weight index of every instance for the side owning ``own``."""
+        digits = square_bits(np.array([own, opp], dtype=np.uint64)).astype(np.int64)
+        return OFFSETS + (digits[0] + 2 * digits[1]) @ CONTRIB
+
+    def evaluate(self, own: int, opp: int) -> float:
+        """Return the value of the position for the side owning ``own``."""
+        return float(self.weights[self.indices(own, opp)].sum())
+
+    def score_moves(self, own: int, opp: int, moves: Sequence[Tuple[int, int]],
+                    base: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Score the ``(square, flips)`` moves of the side owning ``own``.
+
+        Returns ``(values, indices)``: the value after each move for the
+        mover, and the ``(len(moves), NUM_INSTANCES)`` flat indices it was
+        read from (what :meth:`update` needs to train on that position).
+        ``base`` are the indices of ``(own, opp)`` if the caller already
+        has them; otherwise they are computed.
+        """
+        if base is None:
+            base = self.indices(own, opp)
+        squares = np.array([sq for sq, _ in moves], dtype=np.int64)
+        flips = square_bits(np.array([f for _, f in moves], dtype=np.uint64)).astype(np.int64)
+        # Placed square: 0 -> 1 (own); flipped squares: 2 -> 1 (opponent to own)
+        after = base + CONTRIB[squares] - flips @ CONTRIB
+        return self.weights[after].sum(axis=1), after
+
+    def score_positions(self, own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+        """Return the values of many positions given as ``uint64`` bitboard arrays."""
+        digits = square_bits(own).astype(np.int64) + 2 * square_bits(opp).astype(np.int64)
+        return self.weights[OFFSETS + digits @ CONTRIB].sum(axis=1)
+
+    def update(self, indices: np.ndarray, delta: float) -> None:
+        """Add ``delta`` to the entries read at ``indices`` (a sparse gradient step)."""
+        np.add.at(self.weights, indices, delta)
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, weights=self.weights, patterns=np.array(list(PATTERNS)))
+
+    @classmethod
+    def load(cls, path: str) -> "NTupleEvaluator":
+        with np.load(path) as data:
+            if list(data["patterns"]) != list(PATTERNS):
+                raise ValueError(f"{path}: tables were trained for other patterns")
+            return cls(data["weights"])
+
+
+def after_opponent_move(indices: np.ndarray, move: Tuple[int, int],
+                        flips: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """Return ``indices`` (of the side owning ``own``) after the opponent plays ``move``."""
+    squares = [bitboard.square(*move)] + [bitboard.square(*f) for f in flips]
+    delta = CONTRIB[squares]
+    # Placed square: 0 -> 2 (opponent); flipped squares: 1 -> 2 (own to opponent)
+    return indices + delta[0] + delta.sum(axis=0)
+
+
+def play_game_td(evaluator: NTupleEvaluator, epsilon: float, alpha: float) -> float:
+    """Play one training game against the random opponent, learning with TD(0).
+
+    The evaluator values the afterstates of the AI (black). After each of
+    its moves the entries of the previous afterstate move towards the new
+    value, and the last ones towards the final result (+1, -1 or 0).
+    ``alpha`` is shared among the instances. Returns the result.
+    """
+    state = game_logic.GameState()
+    step = alpha / NUM_INSTANCES
+    prev_indices: Optional[np.ndarray] = None
+    prev_value = 0.0
+    # Indices of the current position for black, kept up to date after the first AI move
+    base: Optional[np.ndarray] = None
+    while not state.is_terminal():
+        moves = state.moves()
+        if not moves:
+            state.pass_turn()
+            continue
+        if state.player == game_logic.BLACK:
+            own, opp = state.key()
+            values, indices = evaluator.score_moves(own, opp, game_logic.to_bitboard_moves(moves), base)
+            if random.random() < epsilon:
+                choice = random.randrange(len(moves))
+            else:
+                choice = int(np.argmax(values))
+            if prev_indices is not None:
+                evaluator.update(prev_indices, step * (values[choice] - prev_value))
+            prev_indices = base = indices[choice]
+            prev_value = float(evaluator.weights[prev_indices].sum())
+            state.play(*moves[choice])
+        else:
+            move, flips = random.choice(moves)
+            state.play(move, flips)
+            if base is not None:
+                base = after_opponent_move(base, move, flips)
+    black, white = game_logic.count_pieces(state.board)
+    reward = float((black > white) - (black < white))
+    if prev_indices is not None:
+        evaluator.update(prev_indices, step * (reward - prev_value))
+    return reward
+
+
+def train_ntuple(num_games: int, epsilon_start: float = 1.0, epsilon_end: float = 0.1, alpha: float = 0.5,
+                 evaluator: Optional[NTupleEvaluator] = None) -> NTupleEvaluator:
+    """Train an evaluator (new, or ``evaluator`` in place) with :func:`play_game_td`.
+
+    Epsilon decays linearly as in :func:`rl_agent.train_agent`.
+    """
+    if evaluator is None:
+        evaluator = NTupleEvaluator()
+    for game_index in range(num_games):
+        t = game_index / max(1, num_games - 1)
+        play_game_td(evaluator, epsilon_start * (1 - t) + epsilon_end * t, alpha)
+    return evaluator
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python3 ntuple.py [jogos] [ficheiro.npz]
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    path = sys.argv[2] if len(sys.argv) > 2 else "ntuple.npz"
+    train_ntuple(games).save(path)
+    print(f"Tabelas guardadas em {path}")
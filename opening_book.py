@@ -0,0 +1,210 @@
+"""
+Opening book: stored moves for the first plies of the game.
+
+Every game starts from the same position, so the first moves are
+evaluated over and over. :func:`build_book` plays self-play games (with
+the linear agent, or with a shallow :mod:`search` for the greedy moves)
+and records, for each position of the first plies, how often each move
+was played and its mean result. :func:`write_book` keeps the best move
+of each position in a compact binary file, and :class:`OpeningBook`
+memory-maps such a file and answers lookups in constant time.
+
+Positions are stored in their canonical form (see
+:func:`bitboard.canonical`), so the 8 symmetric versions of a position
+share one record and a lookup maps the stored move back to the board
+it was asked about.
+
+File layout (little-endian)::
+
+    header  magic b"RVOB", version u16, record size u16, slots u32, count u32
+    slots   ``slots`` records of (own u64, opp u64, square u8, visits u32, score f32)
+
+``slots`` is a power of two and records are placed by open addressing
+with linear probing on a hash of ``(own, opp)``; unused slots are all
+zero (no real position has both bitboards empty).
+"""
+
+from __future__ import annotations
+
+import mmap
+import random
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import bitboard
+import game_logic
+import rl_agent
+import search
+
+MAGIC = b"RVOB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+RECORD = struct.Struct("<QQBIf")
+
+# Book entry: (square, visits, mean result for the side to move)
+BookEntry = Tuple[int, int, float]
+
+_FULL = bitboard.FULL
+_HASH_OWN = 0x9E3779B97F4A7C15
+_HASH_OPP = 0xC2B2AE3D27D4EB4F
+
+
+def _hash(own: int, opp: int) -> int:
+    """Return a 64-bit hash of a position, well mixed in its high bits."""
+    return ((own * _HASH_OWN) ^ (opp * _HASH_OPP)) * _HASH_OWN & _FULL
+
+
+def _table_bits(count: int) -> int:
+    """Return log2 of the slot count for ``count`` records (load factor <= 1/2)."""
+    bits = 1
+    while (1 << bits) < 2 * count:
+        bits += 1
+    return bits
+
+
+def build_book(weights: Sequence[float], num_games: int = 2000, max_plies: int = 10,
+               epsilon: float = 0.3, search_depth: int = 0, min_visits: int = 4,
+               seed: Optional[int] = None) -> Dict[Tuple[int, int], BookEntry]:
+    """Play ``num_games`` self-play games and return the book they support.
+
+    Both sides play epsilon-greedy moves: with probability ``epsilon`` a
+    random move, otherwise the move of :func:`rl_agent.choose_action`
+    (or of a ``search_depth``-ply alpha-beta search if ``search_depth``
+    is positive). The positions of the first ``max_plies`` plies are
+    recorded with the move played and the final result.
+
+    Returns ``{(own, opp): (square, visits, score)}`` keyed by canonical
+    position: for each position, the move with the best mean result among
+    those played at least ``min_visits`` times.
+    """
+    rng = random.Random(seed)
+    searcher = search.AlphaBetaSearch(weights) if search_depth > 0 else None
+    # stats[position][square] = [visits, sum of results for the side to move]
+    stats: Dict[Tuple[int, int], Dict[int, List[float]]] = {}
+    for _ in range(num_games):
+        state = game_logic.GameState()
+        history: List[Tuple[Tuple[int, int], int, int]] = []
+        while not state.is_terminal():
+            moves = state.moves()
+            if not moves:
+                state.pass_turn()
+                continue
+            if rng.random() < epsilon:
+                move, flips = rng.choice(moves)
+            elif searcher is not None:
+                own, opp = state.key()
+                move = bitboard.coords(searcher.search_root(own, opp, search_depth)[0][0])
+                flips = None
+            else:
+                move, _ = rl_agent.choose_action(state.board, state.player, weights, 0.0, moves)
+                flips = None
+            if len(history) < max_plies:
+                own, opp, t = bitboard.canonical(*state.key())
+                sq = bitboard.SQUARE_MAPS[t][bitboard.square(*move)]
+                history.append(((own, opp), sq, state.player))
+            state.play(move, flips)
+        black, white = game_logic.count_pieces(state.board)
+        result = (black > white) - (black < white)
+        for key, sq, player in history:
+            record = stats.setdefault(key, {}).setdefault(sq, [0, 0.0])
+            record[0] += 1
+            record[1] += result if player == game_logic.BLACK else -result
+    book: Dict[Tuple[int, int], BookEntry] = {}
+    for key, moves_stats in stats.items():
+        best: Optional[BookEntry] = None
+        for sq, (visits, total) in moves_stats.items():
+            if visits >= min_visits and (best is None or total / visits > best[2]):
+                best = (sq, int(visits), total / visits)
+        if best is not None:
+            book[key] = best
+    return book
+
+
+def write_book(path: str, book: Dict[Tuple[int, int], BookEntry]) -> None:
+    """Write ``book`` (as returned by :func:`build_book`) to ``path``.
+
+    Keys must be canonical positions.
+    """
+    bits = _table_bits(len(book))
+    slots = 1 << bits
+    mask = slots - 1
+    table: List[Optional[Tuple[int, int, int, int, float]]] = [None] * slots
+    for (own, opp), (sq, visits, score) in book.items():
+        i = _hash(own, opp) >> (64 - bits)
+        while table[i] is not None:
+            i = (i + 1) & mask
+        table[i] = (own, opp, sq, visits, score)
+    data = bytearray(HEADER.size + slots * RECORD.size)
+    HEADER.pack_into(data, 0, MAGIC, VERSION, RECORD.size, slots, len(book))
+    for i, record in enumerate(table):
+        if record is not None:
+            RECORD.pack_into(data, HEADER.size + i * RECORD.size, *record)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class OpeningBook:
+    """Read-only, memory-mapped view of a book file written by :func:`write_book`.
+
+    Only the pages that lookups touch are read from disk. A book can be
+    passed to worker processes: it pickles as its path and is mapped
+    again on the other side.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < HEADER.size:
+            raise ValueError(f"{path}: not an opening book")
+        magic, version, record_size, slots, count = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            raise ValueError(f"{path}: not an opening book (or unsupported version)")
+        if slots & (slots - 1) or len(self._data) != HEADER.size + slots * RECORD.size:
+            raise ValueError(f"{path}: corrupt opening book")
+        self._mask = slots - 1
+        self._shift = 64 - (slots.bit_length() - 1)
+        self.count = count
+
+    def __reduce__(self):
+        return OpeningBook, (self.path,)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        self._data.close()
+
+    def lookup(self, own: int, opp: int) -> Optional[BookEntry]:
+        """Return the entry for a position as ``(square, visits, score)``, or None.
+
+        ``own`` and ``opp`` need not be canonical; ``square`` is given on
+        the board as passed in.
+        """
+        c_own, c_opp, t = bitboard.canonical(own, opp)
+        data = self._data
+        i = _hash(c_own, c_opp) >> self._shift
+        while True:
+            r_own, r_opp, sq, visits, score = RECORD.unpack_from(data, HEADER.size + i * RECORD.size)
+            if r_own == c_own and r_opp == c_opp:
+                return bitboard.SQUARE_MAPS[bitboard.INVERSE[t]][sq], visits, score
+            if not (r_own or r_opp):
+                return None
+            i = (i + 1) & self._mask
+
+    def probe(self, board: List[List[int]], player: int) -> Optional[Tuple[int, int]]:
+        """Return the book move for ``player`` on ``board``, or None if it is not in the book."""
+        entry = self.lookup(*game_logic.to_bitboards(board, player))
+        return None if entry is None else bitboard.coords(entry[0])
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Uso: python3 opening_book.py [pesos.json] [livro.bin] [jogos]
+    weights_path = sys.argv[1] if len(sys.argv) > 1 else "weights.json"
+    book_path = sys.argv[2] if len(sys.argv) > 2 else "opening_book.bin"
+    games = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+    entries = build_book(rl_agent.load_weights(weights_path), num_games=games, seed=0)
+    write_book(book_path, entries)
+    print(f"{len(entries)} posições guardadas em {book_path}")
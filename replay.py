@@ -0,0 +1,71 @@
+"""
+Experience replay buffer for training the linear agent.
+
+:class:`ReplayBuffer` keeps the most recent ``capacity`` positions the
+agent played, each as its feature vector, the final reward of its game
+and the game's index, in preallocated NumPy arrays used as a ring
+buffer. Training (see :func:`rl_agent.train_agent_replay`) samples
+mini-batches from it and applies each update as one vectorised step,
+so positions are reused across several updates and the learner does
+not have to keep pace with the games being played.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class ReplayBuffer:
+    """Fixed-capacity ring buffer of ``(features, reward, game id)`` records.
+
+    Once full, each new position overwrites the oldest one. ``dtype`` is
+    the storage type of the features (e.g. ``np.uint8`` for 0/1 inputs).
+    ``games`` counts the games added over the buffer's lifetime and
+    numbers them, so ids stay unique across training calls.
+    """
+
+    def __init__(self, capacity: int = 50_000, num_features: int = 4, dtype=np.float64) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.features = np.zeros((capacity, num_features), dtype=dtype)
+        self.rewards = np.zeros(capacity)
+        self.game_ids = np.zeros(capacity, dtype=np.int64)
+        self._next = 0
+        self._size = 0
+        self.games = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add_game(self, trajectory: Sequence[Sequence[float]], reward: float,
+                 game_id: Optional[int] = None) -> None:
+        """Store every position of one game, all labelled with its final ``reward``.
+
+        ``game_id`` defaults to the number of games added before this one.
+        """
+        if game_id is None:
+            game_id = self.games
+        self.games += 1
+        n = len(trajectory)
+        if n == 0:
+            return
+        features = np.asarray(trajectory, dtype=self.features.dtype)
+        if n > self.capacity:
+            features = features[-self.capacity:]
+            n = self.capacity
+        index = (self._next + np.arange(n)) % self.capacity
+        self.features[index] = features
+        self.rewards[index] = reward
+        self.game_ids[index] = game_id
+        self._next = (self._next + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def sample(self, batch_size: int, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return ``(features, rewards, game_ids)`` of ``batch_size`` positions drawn with replacement."""
+        if self._size == 0:
+            raise ValueError("cannot sample from an empty buffer")
+        index = rng.integers(0, self._size, size=batch_size)
+        return self.features[index], self.rewards[index], self.game_ids[index]
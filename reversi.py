@@ -1,41 +1,132 @@
 import pygame
+import math
+import os
 import random
 import sys
-import time
-import copy
 import csv
+import threading
+import zlib
+from concurrent.futures import Future, wait
 from variaveis import *
-from rl_agent import load_weights, choose_action
+from transposition import TranspositionCache
+import endgame
 import game_logic
+import mcts
+import search
 
 
-pygame.init()
 
-try:
-    AI_WEIGHTS = load_weights("weights.json")
-except Exception:
-    AI_WEIGHTS = [0.0, 0.0, 0.0, 0.0]
+# Importar este módulo não abre janelas nem lê ficheiros: o pygame, as imagens
+# e o som são iniciados em main(), e o motor da IA em carregarIA().
+
+# Motor da IA, criado por carregarIA()
+AI_WEIGHTS = None
+AI_SEARCH = None  # pesquisa alpha-beta; a tabela de transposição é mantida entre jogadas
+AI_MCTS = None  # motor alternativo: MCTS; a árvore é reutilizada entre jogadas
+AI_BOOK = None  # livro de aberturas (se existir): jogadas das primeiras posições sem pesquisa
+_AI_CARREGAR = threading.Lock()
+
+# A IA pesquisa numa thread em segundo plano (ver iniciarIA); AI_PARAR pede-lhe que pare
+AI_PARAR = threading.Event()
+AI_TAREFA = None  # Future da pesquisa em curso (jogada do PC ou ponderação)
     
 # Estado da UI/IA
 LAST_MOVE_PC = None
 LAST_MOVE_PLAYER = None
-LAST_AI_EPSILON = 0.05
 LAST_AI_FEATURES = None  # features do RL
 TRAINING_SUMMARY = None  # info do stats.csv (último checkpoint)
 
-# tentar ler o último checkpoint do treino (stats.csv)
-try:
-    with open("stats.csv", "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-        if rows:
-            TRAINING_SUMMARY = rows[-1]
-except Exception:
-    TRAINING_SUMMARY = None
+
+def carregarIA():
+    # Cria o motor da IA e lê o resumo do treino, uma só vez. main() chama-a numa
+    # thread ao abrir a janela; getMovePc e executarGame chamam-na antes de usar a IA
+    # (esperam se ainda estiver a carregar).
+    global AI_WEIGHTS, AI_SEARCH, AI_MCTS, AI_BOOK, TRAINING_SUMMARY
+    with _AI_CARREGAR:
+        if AI_SEARCH is not None:
+            return
+        # Importados aqui: puxam o numpy, que atrasaria o arranque da janela
+        from rl_agent import load_weights
+        from opening_book import OpeningBook
+
+        try:
+            AI_WEIGHTS = load_weights("weights.json")
+        except Exception:
+            AI_WEIGHTS = [0.0, 0.0, 0.0, 0.0]
+        if MOTOR_IA == 'mcts':
+            AI_MCTS = mcts.MCTS(workers=PROCESSOS_MCTS)
+            AI_MCTS.stop = AI_PARAR
+        try:
+            AI_BOOK = OpeningBook(LIVRO_ABERTURAS)
+        except (OSError, ValueError):
+            AI_BOOK = None
+
+        # tentar ler o último checkpoint do treino (stats.csv)
+        try:
+            with open("stats.csv", "r", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                rows = list(reader)
+                if rows:
+                    TRAINING_SUMMARY = rows[-1]
+        except Exception:
+            TRAINING_SUMMARY = None
+
+        searcher = search.AlphaBetaSearch(AI_WEIGHTS, TranspositionCache(TAMANHO_TT))
+        searcher.stop = AI_PARAR
+        AI_SEARCH = searcher
+
+
+def tocarMusica():
+    # Música de fundo em streaming (mixer.music não descodifica o mp3 todo antes
+    # de tocar). Sem o ficheiro ou sem dispositivo de áudio, o jogo segue sem som.
+    try:
+        pygame.mixer.init()
+        pygame.mixer.music.load(SOM_JOGO)
+        pygame.mixer.music.set_volume(0.7)
+        pygame.mixer.music.play()
+    except (pygame.error, OSError):
+        pass
+
+
+def carregarFundo():
+    # Fundo da janela com a imagem do tabuleiro, já escalados. A imagem composta
+    # fica em CACHE_IMAGENS (BMP, sem descompressão) e é reaproveitada enquanto os
+    # JPEG e as dimensões da janela não mudarem; senão é refeita e guardada.
+    fontes = ['arquivos/Fundo 1.jpg', 'arquivos/Fundo_tab_3.jpg']
+    chave = [WIN_LARGURA, WIN_ALTURA, LARGURA_QUAD * TAMANHO_ESPACO, ALTURA_QUAD * TAMANHO_ESPACO, XMARGEM, YMARGEM]
+    for nome in fontes:
+        info = os.stat(nome)
+        chave += [nome, info.st_size, info.st_mtime_ns]
+    caminho = os.path.join(CACHE_IMAGENS, 'fundo-%08x.bmp' % zlib.crc32(repr(chave).encode()))
+    try:
+        return pygame.image.load(caminho).convert()
+    except (pygame.error, OSError):
+        pass
+
+    # Configure a imagem de fundo. 
+    Imag_quadro = pygame.image.load(fontes[1]).convert_alpha()
+    # scale() para ajustar a imagem. 
+    Imag_quadro = pygame.transform.scale(Imag_quadro, (LARGURA_QUAD * TAMANHO_ESPACO, ALTURA_QUAD * TAMANHO_ESPACO))
+    Imag_quadroRect = Imag_quadro.get_rect()
+    Imag_quadroRect.topleft = (XMARGEM, YMARGEM)
+    fundo = pygame.image.load(fontes[0])
+    fundo = pygame.transform.scale(fundo, (WIN_LARGURA, WIN_ALTURA))
+    fundo.blit(Imag_quadro, Imag_quadroRect)
+    try:
+        os.makedirs(CACHE_IMAGENS, exist_ok=True)
+        pygame.image.save(fundo, caminho)
+    except (pygame.error, OSError):
+        pass  # sem cache (ex.: pasta só de leitura): fica para a próxima
+    return fundo.convert()
 
 
 def main(): # Inicializa a tela do jogo, carrega imagens de fundo, e inicia o loop principal do jogo.
-    global MAIN_CLOCK, EXIBIR_JANELA, FONTE, BIGFONTE, BGIMAGEM
+    global MAIN_CLOCK, EXIBIR_JANELA, FONTE, BIGFONTE, BGIMAGEM, TELA
+
+    pygame.init()
+    # A IA e a música carregam em segundo plano enquanto o menu aparece
+    threading.Thread(target=carregarIA, daemon=True).start()
+    threading.Thread(target=tocarMusica, daemon=True).start()
 
     EXIBIR_JANELA = pygame.display.set_mode((WIN_LARGURA, WIN_ALTURA))
     pygame.display.set_caption('Reversi')
@@ -43,15 +134,8 @@ def main(): # Inicializa a tela do jogo, carrega imagens de fundo, e inicia o lo
     BIGFONTE = pygame.font.Font('freesansbold.ttf', 30)
     MAIN_CLOCK = pygame.time.Clock()
 
-    # Configure a imagem de fundo. 
-    Imag_quadro = pygame.image.load('arquivos/Fundo_tab_3.jpg').convert_alpha()
-    # scale() para ajustar a imagem. 
-    Imag_quadro = pygame.transform.scale(Imag_quadro, (LARGURA_QUAD * TAMANHO_ESPACO, ALTURA_QUAD * TAMANHO_ESPACO))
-    Imag_quadroRect = Imag_quadro.get_rect()
-    Imag_quadroRect.topleft = (XMARGEM, YMARGEM)
-    BGIMAGEM = pygame.image.load('arquivos/Fundo 1.jpg')
-    BGIMAGEM = pygame.transform.scale(BGIMAGEM, (WIN_LARGURA, WIN_ALTURA))
-    BGIMAGEM.blit(Imag_quadro, Imag_quadroRect)
+    BGIMAGEM = carregarFundo()
+    TELA = TelaTabuleiro(EXIBIR_JANELA, BGIMAGEM)
       
     menu_inicial()
     # Loop que mantenha a janela aberta
@@ -60,14 +144,6 @@ def main(): # Inicializa a tela do jogo, carrega imagens de fundo, e inicia o lo
             break
 
 
-pygame.mixer.init() # Inicialize o Pygame e o mixer
-SOM_JOGO = pygame.mixer.Sound(SOM_JOGO) # Carregue o arquivo de áudio
-pygame.time.Clock().tick(FPS)
-SOM_JOGO.play() # Reproduza o áudio
-pygame.mixer.music.set_volume(0.7)
-# Mantenha o programa em execução para permitir a reprodução
-
-
 def menu_inicial():
     # Dimensões do painel
     panel_w, panel_h = 700, 420
@@ -97,63 +173,69 @@ def menu_inicial():
     exitRect = exitSurf.get_rect()
     exitRect.center = (WIN_LARGURA // 2, panel_y + 310)
 
-    while True:
-        EXIBIR_JANELA.blit(BGIMAGEM, BGIMAGEM.get_rect())
-
-        # Painel escuro para legibilidade
-        panel = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
-        panel.fill((0, 0, 0, 150))
-        EXIBIR_JANELA.blit(panel, (panel_x, panel_y))
-
-        # Desenhar textos
-        EXIBIR_JANELA.blit(titleSurf, titleRect)
-        EXIBIR_JANELA.blit(
-            info1,
-            (WIN_LARGURA // 2 - info1.get_width() // 2, panel_y + 120)
-        )
-        EXIBIR_JANELA.blit(
-            info2,
-            (WIN_LARGURA // 2 - info2.get_width() // 2, panel_y + 145)
-        )
+    # O menu é estático: desenhado uma vez, depois só se tratam eventos
+    EXIBIR_JANELA.blit(BGIMAGEM, BGIMAGEM.get_rect())
+
+    # Painel escuro para legibilidade
+    panel = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 150))
+    EXIBIR_JANELA.blit(panel, (panel_x, panel_y))
+
+    # Desenhar textos
+    EXIBIR_JANELA.blit(titleSurf, titleRect)
+    EXIBIR_JANELA.blit(
+        info1,
+        (WIN_LARGURA // 2 - info1.get_width() // 2, panel_y + 120)
+    )
+    EXIBIR_JANELA.blit(
+        info2,
+        (WIN_LARGURA // 2 - info2.get_width() // 2, panel_y + 145)
+    )
 
-        # Botões
-        EXIBIR_JANELA.blit(playSurf, playRect)
-        EXIBIR_JANELA.blit(exitSurf, exitRect)
+    # Botões
+    EXIBIR_JANELA.blit(playSurf, playRect)
+    EXIBIR_JANELA.blit(exitSurf, exitRect)
+    pygame.display.update()
 
+    while True:
         # Eventos
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                sairJogo()
 
             if event.type == pygame.KEYUP and event.key == pygame.K_ESCAPE:
-                pygame.quit()
-                sys.exit()
+                sairJogo()
 
             if event.type == pygame.MOUSEBUTTONUP:
                 mx, my = event.pos
                 if playRect.collidepoint((mx, my)):
                     return "play"
                 if exitRect.collidepoint((mx, my)):
-                    pygame.quit()
-                    sys.exit()
+                    sairJogo()
 
-        pygame.display.update()
         MAIN_CLOCK.tick(FPS)
 
 
 def executarGame(): # 
     # Joga um Unico jogo cada vez que esta função é chamada. 
 
+    global LAST_MOVE_PC, LAST_MOVE_PLAYER
+
     #Renicie o tabuleiro e o jogo. 
-    placaPrincipal = getNovoQuadro()
-    redefinirPlaca(placaPrincipal)
+    LAST_MOVE_PC = None
+    LAST_MOVE_PLAYER = None
+    carregarIA()  # normalmente já carregada em segundo plano
     mostrarDIcas = False
-    turno = random.choice(['Pc', 'Jogador'])
+    turno = random.choice(['PC', 'Jogador'])
 
     # Desenhe o tabuleiro inicial e pergunte ao jogador qual cor ele deseja.
-    designTabu(placaPrincipal)
+    TELA.redesenhar()
+    designTabu(game_logic.create_board())
+    TELA.atualizar()
     peca_jogador, peca_Pc = solicPecaJogador()
+    # Estado do jogo no motor partilhado (game_logic): tabuleiro, vez e jogadas válidas
+    estado = game_logic.GameState(player=peca_jogador if turno == 'Jogador' else peca_Pc)
+    placaPrincipal = estado.board
     
     # Faça os objetos Surface e Rest para os botões "Novo jogo", "Sair" e "Dicas"
     # Botões do topo
@@ -169,87 +251,89 @@ def executarGame(): #
     sairRect = sairSurf.get_rect()
     sairRect.topright = (WIN_LARGURA - 20, 10)
 
+    # Tela limpa (sem a pergunta da cor) com os botões, desenhados uma vez
+    TELA.redesenhar()
+    EXIBIR_JANELA.blit(novoJogoSurf, novoJogoRect)
+    EXIBIR_JANELA.blit(dicasSurf, dicasRect)
+    EXIBIR_JANELA.blit(sairSurf, sairRect)
 
-
-    while True: # Loop principal do jogo
+    while not estado.is_terminal(): # Loop principal do jogo
         # Fica repetindo os turnos do jogador e do computador. 
+        # Jogadas válidas da posição atual: {(x, y): peças viradas}, calculadas uma vez por turno
+        jogadas = dict(estado.moves())
+        if not jogadas:
+            # Quem tem a vez não pode jogar: passa (o jogo acaba se nenhum dos dois puder)
+            estado.pass_turn()
+            continue
+        turno = 'Jogador' if estado.player == peca_jogador else 'PC'
         if turno == 'Jogador': # Vez do Jogador
-            if getMoveValidos(placaPrincipal, peca_jogador) == []:
-                # se for a vez do jogador, mas ele não conseguese mover e ntm termina o jogo. 
-                break
+            if PONDERAR:
+                # O PC pensa na posição do jogador enquanto este escolhe a jogada
+                iniciarIA(ponderar, copiarEstado(estado))
             moverxy = None
             while moverxy == None:
                 # Contunue fazendo loop até que o jogador usar clique em um espaço válido. 
-                if mostrarDIcas:
-                    espacoValido = getTabuMoveValidos(placaPrincipal, peca_jogador)
-                else:
-                    espacoValido = placaPrincipal
                 verificarSaida()
                 for event in pygame.event.get(): # Um loop de manipulação eventos
                     if event.type == pygame.MOUSEBUTTONUP:
                         # Eventos de clique do mouse
                         mouseX, mouseY = event.pos
                         if sairRect.collidepoint((mouseX, mouseY)):
-                            pygame.quit()
-                            sys.exit()
+                            sairJogo()
                         
                         if novoJogoRect.collidepoint((mouseX, mouseY)):
+                            pararIA()
                             return True
                         elif dicasRect.collidepoint((mouseX, mouseY)):
                             mostrarDIcas = not mostrarDIcas
                         # moverxy é difinido como uma coordenada XY de tuplas dois itens ou valor nenhum
                         moverxy = getEspacoClicado(mouseX, mouseY)
-                        if moverxy != None and not isMoveValido(placaPrincipal, peca_jogador, moverxy[0], moverxy[1]):
+                        if moverxy not in jogadas:
                             moverxy = None
                               
-                # Desenhe o tabuleiro do jogo. 
-                designTabu(espacoValido)
-                desenharInfo(espacoValido, peca_jogador, peca_Pc, turno)
-
-                # Desenhe os botões "Novo Jogo" e "Dicas". 
-                EXIBIR_JANELA.blit(novoJogoSurf, novoJogoRect)
-                EXIBIR_JANELA.blit(dicasSurf, dicasRect)
-                EXIBIR_JANELA.blit(sairSurf, sairRect)
+                # Desenhe o que mudou no tabuleiro (com as dicas, se ligadas) e no painel. 
+                designTabu(placaPrincipal, jogadas if mostrarDIcas else ())
+                desenharInfo(placaPrincipal, peca_jogador, peca_Pc, turno)
                 
                 MAIN_CLOCK.tick(FPS)
-                pygame.display.update()
+                TELA.atualizar()
 
             # Faça o movimento e termina o turno. 
-            fazerMover(placaPrincipal, peca_jogador, moverxy[0], moverxy[1], True)
-            LAST_MOVE_PLAYER = (moverxy[0], moverxy[1])
-            if getMoveValidos(placaPrincipal, peca_Pc) != []:
-                    # Defina apenas para o turno do Pc se ele puder fazer um move. 
-                    turno = 'PC'
+            fazerJogada(estado, moverxy, jogadas[moverxy])
+            LAST_MOVE_PLAYER = moverxy
         else:
             #Vez do computador
-            if getMoveValidos(placaPrincipal, peca_Pc) == []:
-                # Se foi definido para ser a vez do Pc, mas não conseguir se mover e então encerram o jogo.
-                break
-
-            # Desenhe o tabuleiro.
-            designTabu(placaPrincipal)
-            desenharInfo(placaPrincipal, peca_jogador, peca_Pc, turno)
-
-            # Desenhe os botões "Novo Jogo" e "Dicas".
-            EXIBIR_JANELA.blit(novoJogoSurf, novoJogoRect)
-            EXIBIR_JANELA.blit(dicasSurf, dicasRect)
+            # O Pc pensa em segundo plano (durante TEMPO_IA segundos); a janela continua a responder.
+            futuro = iniciarIA(getMovePc, copiarEstado(estado))
+            while not futuro.done():
+                verificarSaida()
+                for event in pygame.event.get():
+                    if event.type == pygame.MOUSEBUTTONUP:
+                        mouseX, mouseY = event.pos
+                        if sairRect.collidepoint((mouseX, mouseY)):
+                            sairJogo()
+                        if novoJogoRect.collidepoint((mouseX, mouseY)):
+                            # Cancela a pesquisa e começa outro jogo
+                            pararIA()
+                            return True
 
-            # O Pc está pousado em leitura.
-            pausaUntil = time.time() + random.randint(5, 15) * 0.1
-            while time.time() < pausaUntil:
-                pygame.display.update()
+                # Desenhe o tabuleiro.
+                designTabu(placaPrincipal)
+                desenharInfo(placaPrincipal, peca_jogador, peca_Pc, turno)
+                MAIN_CLOCK.tick(FPS)
+                TELA.atualizar()
 
             # Faça o movimento e termine o turno.
-            x, y = getMovePc(placaPrincipal, peca_Pc)
-            LAST_MOVE_PC = (x, y)
-            if x is None or y is None:
+            move = futuro.result()
+            LAST_MOVE_PC = move
+            if move is None:
                 break
-            fazerMover(placaPrincipal, peca_Pc, x, y, True)
-            # O jogador fazer um movimento se o puder fazer.
-            turno = 'Jogador'
+            fazerJogada(estado, move, jogadas[move])
 
     # Exibe a pontuação final.
+    pararIA()  # ponderação que ainda esteja a correr
     designTabu(placaPrincipal)
+    desenharInfo(placaPrincipal, peca_jogador, peca_Pc, turno)
     ponto = getPontoTabu(placaPrincipal)
 
     # Determine o texto da mensagem a ser exibida.
@@ -282,6 +366,11 @@ def executarGame(): #
     semRect = semSurf.get_rect()
     semRect.center = (int(WIN_LARGURA / 2) + 60, int(WIN_ALTURA / 2) + 90)
 
+    EXIBIR_JANELA.blit(texto2Surf, texto2Rect)
+    EXIBIR_JANELA.blit(simSurf, simRect)
+    EXIBIR_JANELA.blit(semSurf, semRect)
+    TELA.atualizar(textoRect, texto2Rect, simRect, semRect)
+
     while True:
         # Processe eventos até que o usuário clique em Sim ou Não
         verificarSaida()
@@ -292,11 +381,6 @@ def executarGame(): #
                     return True
                 elif semRect.collidepoint((mouseX, mouseY)):
                     return False
-        EXIBIR_JANELA.blit(textoSurf, textoRect)
-        EXIBIR_JANELA.blit(texto2Surf, texto2Rect)
-        EXIBIR_JANELA.blit(simSurf, simRect)
-        EXIBIR_JANELA.blit(semSurf, semRect)
-        pygame.display.update()
         MAIN_CLOCK.tick(FPS)
 
 
@@ -313,7 +397,9 @@ def moverPecasTabu(virarPecas, corPecas, adicionarBloco):
         adicionarCorPecas = BLACK
     adicionarPecaX, adicionarPecaY = coordPixelQuadro(adicionarBloco[0], adicionarBloco[1])
     pygame.draw.circle(EXIBIR_JANELA, adicionarCorPecas, (adicionarPecaX, adicionarPecaY), int(TAMANHO_ESPACO / 2) - 4)
-    pygame.display.update()
+    pygame.display.update(retanguloCasa(*adicionarBloco))
+    # Só as casas viradas mudam durante a animação
+    casasViradas = [retanguloCasa(x, y) for x, y in virarPecas]
 
     for ValoresRGB in range(0, 255, int(ANIMACAO_SPEED * 2.55)):
          if ValoresRGB > 255:
@@ -329,59 +415,108 @@ def moverPecasTabu(virarPecas, corPecas, adicionarBloco):
          for x, y in virarPecas:
             centroX, centroY = coordPixelQuadro(x, y)
             pygame.draw.circle(EXIBIR_JANELA, cor, (centroX, centroY), int(TAMANHO_ESPACO / 2) - 4)
-         pygame.display.update()
+         pygame.display.update(casasViradas)
          MAIN_CLOCK.tick(FPS)
          verificarSaida()
 
 
-def designTabu(quadro):
-    # Desenhe o fundo do tabuleiro.
-    EXIBIR_JANELA.blit(BGIMAGEM, BGIMAGEM.get_rect())
-
-    # Desenhe linhas de grade do quadro.
-    for x in range(LARGURA_QUAD + 1):
-        # Desenhe as linhas horizontais.
-        iniciarX = (x * TAMANHO_ESPACO) + XMARGEM
-        iniciarY = YMARGEM
-        fimX = (x * TAMANHO_ESPACO) + XMARGEM
-        fimY = YMARGEM + (ALTURA_QUAD * TAMANHO_ESPACO)
-        pygame.draw.line(EXIBIR_JANELA, CORLINHAMATRIZ, (iniciarX, iniciarY), (fimX, fimY))
-    for y in range(ALTURA_QUAD + 1):
-        # Desenhe as linhas verticais.
-        iniciarX = XMARGEM
-        iniciarY = (y * TAMANHO_ESPACO) + YMARGEM
-        fimX = XMARGEM + (LARGURA_QUAD * TAMANHO_ESPACO)
-        fimY = (y * TAMANHO_ESPACO) + YMARGEM
-        pygame.draw.line(EXIBIR_JANELA, CORLINHAMATRIZ, (iniciarX, iniciarY), (fimX, fimY))
-
-    # Desenhe os ladrilhos pretos e brancos ou os pontos de dicas.
-    for x in range(LARGURA_QUAD):
-        for y in range(ALTURA_QUAD):
-            centroX, centroY = coordPixelQuadro(x, y)
-            if quadro[x][y] == PECA_BRANCA or quadro[x][y] == PECA_PRETA:
-                if quadro[x][y] == PECA_BRANCA:
-                    corPecas = WHITE
-                else:
-                    corPecas = BLACK
-                pygame.draw.circle(EXIBIR_JANELA, corPecas, (centroX, centroY), int(TAMANHO_ESPACO / 2) - 4)
-            if quadro[x][y] == TELHA_DICAS:
-                pygame.draw.rect(EXIBIR_JANELA, CORDADICA, (centroX - 4, centroY - 4, 8, 8))
-
-    # Highlight da ultima jogada
-    H_PLAYER = (0, 120, 255)
-    H_PC = (255, 200, 0)
-    
-    def _draw_highlight(move, color):
-        if move is None:
+def retanguloCasa(x, y):
+    # Retângulo da casa (x, y) na janela, incluindo as linhas da grelha à volta.
+    return pygame.Rect(XMARGEM + x * TAMANHO_ESPACO, YMARGEM + y * TAMANHO_ESPACO, TAMANHO_ESPACO + 1, TAMANHO_ESPACO + 1)
+
+
+class TelaTabuleiro:
+    # Desenho do jogo por regiões alteradas ("dirty rects"). O fundo com a
+    # grelha fica numa superfície em cache; cada casa guarda o que foi
+    # desenhado nela e só é redesenhada quando muda, o painel de informação
+    # só quando os seus textos mudam, e atualizar() passa apenas esses
+    # retângulos a pygame.display.update(). Sem mudanças, um quadro não desenha nada.
+
+    def __init__(self, janela, fundo):
+        self.janela = janela
+        # Fundo estático: imagem com o tabuleiro e as linhas da grelha
+        self.fundo = fundo.copy()
+        for x in range(LARGURA_QUAD + 1):
+            # Linhas verticais
+            linhaX = (x * TAMANHO_ESPACO) + XMARGEM
+            pygame.draw.line(self.fundo, CORLINHAMATRIZ, (linhaX, YMARGEM), (linhaX, YMARGEM + (ALTURA_QUAD * TAMANHO_ESPACO)))
+        for y in range(ALTURA_QUAD + 1):
+            # Linhas horizontais
+            linhaY = (y * TAMANHO_ESPACO) + YMARGEM
+            pygame.draw.line(self.fundo, CORLINHAMATRIZ, (XMARGEM, linhaY), (XMARGEM + (LARGURA_QUAD * TAMANHO_ESPACO), linhaY))
+        # Painel da IA (semi-transparente) e linha da pontuação
+        self.painelRect = pygame.Rect(10, 40, WIN_LARGURA - 40, 70)
+        self.painel = pygame.Surface(self.painelRect.size, pygame.SRCALPHA)
+        self.painel.fill((0, 0, 0, 140))  # preto com alpha
+        self.pontoRect = pygame.Rect(0, WIN_ALTURA - 32, WIN_LARGURA, 32)
+        # Faixa redesenhada com o painel (os textos longos passam da borda dele)
+        self.faixaRect = pygame.Rect(0, self.painelRect.top, WIN_LARGURA, self.painelRect.height)
+        self.redesenhar()
+
+    def redesenhar(self):
+        # Repõe o fundo na janela inteira e esquece o que estava desenhado
+        # (ex.: depois de um texto por cima do tabuleiro).
+        self.janela.blit(self.fundo, (0, 0))
+        self.casas = [[None] * ALTURA_QUAD for _ in range(LARGURA_QUAD)]
+        self.textos = None
+        self.sujos = [self.janela.get_rect()]
+
+    def desenharCasas(self, quadro, dicas=(), destaques=None):
+        # Redesenha as casas cuja peça, dica ou destaque ({casa: cor}) mudou.
+        destaques = destaques or {}
+        for x in range(LARGURA_QUAD):
+            for y in range(ALTURA_QUAD):
+                casa = (quadro[x][y], (x, y) in dicas, destaques.get((x, y)))
+                if casa == self.casas[x][y]:
+                    continue
+                self.casas[x][y] = casa
+                rect = retanguloCasa(x, y)
+                self.janela.blit(self.fundo, rect, rect)
+                peca, dica, corDestaque = casa
+                centroX, centroY = coordPixelQuadro(x, y)
+                if peca != ESPACO_VAZIO:
+                    corPecas = WHITE if peca == PECA_BRANCA else BLACK
+                    pygame.draw.circle(self.janela, corPecas, (centroX, centroY), int(TAMANHO_ESPACO / 2) - 4)
+                if dica:
+                    pygame.draw.rect(self.janela, CORDADICA, (centroX - 4, centroY - 4, 8, 8))
+                if corDestaque is not None:
+                    pygame.draw.rect(self.janela, corDestaque, (rect.left + 2, rect.top + 2, TAMANHO_ESPACO - 4, TAMANHO_ESPACO - 4), 3)
+                self.sujos.append(rect)
+
+    def desenharPainel(self, textoPonto, linhas):
+        # Redesenha a pontuação e as linhas do painel se algum texto mudou.
+        textos = (textoPonto, tuple(linhas))
+        if textos == self.textos:
             return
-        x, y = move
-        # retângulo da célula
-        left = XMARGEM + x * TAMANHO_ESPACO
-        top = YMARGEM + y * TAMANHO_ESPACO
-        pygame.draw.rect(EXIBIR_JANELA, color, (left+2, top+2, TAMANHO_ESPACO-4, TAMANHO_ESPACO-4), 3)
-
-    _draw_highlight(LAST_MOVE_PLAYER, H_PLAYER)
-    _draw_highlight(LAST_MOVE_PC, H_PC)
+        self.textos = textos
+        for rect in (self.faixaRect, self.pontoRect):
+            self.janela.blit(self.fundo, rect, rect)
+        self.janela.blit(self.painel, self.painelRect)
+        for i, linha in enumerate(linhas):
+            if linha:
+                self.janela.blit(FONTE.render(linha, True, CORTEXTO), (self.painelRect.left + 10, self.painelRect.top + 5 + 22 * i))
+        pontoSurf = FONTE.render(textoPonto, True, CORTEXTO)
+        pontoRect = pontoSurf.get_rect()
+        pontoRect.bottomleft = (40, WIN_ALTURA - 8)
+        self.janela.blit(pontoSurf, pontoRect)
+        self.sujos += [self.faixaRect, self.pontoRect]
+
+    def atualizar(self, *rects):
+        # Mostra só as regiões alteradas (mais as de ``rects``, desenhadas por fora).
+        self.sujos.extend(rects)
+        if self.sujos:
+            pygame.display.update(self.sujos)
+            self.sujos = []
+
+
+def designTabu(quadro, dicas=()):
+    # Desenhe as peças e os pontos de dicas que mudaram, com o destaque das últimas jogadas.
+    destaques = {}
+    if LAST_MOVE_PLAYER is not None:
+        destaques[LAST_MOVE_PLAYER] = (0, 120, 255)
+    if LAST_MOVE_PC is not None:
+        destaques[LAST_MOVE_PC] = (255, 200, 0)
+    TELA.desenharCasas(quadro, dicas, destaques)
     
     
 def getEspacoClicado(mouseX, mouseY):
@@ -400,30 +535,17 @@ def desenharInfo(quadro, peca_jogador, peca_Pc, turno):
     # Pontuacao e turno
     ponto = getPontoTabu(quadro)
     texto_base = "Jogador: %s  /  PC: %s   Vez do: %s" % (str(ponto[peca_jogador]), str(ponto[peca_Pc]), turno.title())
-    pontourf = FONTE.render(texto_base, True, CORTEXTO)
-    pontoRect = pontourf.get_rect()
-    pontoRect.bottomleft = (40, WIN_ALTURA -8)
-    EXIBIR_JANELA.blit(pontourf, pontoRect)
 
     # Painel IA
-    y0 = 45
-    x0 = 20
-    
-    # Fundo do painel (semi-transparente) para legibilidade
-    panel_w = WIN_LARGURA - 40
-    panel_h = 70
-    panel = pygame.Surface((panel_w, panel_h), pygame.SRCALPHA)
-    panel.fill((0, 0, 0, 140))  # preto com alpha
-    EXIBIR_JANELA.blit(panel, (x0 - 10, y0 - 5))
-
-    model_line = f"IA: RL (linear) | epsilon={LAST_AI_EPSILON:.2f} | weights={ [round(w,2) for w in AI_WEIGHTS] }"
-    surf = FONTE.render(model_line, True, CORTEXTO)
-    EXIBIR_JANELA.blit(surf, (x0, y0))
+    if AI_MCTS is not None:
+        model_line = f"IA: MCTS | simulações={AI_MCTS.playouts} | processos={AI_MCTS.workers}"
+    else:
+        model_line = f"IA: RL (linear) + alpha-beta | prof.={AI_SEARCH.depth_reached} | weights={ [round(w,2) for w in AI_WEIGHTS] }"
+    linhas = [model_line, "", ""]
     
     # Última jogada do PC
     if LAST_MOVE_PC is not None:
-        surf2 = FONTE.render(f"Última jogada PC: {LAST_MOVE_PC}", True, CORTEXTO)
-        EXIBIR_JANELA.blit(surf2, (x0, y0 + 22))
+        linhas[1] = f"Última jogada PC: {LAST_MOVE_PC}"
 
     # Info do treino (se existir stats.csv)
     if TRAINING_SUMMARY is not None:
@@ -431,118 +553,18 @@ def desenharInfo(quadro, peca_jogador, peca_Pc, turno):
             tg = TRAINING_SUMMARY.get("trained_games", "?")
             wr_rand = float(TRAINING_SUMMARY.get("rand_win_rate", "0"))
             wr_greedy = float(TRAINING_SUMMARY.get("greedy_win_rate", "0"))
-            surf3 = FONTE.render(
-                f"Treino: {tg} jogos | win_rate vs Random={wr_rand:.2f} | vs Greedy={wr_greedy:.2f}",
-                True, CORTEXTO
-            )
-            EXIBIR_JANELA.blit(surf3, (x0, y0 + 44))
+            linhas[2] = f"Treino: {tg} jogos | win_rate vs Random={wr_rand:.2f} | vs Greedy={wr_greedy:.2f}"
         except Exception:
             pass
 
+    # Só é desenhado de novo se algum texto mudou
+    TELA.desenharPainel(texto_base, linhas)
+
     
     
-def redefinirPlaca(quadro):
-    # Anula o tabuleiro em que foi passado e configura as peças iniciais.
-    for x in range(LARGURA_QUAD):
-        for y in range(ALTURA_QUAD):
-            quadro[x][y] = ESPACO_VAZIO
-
-    # Adicione peças iniciais ao centro
-    quadro[3][3] = PECA_BRANCA
-    quadro[3][4] = PECA_PRETA
-    quadro[4][3] = PECA_PRETA
-    quadro[4][4] = PECA_BRANCA
-
-
-def getNovoQuadro():
-    # Cria uma estrutura de dados de tabuleiro totalmente nova e vazia.
-    quadro = []
-    for i in range(LARGURA_QUAD):
-        quadro.append([ESPACO_VAZIO] * ALTURA_QUAD)
-
-    return quadro
-
-
-def isMoveValido(quadro, telha, Xinicial, Yinicial):
-    # Retorna False se a jogada do jogador for inválida. Se for válido move, retorna uma lista de espaços das peças capturadas.
-    if quadro[Xinicial][Yinicial] != ESPACO_VAZIO or not quadroAtivo(Xinicial, Yinicial):
-        return False
-
-    quadro[Xinicial][Yinicial] = telha # define temporariamente o ladrilho no tabuleiro.
-    if telha == PECA_BRANCA:
-        outraTelha = PECA_PRETA
-    else:
-        outraTelha = PECA_BRANCA
-
-    virarPecas = []
-    # verifique cada uma das 8 direções:
-    for direcaoX, direcaoY in [[0, 1], [1, 1], [1, 0], [1, -1], [0, -1], [-1, -1], [-1, 0], [-1, 1]]:
-        x, y = Xinicial, Yinicial
-        x += direcaoX
-        y += direcaoY
-        if quadroAtivo(x, y) and quadro[x][y] == outraTelha:
-            # A peça pertence ao outro jogador próximo à nossa peça.
-            x += direcaoX
-            y += direcaoY
-            if not quadroAtivo(x, y):
-                continue
-            while quadro[x][y] == outraTelha:
-                x += direcaoX
-                y += direcaoY
-                if not quadroAtivo(x, y):
-                    break # break out do loop while, continuar no loop for
-            if not quadroAtivo(x, y):
-                continue
-            if quadro[x][y] == telha:
-                #Há peças para virar. Vá no sentido inverso até chegarmos ao espaço original, anotando todos as peças ao longo do caminho.
-                while True:
-                    x -= direcaoX
-                    y -= direcaoY
-                    if x == Xinicial and y == Yinicial:
-                        break
-                    virarPecas.append([x, y])
-
-    quadro[Xinicial][Yinicial] = ESPACO_VAZIO # Torna o espaço vazio
-    if len(virarPecas) == 0: # Se nenhuma peça for virada, este movimento é inválido
-        return False
-    return virarPecas
-
-
-def quadroAtivo(x, y):
-    # Retorna True se as coordenadas estiverem localizadas no quadro.
-    return x >= 0 and x < LARGURA_QUAD and y >= 0 and y < ALTURA_QUAD
-
-
-def getTabuMoveValidos(quadro, telha):
-    # Retorna um novo tabuleiro com marcações de dicas.
-    dupeQuadro = copy.deepcopy(quadro)
-
-    for x, y in getMoveValidos(dupeQuadro, telha):
-        dupeQuadro[x][y] = TELHA_DICAS
-    return dupeQuadro
-
-
-def getMoveValidos(quadro, telha):
-    # Retorna uma lista de tuplass (x,y) de todos os movimentos válidos.
-    MoveValidos = []
-
-    for x in range(LARGURA_QUAD):
-        for y in range(ALTURA_QUAD):
-            if isMoveValido(quadro, telha, x, y) != False:
-                MoveValidos.append((x, y))
-    return MoveValidos
-
-
 def getPontoTabu(quadro):
-    # Determine a pontuação contando as peças.
-    pontoBr = 0
-    pontoPr = 0
-    for x in range(LARGURA_QUAD):
-        for y in range(ALTURA_QUAD):
-            if quadro[x][y] == PECA_BRANCA:
-                pontoBr += 1
-            if quadro[x][y] == PECA_PRETA:
-                pontoPr += 1
+    # Pontuação: número de peças de cada cor.
+    pontoPr, pontoBr = game_logic.count_pieces(quadro)
     return {PECA_BRANCA:pontoBr, PECA_PRETA:pontoPr}
 
 
@@ -561,6 +583,12 @@ def solicPecaJogador():
     PrRect = PrSurf.get_rect()
     PrRect.center = (int(WIN_LARGURA / 2) + 60, int(WIN_ALTURA / 2) + 40)
 
+    # Desenhar a tela (uma vez: nada muda até ao clique)
+    EXIBIR_JANELA.blit(textoSurf, textoRect)
+    EXIBIR_JANELA.blit(brSurf, BrRect)
+    EXIBIR_JANELA.blit(PrSurf, PrRect)
+    TELA.atualizar(textoRect, BrRect, PrRect)
+
     while True:
         # Vai fazer o loop até que o jogador clique em uma cor.
         verificarSaida()
@@ -571,82 +599,94 @@ def solicPecaJogador():
                     return [PECA_BRANCA, PECA_PRETA]
                 elif PrRect.collidepoint((mouseX, mouseY)):
                     return [PECA_PRETA, PECA_BRANCA]
-
-        # Desenhar a tela
-        EXIBIR_JANELA.blit(textoSurf, textoRect)
-        EXIBIR_JANELA.blit(brSurf, BrRect)
-        EXIBIR_JANELA.blit(PrSurf, PrRect)
-        pygame.display.update()
         MAIN_CLOCK.tick(FPS)
 
 
-def fazerMover(quadro, telha, Xinicial, Yinicial, realMove=False):
-    # Coloque a peça no tabuleiro em x, y e vire as peças
-    # Retorna False se um movimento for inválido, True se for válido.
-    virarPecas = isMoveValido(quadro, telha, Xinicial, Yinicial)
-    
-    if virarPecas == False:
-        return False
+def fazerJogada(estado, jogada, virarPecas):
+    # Anima a jogada de quem tem a vez e aplica-a ao estado do jogo (virarPecas vem de estado.moves()).
+    moverPecasTabu(virarPecas, estado.player, jogada)
+    estado.play(jogada, virarPecas)
+
+
+def getMovePc(estado):
+    # Jogada do computador para a posição atual (quem tem a vez), ou None se tiver de passar.
+    carregarIA()
+    quadro, peca_Pc = estado.board, estado.player
+    # Abertura: jogada do livro, se a posição lá estiver
+    move = AI_BOOK.probe(quadro, peca_Pc) if AI_BOOK is not None else None
+    if move is None and estado.empties <= endgame.ENDGAME_EMPTIES:
+        # Fim de jogo: jogada perfeita com o solver exato (AI_PARAR interrompe-o)
+        move = endgame.endgame_move(quadro, peca_Pc, stop=AI_PARAR)
+    elif move is None and AI_MCTS is not None:
+        # MCTS durante TEMPO_IA segundos
+        move = mcts.mcts_move(quadro, peca_Pc, playouts=None, time_ms=TEMPO_IA * 1000,
+                              player_mcts=AI_MCTS)
+    elif move is None:
+        # Aprofundamento iterativo até esgotar TEMPO_IA; devolve a melhor jogada encontrada
+        move = search.best_move_timed(
+            quadro,
+            peca_Pc,
+            AI_WEIGHTS,
+            time_budget=TEMPO_IA,
+            searcher=AI_SEARCH
+        )
+    return move
     
-    quadro[Xinicial][Yinicial] = telha # Coloca a peça do jogador no tabuleiro na posição determinada.
-
-    if realMove:
-        moverPecasTabu(virarPecas, telha, (Xinicial, Yinicial))
 
-    for x, y in virarPecas:
-        quadro[x][y] = telha # Esta linha coloca a peça do jogador no tabuleiro nas posições invertidas.
-    return True
+def copiarEstado(estado):
+    # Cópia do estado para a thread da IA, que assim não partilha o tabuleiro da UI.
+    return game_logic.GameState([linha[:] for linha in estado.board], estado.player)
 
 
-def posicaoCanto(x, y):
-    # Retorna True se a posição estiver em um dos quatro cantos.
-    return (x == 0 and y == 0) or (x == LARGURA_QUAD-1 and y == 0) or \
-        (x == 0 and y == ALTURA_QUAD-1) or (x == LARGURA_QUAD-1 and y == ALTURA_QUAD-1)
+def ponderar(estado):
+    # Ponderação: pesquisa a posição do jogador até ser parada. Enche a tabela
+    # de transposição (ou a árvore MCTS) com as respostas do PC, e a pesquisa
+    # da jogada seguinte começa com esse trabalho feito.
+    own, opp = estado.key()
+    if AI_MCTS is not None:
+        AI_MCTS.run(own, opp)
+    else:
+        AI_SEARCH.search_timed(own, opp, math.inf)
 
 
-def converter_tabuleiro_para_rl(quadro, peca_Pc):
-    rl_board = [[game_logic.EMPTY for _ in range(8)] for _ in range(8)]
+def iniciarIA(funcao, *args):
+    # Corre funcao(*args) numa thread da IA e devolve um Future com o resultado,
+    # que o loop de eventos consulta com done(). A pesquisa anterior é parada
+    # primeiro: as pesquisas partilham AI_SEARCH e AI_MCTS.
+    global AI_TAREFA
+    if AI_TAREFA is not None:
+        AI_PARAR.set()
+        wait([AI_TAREFA])
+    AI_PARAR.clear()
+    futuro = AI_TAREFA = Future()
 
-    for x in range(LARGURA_QUAD):
-        for y in range(ALTURA_QUAD):
-            if quadro[x][y] == ESPACO_VAZIO:
-                rl_board[x][y] = game_logic.EMPTY
-            elif quadro[x][y] == peca_Pc:
-                rl_board[x][y] = game_logic.BLACK
-            else:
-                rl_board[x][y] = game_logic.WHITE
-
-    return rl_board
+    def correr():
+        try:
+            futuro.set_result(funcao(*args))
+        except BaseException as erro:
+            futuro.set_exception(erro)
 
+    # Thread daemon: não impede o programa de fechar a meio de uma pesquisa
+    threading.Thread(target=correr, daemon=True).start()
+    return futuro
 
-def getMovePc(quadro, peca_Pc):
-    if not getMoveValidos(quadro, peca_Pc):
-        return [None, None]
 
-    rl_board = converter_tabuleiro_para_rl(quadro, peca_Pc)
+def pararIA():
+    # Pede à pesquisa em curso que pare (Novo Jogo, Sair, fim da ponderação), sem esperar por ela.
+    AI_PARAR.set()
 
-    epsilon = 0.05
 
-    move, _ = choose_action(
-        rl_board,
-        game_logic.BLACK,
-        AI_WEIGHTS,
-        epsilon
-    )
+def sairJogo():
+    pararIA()
+    pygame.quit()
+    sys.exit()
 
-    if move is None:
-        return [None, None]
-
-    x, y = move
-    return [int(x), int(y)]
-    
 
 def verificarSaida():
     for event in pygame.event.get((pygame.QUIT, pygame.KEYUP)):
         if event.type == pygame.QUIT or (event.type == pygame.KEYUP and 
                                          event.key == pygame.K_ESCAPE):
-            pygame.quit()
-            sys.exit()
+            sairJogo()
 
 
 if __name__ == '__main__':
@@ -2,9 +2,23 @@
 from __future__ import annotations
 
 import json
-from typing import List, Tuple, Optional, Sequence, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Callable, List, Tuple, Optional, Sequence, Iterable
+import bitboard
+import endgame
 import game_logic
+import mcts
 import random
+import numpy as np
+from replay import ReplayBuffer
+from transposition import CacheEntry, TranspositionCache
+
+if TYPE_CHECKING:
+    from opening_book import OpeningBook
+
+# Default number of positions kept by the evaluation harnesses' cache
+CACHE_SIZE = 5_000  # ~4 KB per cached position
 
 
 def compute_features(board: List[List[int]], player: int) -> List[float]:
@@ -59,29 +73,123 @@ def compute_features(board: List[List[int]], player: int) -> List[float]:
             edge_diff / 24.0]  # 24 non-corner edge squares
 
 
-def evaluate_move(board: List[List[int]], player: int, move: Tuple[int, int], weights: Sequence[float]) -> Tuple[float, List[float]]:
-    new_board = game_logic.apply_move(board, player, move)
-    features = compute_features(new_board, player)
+class FeatureTracker:
+    """Raw feature counts of a position, used to score moves incrementally.
+
+    Built once per position for the side to move. :meth:`features_after`
+    derives the piece, corner and edge differences after a move from the
+    placed square and its flips alone; only mobility is recomputed, with
+    two bitboard move generations. The result equals
+    ``compute_features(board_after_move, player)``.
+    """
+
+    def __init__(self, board: List[List[int]], player: int) -> None:
+        own, opp = game_logic.to_bitboards(board, player)
+        self.own = own
+        self.opp = opp
+        self.piece_diff = bitboard.popcount(own) - bitboard.popcount(opp)
+        self.corner_diff = bitboard.popcount(own & bitboard.CORNERS) - bitboard.popcount(opp & bitboard.CORNERS)
+        self.edge_diff = bitboard.popcount(own & bitboard.EDGES) - bitboard.popcount(opp & bitboard.EDGES)
+
+    def features_after(self, move: Tuple[int, int], flips: Optional[List[Tuple[int, int]]] = None) -> List[float]:
+        """Return the features for the side to move after it plays ``move``.
+
+        Raises ``ValueError`` for an illegal move, as :func:`game_logic.apply_move` does.
+        """
+        placed = 1 << bitboard.square(*move)
+        if flips is None:
+            flipped = bitboard.get_flips(self.own, self.opp, bitboard.square(*move))
+        else:
+            flipped = 0
+            for fx, fy in flips:
+                flipped |= 1 << bitboard.square(fx, fy)
+        if not flipped or placed & (self.own | self.opp):
+            raise ValueError(f"Invalid move {move}")
+        # The mover gains the placed disc and the flipped discs; the
+        # opponent loses the flipped ones, so each flip counts twice.
+        gained = placed | flipped
+        piece_diff = self.piece_diff + 1 + 2 * bitboard.popcount(flipped)
+        corner_diff = (self.corner_diff + bitboard.popcount(gained & bitboard.CORNERS)
+                       + bitboard.popcount(flipped & bitboard.CORNERS))
+        edge_diff = (self.edge_diff + bitboard.popcount(gained & bitboard.EDGES)
+                     + bitboard.popcount(flipped & bitboard.EDGES))
+        own = self.own | gained
+        opp = self.opp & ~flipped
+        mobility_diff = bitboard.popcount(bitboard.get_moves(own, opp)) - bitboard.popcount(bitboard.get_moves(opp, own))
+        return [piece_diff / 64.0,
+                mobility_diff / 8.0,
+                corner_diff / 4.0,
+                edge_diff / 24.0]
+
+
+def evaluate_move(board: List[List[int]], player: int, move: Tuple[int, int], weights: Sequence[float],
+                  flips: Optional[List[Tuple[int, int]]] = None,
+                  tracker: Optional[FeatureTracker] = None) -> Tuple[float, List[float]]:
+    # tracker: FeatureTracker of (board, player), shared when scoring several moves
+    if tracker is None:
+        tracker = FeatureTracker(board, player)
+    features = tracker.features_after(move, flips)
     # Dot product of weights and features
     score = sum(w * f for w, f in zip(weights, features))
     return score, features
 
 
-def choose_action(board: List[List[int]], player: int, weights: Sequence[float], epsilon: float) -> Tuple[Optional[Tuple[int, int]], Optional[List[float]]]:
-    
-    moves = game_logic.get_valid_moves(board, player)
+def choose_action(board: List[List[int]], player: int, weights: Sequence[float], epsilon: float,
+                  moves: Optional[List[game_logic.Undo]] = None,
+                  cache: Optional[TranspositionCache] = None,
+                  book: Optional[OpeningBook] = None,
+                  entry: Optional[CacheEntry] = None) -> Tuple[Optional[Tuple[int, int]], Optional[List[float]]]:
+    # moves: (move, flips) pairs from game_logic.iter_moves, if already generated
+    # cache: TranspositionCache shared between positions; the move list and the
+    # features after each move are stored per position (results are unchanged)
+    # entry: the position's CacheEntry if already looked up (GameState.entry);
+    # the cache is then not probed a second time
+    # book: OpeningBook consulted before evaluating (features are then None, as for exploration)
+    # weights: linear weights, or an evaluator object with score_moves (e.g.
+    # ntuple.NTupleEvaluator) that scores every move in one call; features are
+    # then what the evaluator returns for the chosen move
+    if entry is not None:
+        moves = entry.moves
+    elif cache is not None:
+        key = game_logic.to_bitboards(board, player)
+        entry = cache.get(key)
+        if entry is None:
+            entry = CacheEntry(moves if moves is not None else list(game_logic.iter_moves(board, player)))
+            cache.put(key, entry)
+        moves = entry.moves
+    elif moves is None:
+        moves = list(game_logic.iter_moves(board, player))
     if not moves:
         return None, None
     # Exploration
     if random.random() < epsilon:
-        move = random.choice(moves)
+        move, _ = random.choice(moves)
         return move, None
+    if book is not None:
+        move = book.probe(board, player)
+        if move is not None:
+            return move, None
+    if hasattr(weights, "score_moves"):
+        own, opp = game_logic.to_bitboards(board, player)
+        # Same moves, same order: values[i] is the value after moves[i]
+        values, features = weights.score_moves(own, opp, game_logic.to_bitboard_moves(moves))
+        best = int(np.argmax(values))  # first maximum, as below
+        return moves[best][0], features[best]
     # Exploitation: choose the best evaluated move
+    if entry is not None:
+        if entry.features is None:
+            tracker = FeatureTracker(board, player)
+            entry.features = [tracker.features_after(m, flips) for m, flips in moves]
+        candidates = entry.features
+    else:
+        tracker = FeatureTracker(board, player)
+        candidates = [tracker.features_after(m, flips) for m, flips in moves]
     best_move: Optional[Tuple[int, int]] = None
     best_score: float = float('-inf')
     best_features: Optional[List[float]] = None
-    for m in moves:
-        score, features = evaluate_move(board, player, m, weights)
+    for (m, _), features in zip(moves, candidates):
+        # Dot product of weights and features
+        score = sum(w * f for w, f in zip(weights, features))
         if score > best_score:
             best_score = score
             best_move = m
@@ -96,33 +204,31 @@ def update_weights(weights: List[float], trajectory: Iterable[List[float]], rewa
             weights[i] += alpha * reward * features[i]
 
 
-def play_game(weights: List[float], epsilon: float, alpha: float) -> float:
-    board = game_logic.create_board()
-    player = game_logic.BLACK  # AI always starts as black
+def play_game_trajectory(weights: Sequence[float], epsilon: float,
+                         cache: Optional[TranspositionCache] = None) -> Tuple[List[List[float]], float]:
+    # Plays one training game without learning; returns the AI's feature
+    # trajectory and the final reward, ready for update_weights.
+    state = game_logic.GameState(cache=cache)  # AI always starts as black
+    board = state.board
     # Trajectories of feature vectors for the AI
     ai_trajectory: List[List[float]] = []
-    while not game_logic.is_terminal(board):
+    while not state.is_terminal():
+        if state.player == game_logic.WHITE:
+            # Opponent (white) plays a random move, or passes
+            state.play_random(random)
+            continue
+        moves = state.moves()
+        if not moves:
+            # No valid move: pass
+            state.pass_turn()
+            continue
         # AI's turn
-        if player == game_logic.BLACK:
-            move, features = choose_action(board, player, weights, epsilon)
-            if move is None:
-                # No valid move: pass
-                player = -player
-                continue
-            # If move selected randomly, compute its features after applying move
-            if features is None:
-                _, features = evaluate_move(board, player, move, weights)
-            board = game_logic.apply_move(board, player, move)
-            ai_trajectory.append(features)
-        else:
-            # Opponent (white) plays random move
-            moves = game_logic.get_valid_moves(board, player)
-            if moves:
-                opp_move = random.choice(moves)
-                board = game_logic.apply_move(board, player, opp_move)
-            # If no move: pass
-        # Switch player
-        player = -player
+        move, features = choose_action(board, state.player, weights, epsilon, moves, entry=state.entry)
+        # If move selected randomly, compute its features after applying move
+        if features is None:
+            _, features = evaluate_move(board, state.player, move, weights)
+        state.play(move)
+        ai_trajectory.append(features)
     # Game ended: compute reward from AI perspective
     black_count, white_count = game_logic.count_pieces(board)
     if black_count > white_count:
@@ -131,6 +237,11 @@ def play_game(weights: List[float], epsilon: float, alpha: float) -> float:
         reward = -1.0
     else:
         reward = 0.0
+    return ai_trajectory, reward
+
+
+def play_game(weights: List[float], epsilon: float, alpha: float) -> float:
+    ai_trajectory, reward = play_game_trajectory(weights, epsilon)
     # Update weights based on the AI's trajectory
     update_weights(weights, ai_trajectory, reward, alpha)
     return reward
@@ -146,6 +257,187 @@ def train_agent(num_games: int, epsilon_start: float = 1.0, epsilon_end: float =
         play_game(weights, epsilon, alpha)
     return weights
 
+
+class TDLambdaLearner:
+    """Online TD(lambda) updates of linear weights along one game.
+
+    :meth:`observe` takes the features of each AI afterstate in turn, and
+    :meth:`finish` the final reward. ``weights`` (a list) is updated in
+    place after every TD error, so moves chosen with it see the new
+    values. Both values in a TD error are taken with the current weights,
+    so V(previous afterstate) is recomputed after each update. See
+    :func:`play_game_td` for the update rule.
+    """
+
+    def __init__(self, weights: List[float], alpha: float, lam: float, gamma: float) -> None:
+        self.weights = weights
+        self.alpha = alpha
+        self.lam = lam
+        self.gamma = gamma
+        self.w = np.array(weights, dtype=float)
+        self.trace = np.zeros_like(self.w)
+        self.prev_phi: Optional[np.ndarray] = None
+
+    def _update(self, target: float) -> None:
+        # delta = target - V(previous afterstate), with the current weights
+        delta = target - float(self.w @ self.prev_phi)
+        self.w += self.alpha * delta * self.trace
+        self.weights[:] = self.w.tolist()
+
+    def observe(self, features: Sequence[float]) -> None:
+        """Learn from the next afterstate, given by its ``features``."""
+        phi = np.array(features)
+        if self.prev_phi is not None:
+            self._update(self.gamma * float(self.w @ phi))
+        self.trace *= self.gamma * self.lam
+        self.trace += phi
+        self.prev_phi = phi
+
+    def finish(self, reward: float) -> None:
+        """Apply the last TD error, towards the final ``reward``."""
+        if self.prev_phi is not None:
+            self._update(reward)
+
+
+def play_game_td(weights: List[float], epsilon: float, alpha: float, lam: float = 0.7, gamma: float = 1.0,
+                 cache: Optional[TranspositionCache] = None) -> float:
+    # TD(lambda) version of play_game: the weights are updated after every AI
+    # move instead of once per game. V(s) = weights · features is the value of
+    # the AI's afterstates, the only reward is the final result, and the
+    # eligibility trace e = gamma * lam * e + features spreads each TD error
+    #     delta = gamma * V(next afterstate) - V(afterstate)    (reward at the end)
+    # over the earlier moves. lam = 1 gives Monte-Carlo targets, lam = 0 TD(0).
+    # weights is updated in place.
+    state = game_logic.GameState(cache=cache)  # AI always starts as black
+    board = state.board
+    learner = TDLambdaLearner(weights, alpha, lam, gamma)
+    while not state.is_terminal():
+        if state.player == game_logic.WHITE:
+            # Random opponent
+            state.play_random(random)
+            continue
+        moves = state.moves()
+        if not moves:
+            state.pass_turn()
+            continue
+        move, features = choose_action(board, state.player, weights, epsilon, moves, entry=state.entry)
+        if features is None:
+            _, features = evaluate_move(board, state.player, move, weights)
+        learner.observe(features)
+        state.play(move)
+    black_count, white_count = game_logic.count_pieces(board)
+    if black_count > white_count:
+        reward = 1.0
+    elif black_count < white_count:
+        reward = -1.0
+    else:
+        reward = 0.0
+    learner.finish(reward)
+    return reward
+
+
+def train_agent_td(num_games: int, epsilon_start: float = 1.0, epsilon_end: float = 0.1, alpha: float = 0.05,
+                   lam: float = 0.7, gamma: float = 1.0, weights: Optional[List[float]] = None) -> List[float]:
+    # Same schedule as train_agent, learning with play_game_td.
+    # Pass weights to continue training from existing weights (updated in place).
+    if weights is None:
+        weights = [0.0, 0.0, 0.0, 0.0]
+    for game_index in range(num_games):
+        # Linearly decay epsilon
+        t = game_index / max(1, num_games - 1)
+        epsilon = epsilon_start * (1 - t) + epsilon_end * t
+        play_game_td(weights, epsilon, alpha, lam, gamma)
+    return weights
+
+
+def _self_play_worker(weights: List[float], jobs: List[Tuple[float, int]]) -> List[Tuple[List[List[float]], float]]:
+    # Actor: plays each (epsilon, seed) job with a frozen copy of the weights.
+    records = []
+    for epsilon, seed in jobs:
+        random.seed(seed)
+        records.append(play_game_trajectory(weights, epsilon))
+    return records
+
+
+def train_agent_parallel(num_games: int, epsilon_start: float = 1.0, epsilon_end: float = 0.1, alpha: float = 0.05,
+                         workers: int = 2, sync_every: int = 50, seed: Optional[int] = None,
+                         weights: Optional[List[float]] = None) -> List[float]:
+    # Actor/learner version of train_agent. Worker processes play games with a
+    # snapshot of the weights and send back (trajectory, reward) records; the
+    # learner applies update_weights to them in game order and hands out fresh
+    # weights every sync_every games. Game i is seeded with seed + i, so a run
+    # is reproducible for a given seed and sync_every, whatever the worker count.
+    # Pass weights to continue training from existing weights (updated in place).
+    if weights is None:
+        weights = [0.0, 0.0, 0.0, 0.0]
+    if seed is None:
+        seed = random.getrandbits(32)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for block_start in range(0, num_games, sync_every):
+            jobs = []
+            for game_index in range(block_start, min(block_start + sync_every, num_games)):
+                # Linearly decay epsilon (same schedule as train_agent)
+                t = game_index / max(1, num_games - 1)
+                jobs.append((epsilon_start * (1 - t) + epsilon_end * t, seed + game_index))
+            snapshot = list(weights)
+            futures = [pool.submit(_self_play_worker, snapshot, jobs[start:stop])
+                       for start, stop in shard_ranges(len(jobs), workers)]
+            for future in futures:
+                for ai_trajectory, reward in future.result():
+                    update_weights(weights, ai_trajectory, reward, alpha)
+    return weights
+
+def train_agent_replay(num_games: int, epsilon_start: float = 1.0, epsilon_end: float = 0.1, alpha: float = 0.05,
+                       batch_size: int = 64, replay_ratio: float = 1.0, buffer: Optional[ReplayBuffer] = None,
+                       workers: int = 1, sync_every: int = 50, seed: Optional[int] = None,
+                       weights: Optional[List[float]] = None) -> List[float]:
+    # Experience replay version of train_agent. Each game's (features, reward)
+    # records go into a ReplayBuffer and the weights are updated with
+    # mini-batches sampled from it, one vectorized step per batch:
+    #     w += alpha * sum_i reward_i * features_i
+    # (the update_weights rule, summed over the batch). replay_ratio is the
+    # number of sampled positions per position played; with 1.0 the total
+    # update per game has the same scale as play_game.
+    # Pass a buffer (and weights) to keep both between calls. With workers > 1
+    # games are played in worker processes, as in train_agent_parallel.
+    if weights is None:
+        weights = [0.0, 0.0, 0.0, 0.0]
+    if buffer is None:
+        buffer = ReplayBuffer(num_features=len(weights))
+    if seed is None:
+        seed = random.getrandbits(32)
+    rng = np.random.default_rng(seed)
+    w = np.array(weights, dtype=float)
+    pending = 0.0  # positions still owed to the learner
+    block = sync_every if workers > 1 else 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        for block_start in range(0, num_games, block):
+            jobs = []
+            for game_index in range(block_start, min(block_start + block, num_games)):
+                # Linearly decay epsilon (same schedule as train_agent)
+                t = game_index / max(1, num_games - 1)
+                jobs.append((epsilon_start * (1 - t) + epsilon_end * t, seed + game_index))
+            if pool is not None:
+                snapshot = list(weights)
+                futures = [pool.submit(_self_play_worker, snapshot, jobs[start:stop])
+                           for start, stop in shard_ranges(len(jobs), workers)]
+                records = [record for future in futures for record in future.result()]
+            else:
+                records = _self_play_worker(weights, jobs)
+            for ai_trajectory, reward in records:
+                buffer.add_game(ai_trajectory, reward)
+                pending += replay_ratio * len(ai_trajectory)
+            while pending >= batch_size:
+                features, rewards, _ = buffer.sample(batch_size, rng)
+                w += alpha * (rewards @ features)
+                pending -= batch_size
+            weights[:] = w.tolist()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return weights
+
 def save_weights(weights, filename="weights.json"):
     with open(filename, "w") as f:
         json.dump(weights, f)
@@ -154,26 +446,28 @@ def load_weights(filename="weights.json"):
     with open(filename, "r") as f:
         return json.load(f)
     
-def play_game_no_update(weights, epsilon: float = 0.0) -> float:
-
-    board = game_logic.create_board()
-    player = game_logic.BLACK
-
-    while not game_logic.is_terminal(board):
-        if player == game_logic.BLACK:
-            move, _ = choose_action(board, player, weights, epsilon)
-            if move is None:
-                player = -player
-                continue
-            board = game_logic.apply_move(board, player, move)
+def play_game_no_update(weights, epsilon: float = 0.0, cache: Optional[TranspositionCache] = None,
+                        endgame_empties: int = 0, book: Optional[OpeningBook] = None) -> float:
+
+    state = game_logic.GameState(cache=cache)
+
+    while not state.is_terminal():
+        if state.player == game_logic.WHITE:
+            # Random opponent
+            state.play_random(random)
+            continue
+        moves = state.moves()
+        if not moves:
+            state.pass_turn()
+            continue
+        if state.empties <= endgame_empties:
+            # Jogo perfeito com o solver exato nas últimas casas vazias
+            move = endgame.endgame_move(state.board, state.player)
         else:
-            moves = game_logic.get_valid_moves(board, player)
-            if moves:
-                opp_move = random.choice(moves)
-                board = game_logic.apply_move(board, player, opp_move)
-        player = -player
+            move, _ = choose_action(state.board, state.player, weights, epsilon, moves, book=book, entry=state.entry)
+        state.play(move)
 
-    black_count, white_count = game_logic.count_pieces(board)
+    black_count, white_count = game_logic.count_pieces(state.board)
     if black_count > white_count:
         return 1.0
     elif black_count < white_count:
@@ -182,15 +476,29 @@ def play_game_no_update(weights, epsilon: float = 0.0) -> float:
         return 0.0
 
 
-def evaluate_against_random(weights, num_games: int = 2000, epsilon: float = 0.0, seed: int = 0) -> dict:
-    #Avalia o agente (sem treino) contra um adversário aleatório.
-    #Retorna dicionário com wins/losses/draws e win_rate.
-    
+def shard_ranges(num_games: int, workers: int) -> List[Tuple[int, int]]:
+    # Divide os índices 0..num_games-1 em blocos contíguos [start, stop), um por worker.
+    workers = max(1, min(workers, num_games))
+    step, extra = divmod(num_games, workers)
+    bounds = []
+    start = 0
+    for k in range(workers):
+        stop = start + step + (1 if k < extra else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def _play_eval_games(play: Callable[..., float], weights, start: int, stop: int,
+                     epsilon: float, seed: int, cache_size: int = 0,
+                     endgame_empties: int = 0, book: Optional[OpeningBook] = None) -> Tuple[int, int, int]:
+    # Joga os jogos start..stop-1, cada um com a semente seed + i, e conta (wins, losses, draws).
+    # cache_size > 0 partilha uma TranspositionCache entre os jogos deste bloco.
+    cache = TranspositionCache(cache_size) if cache_size > 0 else None
     wins = losses = draws = 0
-
-    for i in range(num_games):
+    for i in range(start, stop):
         random.seed(seed + i)
-        r = play_game_no_update(weights, epsilon=epsilon)
+        r = play(weights, epsilon=epsilon, cache=cache, endgame_empties=endgame_empties, book=book)
 
         if r > 0:
             wins += 1
@@ -198,7 +506,25 @@ def evaluate_against_random(weights, num_games: int = 2000, epsilon: float = 0.0
             losses += 1
         else:
             draws += 1
+    return wins, losses, draws
+
+
+def _evaluate(play: Callable[..., float], weights, num_games: int, epsilon: float, seed: int, workers: int,
+              cache_size: int, endgame_empties: int, book: Optional[OpeningBook]) -> dict:
+    # Com workers > 1 os índices dos jogos são repartidos por processos; como cada
+    # jogo tem a sua própria semente, as contagens são iguais às do modo série.
+    if workers > 1 and num_games > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_play_eval_games, play, weights, start, stop, epsilon, seed,
+                                   cache_size, endgame_empties, book)
+                       for start, stop in shard_ranges(num_games, workers)]
+            counts = [f.result() for f in futures]
+    else:
+        counts = [_play_eval_games(play, weights, 0, num_games, epsilon, seed, cache_size, endgame_empties, book)]
 
+    wins = sum(c[0] for c in counts)
+    losses = sum(c[1] for c in counts)
+    draws = sum(c[2] for c in counts)
     return {
         "games": num_games,
         "wins": wins,
@@ -208,22 +534,37 @@ def evaluate_against_random(weights, num_games: int = 2000, epsilon: float = 0.0
     }
 
 
-def greedy_opponent_move(board, player):
+def evaluate_against_random(weights, num_games: int = 2000, epsilon: float = 0.0, seed: int = 0,
+                            workers: int = 1, cache_size: int = CACHE_SIZE,
+                            endgame_empties: int = 0, book: Optional[OpeningBook] = None) -> dict:
+    #Avalia o agente (sem treino) contra um adversário aleatório.
+    #Retorna dicionário com wins/losses/draws e win_rate.
+    #workers > 1 distribui os jogos por vários processos (mesmo resultado).
+    #cache_size: entradas da cache de posições (0 desliga; mesmo resultado).
+    #endgame_empties > 0: o agente joga com o solver exato a partir desse nº de casas vazias.
+    #book: OpeningBook usado pelo agente nas posições que lá estão.
+    return _evaluate(play_game_no_update, weights, num_games, epsilon, seed, workers, cache_size, endgame_empties,
+                     book)
+
+
+def greedy_opponent_move(board, player, moves=None):
     """
     Adversário greedy: escolhe a jogada que maximiza o ganho imediato de peças
     (diferença de contagem após a jogada).
+    moves: pares (move, flips) já gerados para esta posição, se existirem.
     """
-    moves = game_logic.get_valid_moves(board, player)
-    if not moves:
-        return None
+    if moves is None:
+        moves = game_logic.iter_moves(board, player)
+    black, white = game_logic.count_pieces(board)
+    base = (black - white) if player == game_logic.BLACK else (white - black)
 
     best_move = None
     best_score = -10**9
 
-    for m in moves:
-        new_board = game_logic.apply_move(board, player, m)
-        black, white = game_logic.count_pieces(new_board)
-        score = (black - white) if player == game_logic.BLACK else (white - black)
+    # A move adds one disc and turns len(flips) discs, so the difference
+    # after it is known without playing it.
+    for m, flips in moves:
+        score = base + 1 + 2 * len(flips)
 
         if score > best_score:
             best_score = score
@@ -232,25 +573,27 @@ def greedy_opponent_move(board, player):
     return best_move
 
 
-def play_game_no_update_greedy(weights, epsilon: float = 0.0) -> float:
+def play_game_no_update_greedy(weights, epsilon: float = 0.0, cache: Optional[TranspositionCache] = None,
+                               endgame_empties: int = 0, book: Optional[OpeningBook] = None) -> float:
     
-    board = game_logic.create_board()
-    player = game_logic.BLACK
-
-    while not game_logic.is_terminal(board):
-        if player == game_logic.BLACK:
-            move, _ = choose_action(board, player, weights, epsilon)
-            if move is None:
-                player = -player
-                continue
-            board = game_logic.apply_move(board, player, move)
+    state = game_logic.GameState(cache=cache)
+
+    while not state.is_terminal():
+        moves = state.moves()
+        if not moves:
+            state.pass_turn()
+            continue
+        if state.player == game_logic.BLACK:
+            if state.empties <= endgame_empties:
+                # Jogo perfeito com o solver exato nas últimas casas vazias
+                move = endgame.endgame_move(state.board, state.player)
+            else:
+                move, _ = choose_action(state.board, state.player, weights, epsilon, moves, book=book, entry=state.entry)
         else:
-            move = greedy_opponent_move(board, player)
-            if move is not None:
-                board = game_logic.apply_move(board, player, move)
-        player = -player
+            move = greedy_opponent_move(state.board, state.player, moves)
+        state.play(move)
 
-    black_count, white_count = game_logic.count_pieces(board)
+    black_count, white_count = game_logic.count_pieces(state.board)
     if black_count > white_count:
         return 1.0
     elif black_count < white_count:
@@ -259,25 +602,53 @@ def play_game_no_update_greedy(weights, epsilon: float = 0.0) -> float:
         return 0.0
 
 
-def evaluate_against_greedy(weights, num_games: int = 2000, epsilon: float = 0.0, seed: int = 0) -> dict:
+def evaluate_against_greedy(weights, num_games: int = 2000, epsilon: float = 0.0, seed: int = 0,
+                            workers: int = 1, cache_size: int = CACHE_SIZE,
+                            endgame_empties: int = 0, book: Optional[OpeningBook] = None) -> dict:
     #Avalia o agente (sem treino) contra adversário greedy.
-    wins = losses = draws = 0
-    for i in range(num_games):
-        # semente para reprodutibilidade
-        random.seed(seed + i)
-        r = play_game_no_update_greedy(weights, epsilon=epsilon)
-        if r > 0:
-            wins += 1
-        elif r < 0:
-            losses += 1
+    #workers > 1 distribui os jogos por vários processos (mesmo resultado).
+    #cache_size: entradas da cache de posições (0 desliga; mesmo resultado).
+    #endgame_empties > 0: o agente joga com o solver exato a partir desse nº de casas vazias.
+    #book: OpeningBook usado pelo agente nas posições que lá estão.
+    return _evaluate(play_game_no_update_greedy, weights, num_games, epsilon, seed, workers, cache_size,
+                     endgame_empties, book)
+
+
+def play_game_no_update_mcts(weights, epsilon: float = 0.0, cache: Optional[TranspositionCache] = None,
+                             endgame_empties: int = 0, book: Optional[OpeningBook] = None,
+                             playouts: int = 200) -> float:
+    # Agente (preto) contra um adversário MCTS com playouts simulações por jogada.
+    # A semente do MCTS vem do random global, por isso cada jogo é reprodutível.
+    opponent = mcts.MCTS(seed=random.getrandbits(32))
+    state = game_logic.GameState(cache=cache)
+
+    while not state.is_terminal():
+        moves = state.moves()
+        if not moves:
+            state.pass_turn()
+            continue
+        if state.player == game_logic.BLACK:
+            if state.empties <= endgame_empties:
+                move = endgame.endgame_move(state.board, state.player)
+            else:
+                move, _ = choose_action(state.board, state.player, weights, epsilon, moves, book=book, entry=state.entry)
         else:
-            draws += 1
+            move = bitboard.coords(opponent.search(*state.key(), playouts=playouts))
+        state.play(move)
 
-    win_rate = wins / num_games
-    return {
-        "games": num_games,
-        "wins": wins,
-        "losses": losses,
-        "draws": draws,
-        "win_rate": win_rate
-    }
+    black_count, white_count = game_logic.count_pieces(state.board)
+    if black_count > white_count:
+        return 1.0
+    elif black_count < white_count:
+        return -1.0
+    else:
+        return 0.0
+
+
+def evaluate_against_mcts(weights, num_games: int = 200, epsilon: float = 0.0, seed: int = 0,
+                          workers: int = 1, cache_size: int = CACHE_SIZE, endgame_empties: int = 0,
+                          book: Optional[OpeningBook] = None, playouts: int = 200) -> dict:
+    #Avalia o agente (sem treino) contra um adversário MCTS (mais forte que o greedy).
+    #playouts: simulações do MCTS por jogada; os restantes argumentos como em evaluate_against_random.
+    return _evaluate(partial(play_game_no_update_mcts, playouts=playouts), weights, num_games, epsilon, seed,
+                     workers, cache_size, endgame_empties, book)
@@ -0,0 +1,259 @@
+"""
+Depth-limited alpha-beta search over the learned linear evaluator.
+
+:class:`AlphaBetaSearch` runs a negamax search with alpha-beta pruning on
+bitboards (see :mod:`bitboard`). Leaves are scored with the same four
+features and weights as :func:`rl_agent.compute_features`, from the
+point of view of the side to move; finished games are scored by their
+final disc difference, scaled so that any win beats any evaluation.
+
+Moves are ordered corners first; near the root of the tree the other
+moves follow by their static evaluation. At the root, iterative
+deepening orders moves by the scores of the previous iteration, which
+makes the deeper iterations cut off much earlier.
+
+:func:`best_move` searches to a fixed depth and :func:`best_move_timed`
+deepens until a time budget is used up; both take the list-of-lists
+board used by :mod:`game_logic`. A timed search checks the clock while
+it runs and, when time is up, returns the best move found so far. It
+also stops early when the searcher's ``stop`` event is set, so another
+thread (e.g. the GUI) can cancel it.
+
+A searcher can keep a transposition table (a
+:class:`transposition.TranspositionCache` of search results keyed by
+canonical position, so the 8 symmetric versions of a position share
+one entry). Keeping the same searcher between moves, as the GUI does,
+lets each search start from what the previous ones already learned.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import bitboard
+import game_logic
+from transposition import TranspositionCache
+
+# Score of a finished game per disc of difference; larger than any evaluation
+WIN_SCORE: float = 1e9
+# Remaining depth from which interior moves are sorted by a static evaluation
+ORDERING_DEPTH: int = 3
+# The clock is checked every this many nodes (must be a power of two)
+CLOCK_INTERVAL: int = 1024
+
+# Transposition-table bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+_CORNERS = bitboard.CORNERS
+_EDGES = bitboard.EDGES
+_get_moves = bitboard.get_moves
+_get_flips = bitboard.get_flips
+_canonical = bitboard.canonical
+_SQUARE_MAPS = bitboard.SQUARE_MAPS
+_INVERSE = bitboard.INVERSE
+
+
+def ordered_squares(moves: int) -> List[int]:
+    """Return the squares of ``moves`` with corners first, then row-major."""
+    corners = moves & _CORNERS
+    return list(bitboard.iter_squares(corners)) + list(bitboard.iter_squares(moves & ~corners))
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its deadline has passed."""
+
+
+class AlphaBetaSearch:
+    """Negamax alpha-beta search using linear ``weights`` at the leaves.
+
+    ``weights`` may also be an evaluator object whose ``evaluate(own,
+    opp)`` is then used instead (see :mod:`ntuple`).
+
+    ``nodes`` counts the positions visited since the object was created
+    and ``depth_reached`` is the depth of the last completed iteration of
+    :meth:`search_timed`. Setting the ``stop`` event ends a timed search
+    as if its time had run out. With a ``tt``, every searched node stores
+    ``(depth, value, bound, best square)``; entries are reused for
+    cut-offs and to try the best square first.
+    """
+
+    def __init__(self, weights: Sequence[float], tt: Optional[TranspositionCache] = None) -> None:
+        if hasattr(weights, "evaluate"):
+            # An evaluator object (e.g. ntuple.NTupleEvaluator) replaces the linear one
+            self.evaluate = weights.evaluate
+        else:
+            # Fold the feature normalisation of compute_features into the weights
+            w_piece, w_mobility, w_corner, w_edge = weights
+            self._w = (w_piece / 64.0, w_mobility / 8.0, w_corner / 4.0, w_edge / 24.0)
+        self.tt = tt
+        self.nodes = 0
+        self.depth_reached = 0
+        self.deadline: Optional[float] = None
+        self.stop: Optional[threading.Event] = None
+
+    def evaluate(self, own: int, opp: int) -> float:
+        """Return the linear evaluation of the position for the side owning ``own``."""
+        w_piece, w_mobility, w_corner, w_edge = self._w
+        return (w_piece * (own.bit_count() - opp.bit_count())
+                + w_mobility * (_get_moves(own, opp).bit_count() - _get_moves(opp, own).bit_count())
+                + w_corner * ((own & _CORNERS).bit_count() - (opp & _CORNERS).bit_count())
+                + w_edge * ((own & _EDGES).bit_count() - (opp & _EDGES).bit_count()))
+
+    def negamax(self, own: int, opp: int, depth: int, alpha: float, beta: float) -> float:
+        """Return the value of the position for the side owning ``own``.
+
+        Raises :class:`SearchTimeout` once ``deadline`` has passed or
+        ``stop`` is set.
+        """
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & (CLOCK_INTERVAL - 1) \
+                and (time.perf_counter() > self.deadline or self.stop is not None and self.stop.is_set()):
+            raise SearchTimeout
+        moves = _get_moves(own, opp)
+        if not moves:
+            if not _get_moves(opp, own):
+                return WIN_SCORE * (own.bit_count() - opp.bit_count())
+            # Pass: the opponent moves from the same position
+            return -self.negamax(opp, own, depth, -beta, -alpha)
+        if depth <= 0:
+            return self.evaluate(own, opp)
+        tt = self.tt
+        tt_move = -1
+        if tt is not None:
+            # Symmetric positions share one entry; its square is stored in
+            # the canonical orientation and mapped back here
+            c_own, c_opp, sym = _canonical(own, opp)
+            entry = tt.get((c_own, c_opp))
+            if entry is not None:
+                tt_depth, tt_value, tt_bound, tt_move = entry
+                tt_move = _SQUARE_MAPS[_INVERSE[sym]][tt_move]
+                if tt_depth >= depth:
+                    if tt_bound == EXACT:
+                        return tt_value
+                    if tt_bound == LOWER and tt_value >= beta:
+                        return tt_value
+                    if tt_bound == UPPER and tt_value <= alpha:
+                        return tt_value
+        alpha_start = alpha
+        children = []
+        for sq in ordered_squares(moves):
+            flips = _get_flips(own, opp, sq)
+            children.append((opp & ~flips, own | flips | (1 << sq), sq))
+        if depth >= ORDERING_DEPTH:
+            # Corners first, then the replies that look worst for the opponent
+            evaluate = self.evaluate
+            children.sort(key=lambda child: (not (1 << child[2]) & _CORNERS, evaluate(child[0], child[1])))
+        if tt_move >= 0:
+            # The best square of an earlier search goes first
+            children.sort(key=lambda child: child[2] != tt_move)
+        best = -float("inf")
+        best_sq = -1
+        for child_own, child_opp, sq in children:
+            value = -self.negamax(child_own, child_opp, depth - 1, -beta, -alpha)
+            if value > best:
+                best = value
+                best_sq = sq
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        if tt is not None:
+            if best <= alpha_start:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            tt.put((c_own, c_opp), (depth, best, bound, _SQUARE_MAPS[sym][best_sq]))
+        return best
+
+    def search_root(self, own: int, opp: int, depth: int, order: Optional[List[int]] = None,
+                    partial: Optional[List[Tuple[int, float]]] = None) -> List[Tuple[int, float]]:
+        """Search every root move to ``depth`` plies.
+
+        Moves are tried in ``order`` (default: corners first). Returns
+        ``(square, score)`` pairs sorted best first; only the first score
+        is exact, the others are upper bounds from alpha-beta cut-offs.
+        ``partial`` receives each ``(square, score)`` as soon as it is
+        known, so a caller can still use it if the search times out.
+        """
+        if order is None:
+            order = ordered_squares(_get_moves(own, opp))
+        alpha = -float("inf")
+        scored = [] if partial is None else partial
+        for sq in order:
+            flips = _get_flips(own, opp, sq)
+            value = -self.negamax(opp & ~flips, own | flips | (1 << sq), depth - 1, -float("inf"), -alpha)
+            scored.append((sq, value))
+            if value > alpha:
+                alpha = value
+        # Stable sort keeps the earlier move first among equal scores
+        return sorted(scored, key=lambda item: -item[1])
+
+    def search_timed(self, own: int, opp: int, time_budget: float, max_depth: int = 60) -> Optional[int]:
+        """Return the best square for ``own`` found within ``time_budget`` seconds.
+
+        Deepens one ply at a time, ordering the root by the previous
+        iteration's scores. When time runs out in the middle of an
+        iteration, the moves it already finished are kept: the first of
+        them is the previous best, so a move that scored higher is a
+        better choice. Returns None if there is no legal move.
+
+        ``time_budget`` may be ``math.inf`` to search until ``stop`` is set.
+        """
+        moves = _get_moves(own, opp)
+        if not moves:
+            return None
+        order = ordered_squares(moves)
+        self.depth_reached = 0
+        if len(order) == 1:
+            return order[0]
+        empties = 64 - (own | opp).bit_count()
+        self.deadline = time.perf_counter() + time_budget
+        try:
+            for depth in range(1, min(max_depth, empties) + 1):
+                partial: List[Tuple[int, float]] = []
+                try:
+                    scored = self.search_root(own, opp, depth, order, partial)
+                except SearchTimeout:
+                    if partial:
+                        best_sq, best_value = partial[0]
+                        for sq, value in partial[1:]:
+                            if value > best_value:
+                                best_sq, best_value = sq, value
+                        order.remove(best_sq)
+                        order.insert(0, best_sq)
+                    break
+                order = [sq for sq, _ in scored]
+                self.depth_reached = depth
+        finally:
+            self.deadline = None
+        return order[0]
+
+
+def best_move(board: List[List[int]], player: int, weights: Sequence[float],
+              depth: int = 4) -> Optional[Tuple[int, int]]:
+    """Return the best move for ``player`` found by a ``depth``-ply search, or None."""
+    own, opp = game_logic.to_bitboards(board, player)
+    if not _get_moves(own, opp):
+        return None
+    scored = AlphaBetaSearch(weights).search_root(own, opp, max(1, depth))
+    return bitboard.coords(scored[0][0])
+
+
+def best_move_timed(board: List[List[int]], player: int, weights: Sequence[float],
+                    time_budget: float = 1.0, max_depth: int = 60,
+                    searcher: Optional[AlphaBetaSearch] = None) -> Optional[Tuple[int, int]]:
+    """Return the best move for ``player`` found within ``time_budget`` seconds.
+
+    Pass the same ``searcher`` (built with a ``tt``) on every move to
+    keep its transposition table between searches; ``weights`` is then
+    ignored. Returns None if ``player`` has no move.
+    """
+    if searcher is None:
+        searcher = AlphaBetaSearch(weights)
+    own, opp = game_logic.to_bitboards(board, player)
+    sq = searcher.search_timed(own, opp, time_budget, max_depth)
+    return None if sq is None else bitboard.coords(sq)
@@ -0,0 +1,63 @@
+"""Checks the arena games, the colour-swapped pairings and the ratings."""
+
+from __future__ import annotations
+
+import math
+import random
+
+import pytest
+
+import arena
+import rl_agent
+
+WEIGHTS = [0.4, 1.3, 0.8, 0.6]
+
+
+def test_play_game_replays_evaluation_games():
+    # Without a random opening the arena game is the game of evaluate_against_random
+    for seed in range(10):
+        random.seed(seed)
+        expected = rl_agent.play_game_no_update(WEIGHTS)
+        diff = arena.play_game(arena.LinearPlayer(WEIGHTS), arena.RandomPlayer(), seed, opening_plies=0)
+        assert (diff > 0) - (diff < 0) == expected
+
+
+def test_pairings_are_colour_swapped_and_independent_of_workers():
+    players = [arena.GreedyPlayer(), arena.LinearPlayer(WEIGHTS)]
+    forward = arena.play_pairings(players, [(0, 1)], pairs=4, seed=5)[0, 1]
+    backward = arena.play_pairings(players[::-1], [(0, 1)], pairs=4, seed=5)[0, 1]
+    assert sum(forward) == 8
+    assert backward == forward[::-1]
+    assert arena.play_pairings(players, [(0, 1)], pairs=4, seed=5, workers=2)[0, 1] == forward
+
+
+def test_search_player_and_match_result():
+    result = arena.match(arena.SearchPlayer(WEIGHTS, 2), arena.RandomPlayer(), pairs=3, seed=1)
+    assert result["games"] == 6
+    assert result["wins"] + result["draws"] + result["losses"] == 6
+    assert 0.0 <= result["los"] <= 1.0
+
+
+def test_score_elo():
+    score, elo, error = arena.score_elo((60, 20, 20))
+    assert score == 0.7
+    assert math.isclose(elo, 400 * math.log10(0.7 / 0.3))
+    assert 0 < error < 100
+    assert arena.score_elo((5, 0, 0))[1] == math.inf
+    with pytest.raises(ValueError):
+        arena.score_elo((0, 0, 0))
+
+
+def test_elo_ratings_order_and_symmetry():
+    table = {(0, 1): (30, 10, 10), (0, 2): (45, 5, 0), (1, 2): (30, 10, 10)}
+    ratings = arena.elo_ratings(["a", "b", "c"], table)
+    assert [r["name"] for r in ratings] == ["a", "b", "c"]
+    assert math.isclose(sum(r["elo"] for r in ratings), 0.0, abs_tol=1e-6)
+    # Equal records give equal gaps
+    assert math.isclose(ratings[0]["elo"] - ratings[1]["elo"], ratings[1]["elo"] - ratings[2]["elo"], rel_tol=1e-6)
+    assert all(0 < r["error"] < math.inf for r in ratings)
+    anchored = arena.elo_ratings(["a", "b", "c"], table, anchor=2)
+    assert anchored[-1]["elo"] == 0.0 and anchored[-1]["error"] == 0.0
+    # With only two players the fit matches the pairwise Elo, up to the prior
+    two = arena.elo_ratings(["a", "b"], {(0, 1): (30, 10, 10)}, prior=0)
+    assert math.isclose(two[0]["elo"] - two[1]["elo"], arena.score_elo((30, 10, 10))[1], rel_tol=1e-6)
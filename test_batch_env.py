@@ -0,0 +1,74 @@
+"""Checks that the batched simulator reproduces the serial evaluation."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+import batch_env
+import bitboard
+import game_logic
+import rl_agent
+
+WEIGHTS = [0.4, 1.3, 0.8, 0.6]
+
+
+def test_batch_matches_serial_against_random():
+    for epsilon in (0.0, 0.3):
+        assert batch_env.evaluate_against_random_batch(WEIGHTS, 30, epsilon, seed=5) == \
+            rl_agent.evaluate_against_random(WEIGHTS, 30, epsilon, seed=5)
+
+
+def test_batch_matches_serial_against_greedy():
+    for epsilon in (0.0, 0.3):
+        assert batch_env.evaluate_against_greedy_batch(WEIGHTS, 30, epsilon, seed=9) == \
+            rl_agent.evaluate_against_greedy(WEIGHTS, 30, epsilon, seed=9)
+
+
+def test_vectorized_moves_and_features_match_scalar():
+    rng = random.Random(3)
+    positions = []
+    state = game_logic.GameState()
+    while len(positions) < 200:
+        if state.is_terminal():
+            state = game_logic.GameState()
+        moves = state.moves()
+        positions.append(game_logic.to_bitboards(state.board, state.player) + (state.player,))
+        if moves:
+            state.play(rng.choice(moves)[0])
+        else:
+            state.pass_turn()
+    own = np.array([p[0] for p in positions], dtype=np.uint64)
+    opp = np.array([p[1] for p in positions], dtype=np.uint64)
+    moves = batch_env.get_moves(own, opp)
+    feats = batch_env.features(own, opp)
+    for i, (o, p, player) in enumerate(positions):
+        assert int(moves[i]) == bitboard.get_moves(o, p)
+        black, white = (o, p) if player == game_logic.BLACK else (p, o)
+        board = bitboard.to_board(black, white)
+        assert feats[i].tolist() == rl_agent.compute_features(board, player)
+
+
+def test_sharded_evaluation_matches_serial():
+    serial = rl_agent.evaluate_against_random(WEIGHTS, 12, 0.2, seed=1)
+    assert rl_agent.evaluate_against_random(WEIGHTS, 12, 0.2, seed=1, workers=3) == serial
+    assert batch_env.evaluate_against_random_batch(WEIGHTS, 12, 0.2, seed=1, workers=3) == serial
+
+
+def test_vectorized_symmetries_match_scalar():
+    rng = random.Random(4)
+    own, opp = [], []
+    for _ in range(200):
+        o = rng.getrandbits(64)
+        # Half the positions are close to symmetric, to exercise ties
+        p = (bitboard.transform(o, rng.randrange(8)) if rng.random() < 0.5 else rng.getrandbits(64)) & ~o
+        own.append(o)
+        opp.append(p)
+    c_own, c_opp, t = batch_env.canonical(np.array(own, dtype=np.uint64), np.array(opp, dtype=np.uint64))
+    for i in range(len(own)):
+        assert (int(c_own[i]), int(c_opp[i]), int(t[i])) == bitboard.canonical(own[i], opp[i])
+    squares = np.arange(64).reshape(8, 8)
+    images = batch_env.augment_boards(squares[None])
+    for t in range(bitboard.SYMMETRIES):
+        assert images[t].reshape(64)[batch_env.SQUARE_TABLE[t]].tolist() == list(range(64))
@@ -0,0 +1,54 @@
+"""Checks the endgame solver against a plain minimax to the end of the game."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+import bitboard
+import endgame
+import game_logic
+import search
+
+
+def _perfect(own, opp):
+    moves = bitboard.get_moves(own, opp)
+    if not moves:
+        if not bitboard.get_moves(opp, own):
+            return bitboard.popcount(own) - bitboard.popcount(opp)
+        return -_perfect(opp, own)
+    return max(-_perfect(opp & ~flips, own | flips | (1 << sq), ) for sq, flips in bitboard.iter_moves(own, opp))
+
+
+def test_solver_matches_minimax(late_position):
+    for seed in range(12):
+        state = late_position(seed, 7)
+        own, opp = state.key()
+        solver = endgame.EndgameSolver()
+        expected = _perfect(own, opp)
+        assert solver.solve(own, opp) == expected
+        sq, score = solver.best_move(own, opp)
+        assert score == expected
+        if sq is not None:
+            flips = bitboard.get_flips(own, opp, sq)
+            assert -_perfect(opp & ~flips, own | flips | (1 << sq)) == expected
+
+
+def test_endgame_move_is_legal(late_position):
+    state = late_position(3, 10)
+    move = endgame.endgame_move(state.board, state.player)
+    legal = game_logic.get_valid_moves(state.board, state.player)
+    assert (move is None and not legal) or move in legal
+
+
+def test_stop_event_cancels_a_solve(late_position):
+    # 18 empties take far longer than the test allows
+    state = late_position(1, 18)
+    stop = threading.Event()
+    threading.Timer(0.2, stop.set).start()
+    start = time.perf_counter()
+    with pytest.raises(search.SearchTimeout):
+        endgame.endgame_move(state.board, state.player, stop=stop)
+    assert time.perf_counter() - start < 2.0
@@ -0,0 +1,158 @@
+"""Checks that the bitboard backend agrees with the cell-by-cell rules."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import bitboard
+import game_logic
+import rl_agent
+
+
+def _reference_moves(board, player):
+    return [(x, y) for x in range(8) for y in range(8)
+            if board[x][y] == game_logic.EMPTY and game_logic._get_flips(board, player, x, y)]
+
+
+def _reference_apply(board, player, move):
+    x, y = move
+    new_board = [row[:] for row in board]
+    new_board[x][y] = player
+    for fx, fy in game_logic._get_flips(board, player, x, y):
+        new_board[fx][fy] = player
+    return new_board
+
+
+def _reference_count(board):
+    cells = [cell for row in board for cell in row]
+    return cells.count(game_logic.BLACK), cells.count(game_logic.WHITE)
+
+
+def _random_games(num_games, seed):
+    """Yield (board, player) for every position of random games."""
+    rng = random.Random(seed)
+    for _ in range(num_games):
+        board = game_logic.create_board()
+        player = game_logic.BLACK
+        passes = 0
+        while passes < 2:
+            yield board, player
+            moves = _reference_moves(board, player)
+            if moves:
+                board = _reference_apply(board, player, rng.choice(moves))
+                passes = 0
+            else:
+                passes += 1
+            player = -player
+
+
+def test_backends_agree_on_random_games():
+    for board, player in _random_games(60, seed=1234):
+        moves = _reference_moves(board, player)
+        assert game_logic.get_valid_moves(board, player) == moves
+        assert [(m, sorted(f)) for m, f in game_logic.iter_moves(board, player)] == [
+            (m, sorted(game_logic._get_flips(board, player, *m))) for m in moves]
+        assert game_logic.has_any_moves(board, player) == bool(moves)
+        assert game_logic.count_pieces(board) == _reference_count(board)
+        assert game_logic.is_terminal(board) == (
+            not moves and not _reference_moves(board, -player))
+        for move in moves:
+            assert game_logic.apply_move(board, player, move) == _reference_apply(board, player, move)
+
+
+def test_flips_match_reference_on_every_square():
+    for board, player in _random_games(10, seed=99):
+        own, opp = game_logic.to_bitboards(board, player)
+        for x in range(8):
+            for y in range(8):
+                expected = sum(1 << bitboard.square(fx, fy)
+                               for fx, fy in game_logic._get_flips(board, player, x, y))
+                assert bitboard.get_flips(own, opp, bitboard.square(x, y)) == expected
+
+
+def test_make_unmake_restores_board():
+    for board, player in _random_games(20, seed=42):
+        before = [row[:] for row in board]
+        for move in game_logic.get_valid_moves(board, player):
+            undo = game_logic.make_move(board, player, move)
+            assert board == _reference_apply(before, player, move)
+            game_logic.unmake_move(board, undo)
+            assert board == before
+
+
+def test_bitboard_round_trip():
+    for board, _ in _random_games(5, seed=7):
+        black, white = bitboard.from_board(board)
+        assert bitboard.to_board(black, white) == board
+
+
+def test_apply_move_rejects_invalid_move():
+    board = game_logic.create_board()
+    with pytest.raises(ValueError):
+        game_logic.apply_move(board, game_logic.BLACK, (0, 0))
+
+
+def test_game_state_tracks_end_of_game():
+    rng = random.Random(5)
+    for _ in range(30):
+        state = game_logic.GameState()
+        while not state.is_terminal():
+            assert not game_logic.is_terminal(state.board)
+            assert state.empties == sum(row.count(game_logic.EMPTY) for row in state.board)
+            moves = state.moves()
+            assert [m for m, _ in moves] == game_logic.get_valid_moves(state.board, state.player)
+            if moves:
+                state.play(rng.choice(moves)[0])
+            else:
+                state.pass_turn()
+        assert game_logic.is_terminal(state.board)
+        assert (state.black, state.white) == bitboard.from_board(state.board)
+
+
+def test_canonical_board_maps_moves_back():
+    rng = random.Random(8)
+    state = game_logic.GameState()
+    for _ in range(12):
+        state.play(rng.choice(state.moves())[0])
+    canonical, t = game_logic.canonical_board(state.board)
+    legal = game_logic.get_valid_moves(canonical, state.player)
+    assert sorted(game_logic.transform_move(m, t) for m in game_logic.get_valid_moves(state.board, state.player)) == legal
+    for move in legal:
+        assert game_logic.transform_move(game_logic.transform_move(move, bitboard.INVERSE[t]), t) == move
+
+
+def test_random_playout_matches_list_based_game():
+    for seed in range(10):
+        rng, ref = random.Random(seed), random.Random(seed)
+        state, other = game_logic.GameState(), game_logic.GameState()
+        while not state.is_terminal():
+            state.play_random(rng)
+            moves = other.moves()
+            if moves:
+                other.play(*ref.choice(moves))
+            else:
+                other.pass_turn()
+            assert state.board == other.board and state.key() == other.key()
+        black, white = game_logic.count_pieces(state.board)
+        assert bitboard.random_playout(*game_logic.GameState().key(), random.Random(seed)) == black - white
+
+
+def test_greedy_playout_matches_list_based_greedy_game():
+    # From the start and from positions after a few random plies
+    for seed in range(10):
+        rng = random.Random(seed)
+        state = game_logic.GameState()
+        for _ in range(seed):
+            state.play_random(rng)
+        start, player = state.key(), state.player
+        while not state.is_terminal():
+            moves = state.moves()
+            if moves:
+                state.play(rl_agent.greedy_opponent_move(state.board, state.player, moves))
+            else:
+                state.pass_turn()
+        black, white = game_logic.count_pieces(state.board)
+        expected = black - white if player == game_logic.BLACK else white - black
+        assert bitboard.greedy_playout(*start) == expected
@@ -0,0 +1,65 @@
+"""Checks the MCTS player: legal moves, tree reuse and small endgames."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import bitboard
+import endgame
+import game_logic
+import mcts
+
+
+def test_mcts_plays_legal_moves_and_reuses_its_tree():
+    player = mcts.MCTS(seed=0)
+    board = game_logic.create_board()
+    move = mcts.mcts_move(board, game_logic.BLACK, playouts=300, player_mcts=player)
+    assert move in game_logic.get_valid_moves(board, game_logic.BLACK)
+    after_black = game_logic.apply_move(board, game_logic.BLACK, move)
+    # White's reply is one already expanded below the move played
+    old_root = player.root
+    replies = old_root.children[bitboard.square(*move)].children
+    reply_sq = max(replies, key=lambda sq: replies[sq].visits)
+    subtree = replies[reply_sq]
+    visits = subtree.visits
+    after_white = game_logic.apply_move(after_black, game_logic.WHITE, bitboard.coords(reply_sq))
+    mcts.mcts_move(after_white, game_logic.BLACK, playouts=50, player_mcts=player)
+    assert player.root is subtree
+    assert visits > 0 and player.root.visits == visits + 50
+
+
+def test_mcts_finds_the_best_result_in_small_endgames(late_position):
+    solver = endgame.EndgameSolver()
+    for seed in range(6):
+        state = late_position(seed, 3)
+        own, opp = state.key()
+        if not bitboard.get_moves(own, opp):
+            continue
+        best = solver.solve(own, opp)
+        sq = mcts.MCTS(seed=seed).search(own, opp, playouts=600)
+        flips = bitboard.get_flips(own, opp, sq)
+        value = -solver.solve(opp & ~flips, own | flips | (1 << sq))
+        # Same outcome (win, draw or loss) as perfect play
+        assert (value > 0) - (value < 0) == (best > 0) - (best < 0)
+
+
+def test_stop_event_ends_unbounded_run():
+    player = mcts.MCTS(seed=3)
+    player.stop = threading.Event()
+    threading.Timer(0.2, player.stop.set).start()
+    start = time.perf_counter()
+    stats = player.run(*game_logic.GameState().key())
+    assert time.perf_counter() - start < 2.0
+    assert sum(n for n, _ in stats.values()) == player.root.visits > 0
+
+
+def test_search_without_playouts_returns_a_legal_move():
+    own, opp = game_logic.GameState().key()
+    lowest = min(bitboard.iter_squares(bitboard.get_moves(own, opp)))
+    assert mcts.MCTS(seed=1).search(own, opp, playouts=0) == lowest
+    assert mcts.MCTS(seed=1).search(own, opp, playouts=None, time_ms=0) == lowest
+    player = mcts.MCTS(seed=1)
+    player.stop = threading.Event()
+    player.stop.set()
+    assert player.search(own, opp, playouts=100) == lowest
@@ -0,0 +1,42 @@
+"""Checks the NumPy value network: gradients, lazy loading and drop-in use."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+import batch_env
+import bitboard
+import game_logic
+import mlp
+import rl_agent
+
+
+def test_train_step_reduces_loss():
+    net = mlp.MLPEvaluator.create(seed=0)
+    rng = np.random.default_rng(1)
+    x = (rng.random((64, 128)) < 0.3).astype(np.float32)
+    targets = rng.choice([-1.0, 1.0], size=64).astype(np.float32)
+    first = net.train_step(x, targets, 0.05)
+    for _ in range(50):
+        last = net.train_step(x, targets, 0.05)
+    assert last < first
+
+
+def test_lazy_load_and_batched_scores(tmp_path):
+    random.seed(3)
+    net = mlp.train_mlp(5, seed=3)
+    path = str(tmp_path / "net.npz")
+    net.save(path)
+    loaded = mlp.MLPEvaluator.load(path)
+    assert loaded._params is None
+    own, opp = game_logic.GameState().key()
+    moves = list(bitboard.iter_moves(own, opp))
+    values, _ = loaded.score_moves(own, opp, moves)
+    for (sq, flips), value in zip(moves, values):
+        assert abs(net.evaluate(own | flips | (1 << sq), opp & ~flips) - value) < 1e-5
+    board = game_logic.create_board()
+    move, _ = rl_agent.choose_action(board, game_logic.BLACK, loaded, 0.0)
+    assert move in game_logic.get_valid_moves(board, game_logic.BLACK)
+    assert batch_env.evaluate_against_random_batch(loaded, 8, seed=1)["games"] == 8
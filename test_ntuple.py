@@ -0,0 +1,52 @@
+"""Checks the n-tuple evaluator's incremental indices and its drop-in use."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+import bitboard
+import game_logic
+import ntuple
+import rl_agent
+import search
+
+
+def test_incremental_indices_match_recomputation():
+    evaluator = ntuple.NTupleEvaluator(np.random.default_rng(0).normal(size=ntuple.TABLE_SIZE))
+    rng = random.Random(1)
+    for _ in range(3):
+        state = game_logic.GameState()
+        while not state.is_terminal():
+            moves = state.moves()
+            if not moves:
+                state.pass_turn()
+                continue
+            own, opp = state.key()
+            bb_moves = list(bitboard.iter_moves(own, opp))
+            assert game_logic.to_bitboard_moves(moves) == bb_moves
+            values, indices = evaluator.score_moves(own, opp, bb_moves)
+            for (sq, flips), value, index in zip(bb_moves, values, indices):
+                after = (own | flips | (1 << sq), opp & ~flips)
+                assert (evaluator.indices(*after) == index).all()
+                assert abs(evaluator.evaluate(*after) - value) < 1e-9
+            # The waiting side's indices follow the move too
+            waiting = evaluator.indices(opp, own)
+            move, flips = rng.choice(moves)
+            state.play(move, flips)
+            assert (ntuple.after_opponent_move(waiting, move, flips) == evaluator.indices(*state.key())).all()
+
+
+def test_evaluator_is_a_drop_in_for_weights(tmp_path):
+    random.seed(2)
+    evaluator = ntuple.train_ntuple(20)
+    path = str(tmp_path / "tables.npz")
+    evaluator.save(path)
+    loaded = ntuple.NTupleEvaluator.load(path)
+    assert np.array_equal(loaded.weights, evaluator.weights)
+    board = game_logic.create_board()
+    legal = game_logic.get_valid_moves(board, game_logic.BLACK)
+    move, indices = rl_agent.choose_action(board, game_logic.BLACK, loaded, 0.0)
+    assert move in legal and indices.shape == (ntuple.NUM_INSTANCES,)
+    assert search.best_move(board, game_logic.BLACK, loaded, depth=2) in legal
@@ -0,0 +1,65 @@
+"""Checks the board symmetries and the opening-book file format."""
+
+from __future__ import annotations
+
+import pickle
+import random
+
+import bitboard
+import game_logic
+import opening_book
+
+
+def test_symmetries_match_square_maps():
+    rng = random.Random(0)
+    for _ in range(50):
+        bb = rng.getrandbits(64)
+        for t, image in enumerate(bitboard.symmetries(bb)):
+            expected = 0
+            for sq in bitboard.iter_squares(bb):
+                expected |= 1 << bitboard.SQUARE_MAPS[t][sq]
+            assert image == expected == bitboard.transform(bb, t)
+            assert bitboard.transform(image, bitboard.INVERSE[t]) == bb
+
+
+def test_canonical_is_shared_by_symmetric_positions():
+    rng = random.Random(1)
+    for _ in range(50):
+        own = rng.getrandbits(64)
+        opp = rng.getrandbits(64) & ~own
+        c_own, c_opp, t = bitboard.canonical(own, opp)
+        assert (bitboard.transform(own, t), bitboard.transform(opp, t)) == (c_own, c_opp)
+        for u in range(bitboard.SYMMETRIES):
+            assert bitboard.canonical(bitboard.transform(own, u), bitboard.transform(opp, u))[:2] == (c_own, c_opp)
+
+
+def _child(own, opp, sq):
+    flips = bitboard.get_flips(own, opp, sq)
+    assert flips
+    return bitboard.canonical(opp & ~flips, own | flips | (1 << sq))[:2]
+
+
+def test_book_round_trip(tmp_path):
+    weights = [0.4, 1.3, 0.8, 0.6]
+    book = opening_book.build_book(weights, num_games=60, max_plies=6, min_visits=2, seed=0)
+    assert book
+    path = str(tmp_path / "book.bin")
+    opening_book.write_book(path, book)
+    loaded = opening_book.OpeningBook(path)
+    assert len(loaded) == len(book)
+    for (own, opp), (sq, visits, score) in book.items():
+        # Any symmetric version of the position finds the same move, mapped
+        # back (up to the position's own symmetries)
+        for t in range(bitboard.SYMMETRIES):
+            t_own, t_opp = bitboard.transform(own, t), bitboard.transform(opp, t)
+            entry = loaded.lookup(t_own, t_opp)
+            assert entry is not None
+            assert _child(t_own, t_opp, entry[0]) == _child(own, opp, sq)
+            assert entry[1] == visits
+            assert abs(entry[2] - score) < 1e-6
+    board = game_logic.create_board()
+    move = loaded.probe(board, game_logic.BLACK)
+    assert move is None or move in game_logic.get_valid_moves(board, game_logic.BLACK)
+    assert loaded.lookup(0xFF, 0xFF00) is None
+    assert len(pickle.loads(pickle.dumps(loaded))) == len(book)
+    loaded.close()
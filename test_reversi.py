@@ -0,0 +1,48 @@
+"""Checks that the GUI module imports headless and its AI move entry point works."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import time
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import endgame
+import game_logic
+import reversi
+import search
+
+
+def test_import_has_no_side_effects(monkeypatch):
+    # Nothing is initialised or read until main() or the first AI move.
+    # Import a fresh copy: earlier tests may have loaded the AI into the shared one.
+    monkeypatch.delitem(sys.modules, "reversi")
+    initialised = pygame.get_init()
+    fresh = importlib.import_module("reversi")
+    assert fresh is not reversi
+    assert pygame.get_init() == initialised
+    assert fresh.AI_SEARCH is None and fresh.TRAINING_SUMMARY is None
+
+
+def test_get_move_pc_headless(monkeypatch):
+    monkeypatch.setattr(reversi, "TEMPO_IA", 0.05)
+    state = game_logic.GameState(player=game_logic.WHITE)
+    assert reversi.getMovePc(state) in dict(state.moves())
+    assert reversi.AI_SEARCH is not None
+
+
+def test_new_game_cancels_the_endgame_solve(late_position):
+    # The PC's move comes from the exact solver here; AI_PARAR ("Novo Jogo") stops it
+    state = late_position(1, endgame.ENDGAME_EMPTIES)
+    reversi.carregarIA()
+    reversi.AI_PARAR.set()
+    try:
+        start = time.perf_counter()
+        with pytest.raises(search.SearchTimeout):
+            reversi.getMovePc(state)
+        assert time.perf_counter() - start < 2.0
+    finally:
+        reversi.AI_PARAR.clear()
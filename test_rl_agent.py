@@ -0,0 +1,131 @@
+"""Checks for the agent's incremental feature computation and training modes."""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+import pytest
+
+import game_logic
+import rl_agent
+from replay import ReplayBuffer
+
+
+def _random_positions(num_games, seed):
+    """Yield (board, player) for every position of random games."""
+    rng = random.Random(seed)
+    for _ in range(num_games):
+        state = game_logic.GameState()
+        while not state.is_terminal():
+            yield state.board, state.player
+            moves = state.moves()
+            if moves:
+                state.play(*rng.choice(moves))
+            else:
+                state.pass_turn()
+
+
+def test_tracker_matches_compute_features():
+    for board, player in _random_positions(40, seed=2024):
+        tracker = rl_agent.FeatureTracker(board, player)
+        for move, flips in game_logic.iter_moves(board, player):
+            expected = rl_agent.compute_features(game_logic.apply_move(board, player, move), player)
+            assert tracker.features_after(move, flips) == expected
+            assert tracker.features_after(move) == expected
+
+
+def test_evaluate_move_leaves_board_untouched():
+    weights = [1.0, 0.5, 2.0, 0.25]
+    for board, player in _random_positions(5, seed=8):
+        before = [row[:] for row in board]
+        for move in game_logic.get_valid_moves(board, player):
+            score, features = rl_agent.evaluate_move(board, player, move, weights)
+            assert features == rl_agent.compute_features(game_logic.apply_move(board, player, move), player)
+            assert score == sum(w * f for w, f in zip(weights, features))
+        assert board == before
+
+
+def test_evaluate_move_rejects_illegal_moves():
+    weights = [1.0, 0.5, 2.0, 0.25]
+    board = game_logic.create_board()
+    player = game_logic.BLACK
+    # (0, 0) flips nothing and (3, 3) is occupied
+    for move in ((0, 0), (3, 3)):
+        with pytest.raises(ValueError):
+            game_logic.apply_move(board, player, move)
+        with pytest.raises(ValueError):
+            rl_agent.evaluate_move(board, player, move, weights)
+
+
+def test_cache_does_not_change_results():
+    weights = [0.4, 1.3, 0.8, 0.6]
+    for evaluate in (rl_agent.evaluate_against_random, rl_agent.evaluate_against_greedy):
+        for epsilon in (0.0, 0.2):
+            assert evaluate(weights, 15, epsilon, seed=3, cache_size=0) == \
+                evaluate(weights, 15, epsilon, seed=3, cache_size=50)
+
+
+def test_replay_buffer_wraps_around():
+    buffer = ReplayBuffer(capacity=5, num_features=2)
+    buffer.add_game([[1.0, 1.0], [2.0, 2.0], [3.0, 3.0]], 1.0, 0)
+    buffer.add_game([[4.0, 4.0], [5.0, 5.0], [6.0, 6.0]], -1.0, 1)
+    assert len(buffer) == 5
+    # The oldest position was overwritten by the newest one
+    assert sorted(buffer.features[:, 0].tolist()) == [2.0, 3.0, 4.0, 5.0, 6.0]
+    assert buffer.rewards.tolist() == [-1.0, 1.0, 1.0, -1.0, -1.0]
+    features, rewards, game_ids = buffer.sample(100, np.random.default_rng(0))
+    assert features.shape == (100, 2)
+    assert set(game_ids.tolist()) <= {0, 1}
+    assert np.all(rewards == np.where(game_ids == 0, 1.0, -1.0))
+
+
+def test_replay_training_is_reproducible():
+    first = rl_agent.train_agent_replay(20, batch_size=16, seed=4)
+    assert first == rl_agent.train_agent_replay(20, batch_size=16, seed=4)
+    assert any(w != 0.0 for w in first)
+
+
+def test_replay_game_ids_stay_unique_across_calls():
+    # As in train.py, one buffer is kept between training blocks
+    buffer = ReplayBuffer(capacity=10_000)
+    weights = rl_agent.train_agent_replay(6, buffer=buffer, seed=1)
+    rl_agent.train_agent_replay(6, buffer=buffer, seed=2, weights=weights)
+    assert buffer.games == 12
+    assert set(buffer.game_ids[:len(buffer)].tolist()) == set(range(12))
+
+
+def test_parallel_training_does_not_depend_on_worker_count():
+    first = rl_agent.train_agent_parallel(24, workers=1, sync_every=8, seed=6)
+    for workers in (2, 4):
+        assert rl_agent.train_agent_parallel(24, workers=workers, sync_every=8, seed=6) == first
+    assert any(w != 0.0 for w in first)
+
+
+def test_td_one_matches_monte_carlo_from_zero_weights():
+    # With zero weights every value is 0 until the final reward, so a TD(1)
+    # game applies exactly the Monte-Carlo update of play_game.
+    for seed in range(3):
+        random.seed(seed)
+        mc = [0.0, 0.0, 0.0, 0.0]
+        rl_agent.play_game(mc, 0.3, 0.05)
+        random.seed(seed)
+        td = [0.0, 0.0, 0.0, 0.0]
+        rl_agent.play_game_td(td, 0.3, 0.05, lam=1.0, gamma=1.0)
+        assert np.allclose(td, mc)
+
+
+def test_td_lambda_trace_and_bootstrapping_by_hand():
+    # alpha = 0.1, lam = 0.5, gamma = 0.9 on three afterstates, reward 1;
+    # every value is taken with the weights current at that step
+    weights = [0.2, 0.4]
+    learner = rl_agent.TDLambdaLearner(weights, alpha=0.1, lam=0.5, gamma=0.9)
+    learner.observe([1.0, 0.0])  # no earlier state to update, e = [1, 0]
+    assert weights == [0.2, 0.4]
+    learner.observe([1.0, 1.0])  # delta = 0.9 * 0.6 - 0.2 = 0.34, then e = [1.45, 1]
+    assert weights == pytest.approx([0.234, 0.4])
+    # V(s2) is now 0.634 (0.6 before the last update): delta = 0.9 * 0.4 - 0.634 = -0.274
+    learner.observe([0.0, 1.0])
+    assert weights == pytest.approx([0.19427, 0.3726])
+    learner.finish(1.0)  # delta = 1 - 0.3726 = 0.6274, e = [0.6525, 1.45]
+    assert weights == pytest.approx([0.23520785, 0.463573])
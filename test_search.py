@@ -0,0 +1,81 @@
+"""Checks the alpha-beta search against a plain minimax."""
+
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+
+import bitboard
+import game_logic
+import search
+from transposition import TranspositionCache
+
+WEIGHTS = [0.4, 1.3, 0.8, 0.6]
+
+
+def _minimax(searcher, own, opp, depth):
+    moves = bitboard.get_moves(own, opp)
+    if not moves:
+        if not bitboard.get_moves(opp, own):
+            return search.WIN_SCORE * (bitboard.popcount(own) - bitboard.popcount(opp))
+        return -_minimax(searcher, opp, own, depth)
+    if depth == 0:
+        return searcher.evaluate(own, opp)
+    best = -float("inf")
+    for sq, flips in bitboard.iter_moves(own, opp):
+        best = max(best, -_minimax(searcher, opp & ~flips, own | flips | (1 << sq), depth - 1))
+    return best
+
+
+def _positions(seed, every=9):
+    rng = random.Random(seed)
+    state = game_logic.GameState()
+    ply = 0
+    while not state.is_terminal():
+        moves = state.moves()
+        if moves and ply % every == 0:
+            yield state.key()
+        if moves:
+            state.play(*rng.choice(moves))
+        else:
+            state.pass_turn()
+        ply += 1
+
+
+def test_alpha_beta_matches_minimax():
+    searcher = search.AlphaBetaSearch(WEIGHTS)
+    for seed in range(4):
+        for own, opp in _positions(seed):
+            for depth in (1, 2, 3):
+                scored = searcher.search_root(own, opp, depth)
+                assert scored[0][1] == _minimax(searcher, own, opp, depth)
+
+
+def test_best_move_returns_legal_move():
+    board = game_logic.create_board()
+    legal = game_logic.get_valid_moves(board, game_logic.BLACK)
+    assert search.best_move(board, game_logic.BLACK, WEIGHTS, depth=3) in legal
+    assert search.best_move_timed(board, game_logic.BLACK, WEIGHTS, time_budget=0.2) in legal
+
+
+def test_timed_search_respects_budget_and_keeps_table():
+    searcher = search.AlphaBetaSearch(WEIGHTS, TranspositionCache(10_000))
+    for own, opp in _positions(11, every=15):
+        start = time.perf_counter()
+        sq = searcher.search_timed(own, opp, time_budget=0.1)
+        assert time.perf_counter() - start < 0.5
+        assert bitboard.get_moves(own, opp) >> sq & 1
+    assert len(searcher.tt) > 0
+
+
+def test_stop_event_cancels_unbounded_search():
+    searcher = search.AlphaBetaSearch(WEIGHTS, TranspositionCache(10_000))
+    searcher.stop = threading.Event()
+    threading.Timer(0.2, searcher.stop.set).start()
+    own, opp = game_logic.GameState().key()
+    start = time.perf_counter()
+    sq = searcher.search_timed(own, opp, time_budget=math.inf)
+    assert time.perf_counter() - start < 2.0
+    assert bitboard.get_moves(own, opp) >> sq & 1
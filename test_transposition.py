@@ -0,0 +1,51 @@
+"""Checks the LRU position cache and how the game loops use it."""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import rl_agent
+from transposition import TranspositionCache
+
+WEIGHTS = [0.4, 1.3, 0.8, 0.6]
+
+
+def test_lru_eviction_respects_capacity_and_recency():
+    cache = TranspositionCache(3)
+    for key in "abc":
+        cache.put(key, key.upper())
+    assert cache.get("a") == "A"  # "a" is now the most recent, "b" the oldest
+    cache.put("d", "D")
+    assert len(cache) == 3
+    assert "b" not in cache
+    assert all(key in cache for key in "acd")
+    cache.put("c", "C2")  # overwriting also marks the key recent
+    cache.put("e", "E")
+    assert len(cache) == 3
+    assert "a" not in cache and cache.get("c") == "C2"
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (2, 1)
+    with pytest.raises(ValueError):
+        TranspositionCache(0)
+
+
+class _RecordingCache(TranspositionCache):
+    def __init__(self, max_size):
+        super().__init__(max_size)
+        self.probes = []
+
+    def get(self, key):
+        self.probes.append(key)
+        return super().get(key)
+
+
+def test_game_loops_probe_each_position_once():
+    for play in (rl_agent.play_game_no_update, rl_agent.play_game_trajectory):
+        cache = _RecordingCache(1000)
+        random.seed(4)
+        play(WEIGHTS, epsilon=0.1, cache=cache)
+        assert cache.probes
+        assert all(a != b for a, b in zip(cache.probes, cache.probes[1:]))
+        assert cache.hits + cache.misses == len(cache.probes)
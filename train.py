@@ -1,28 +1,75 @@
-from rl_agent import train_agent, save_weights, evaluate_against_random, evaluate_against_greedy
+from rl_agent import train_agent, train_agent_parallel, train_agent_replay, train_agent_td, save_weights
+from replay import ReplayBuffer
+# Avaliação vetorizada (mesmos resultados que rl_agent.evaluate_against_*, muito mais rápida)
+from batch_env import evaluate_against_random_batch as evaluate_against_random
+from batch_env import evaluate_against_greedy_batch as evaluate_against_greedy
 import csv
 
 if __name__ == "__main__":
     TOTAL_GAMES = 4000
     CHECKPOINT = 250
     EVAL_GAMES = 2000
+    EVAL_WORKERS = 1  # processos para a avaliação (os resultados não dependem deste valor)
+    TRAIN_WORKERS = 1  # > 1 usa o modo actor/learner (train_agent_parallel)
+    SYNC_EVERY = 50    # jogos entre envios de pesos atualizados aos workers
+    # "mc": recompensa final aplicada a todo o jogo (play_game)
+    # "replay": atualizações em mini-batch a partir de um replay buffer
+    # "td": TD(lambda) com eligibility traces, atualização a cada jogada
+    TRAIN_MODE = "mc"
+    REPLAY_CAPACITY = 50000  # posições guardadas no replay buffer
+    TD_LAMBDA = 0.7
+    TD_GAMMA = 1.0
 
     # Baseline (sem treino)
     base_weights = [0.0, 0.0, 0.0, 0.0]
-    baseline_rand = evaluate_against_random(base_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0)
-    baseline_greedy = evaluate_against_greedy(base_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0)
+    baseline_rand = evaluate_against_random(base_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0, workers=EVAL_WORKERS)
+    baseline_greedy = evaluate_against_greedy(base_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0, workers=EVAL_WORKERS)
 
     print("Baseline vs Random:", baseline_rand)
     print("Baseline vs Greedy:", baseline_greedy)
 
     stats = []
     trained_weights = None
+    replay_buffer = ReplayBuffer(REPLAY_CAPACITY) if TRAIN_MODE == "replay" else None
     current_games = 0
 
     while current_games < TOTAL_GAMES:
         block = min(CHECKPOINT, TOTAL_GAMES - current_games)
 
         # Primeiro bloco cria pesos; os próximos continuam via play_game no rl_agent (como já tinhas)
-        if current_games == 0:
+        if TRAIN_MODE == "td":
+            trained_weights = train_agent_td(
+                num_games=block,
+                epsilon_start=1.0,
+                epsilon_end=0.1,
+                alpha=0.05,
+                lam=TD_LAMBDA,
+                gamma=TD_GAMMA,
+                weights=trained_weights
+            )
+        elif TRAIN_MODE == "replay":
+            # O buffer é mantido entre checkpoints, para reutilizar os jogos antigos
+            trained_weights = train_agent_replay(
+                num_games=block,
+                epsilon_start=1.0,
+                epsilon_end=0.1,
+                alpha=0.05,
+                buffer=replay_buffer,
+                workers=TRAIN_WORKERS,
+                sync_every=SYNC_EVERY,
+                weights=trained_weights
+            )
+        elif TRAIN_WORKERS > 1:
+            trained_weights = train_agent_parallel(
+                num_games=block,
+                epsilon_start=1.0,
+                epsilon_end=0.1,
+                alpha=0.05,
+                workers=TRAIN_WORKERS,
+                sync_every=SYNC_EVERY,
+                weights=trained_weights
+            )
+        elif current_games == 0:
             trained_weights = train_agent(
                 num_games=block,
                 epsilon_start=1.0,
@@ -39,8 +86,8 @@ if __name__ == "__main__":
         current_games += block
 
         # Avaliar SEM treino (epsilon=0) com 1000 jogos
-        ev_rand = evaluate_against_random(trained_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0)
-        ev_greedy = evaluate_against_greedy(trained_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0)
+        ev_rand = evaluate_against_random(trained_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0, workers=EVAL_WORKERS)
+        ev_greedy = evaluate_against_greedy(trained_weights, num_games=EVAL_GAMES, epsilon=0.0, seed=0, workers=EVAL_WORKERS)
 
         row = {
             "trained_games": current_games,
@@ -0,0 +1,81 @@
+"""
+Bounded position cache with least-recently-used eviction.
+
+Positions are keyed by the ``(own, opp)`` bitboard pair of the side to
+move (see :mod:`bitboard`). The pair is an exact, collision-free key
+that Python hashes in constant time, so no separate Zobrist hash is
+needed to index the table.
+
+The cache stores whatever the caller puts in it; :mod:`game_logic` and
+:mod:`rl_agent` store a :class:`CacheEntry` holding a position's legal
+moves and, once computed, the feature vector after each of them.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+
+
+class CacheEntry:
+    """Cached analysis of one position for the side to move.
+
+    ``moves`` is the ``(move, flips)`` list from
+    :func:`game_logic.iter_moves`; ``features`` is filled in lazily with
+    the feature vector after each move, in the same order.
+    """
+
+    __slots__ = ("moves", "features")
+
+    def __init__(self, moves: List[Tuple[Tuple[int, int], List[Tuple[int, int]]]]) -> None:
+        self.moves = moves
+        self.features: Optional[List[List[float]]] = None
+
+
+class TranspositionCache:
+    """Mapping with a maximum size that evicts the least recently used key.
+
+    ``hits`` and ``misses`` count the outcomes of :meth:`get`.
+    """
+
+    def __init__(self, max_size: int = 50_000) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key: Hashable) -> Any:
+        """Return the value stored for ``key`` (marking it recent), or None."""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store ``value`` for ``key``, evicting the oldest entry if full."""
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters."""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self) -> float:
+        """Return the fraction of lookups that were hits."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
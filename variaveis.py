@@ -4,14 +4,20 @@ WIN_ALTURA = 640 # Altura da janela em pixels
 TAMANHO_ESPACO = 50 # Largura e altura de cada espaço no quadro
 LARGURA_QUAD = 8 # Quantas linhas de espaços no tabuleiro
 ALTURA_QUAD = 8 # Quantas linhas de espaços no tabuleiro
-PECA_BRANCA = 'PECA_BRANCA'
-PECA_PRETA = 'PECA_PRETA'
-ESPACO_VAZIO = 'ESPACO_VAZIO'
-TELHA_DICAS = 'TELHA_DICAS'
-TELHA_DICAS = 'TELHA_DICAS'
+# Valores das casas do tabuleiro: os mesmos de game_logic (BLACK, WHITE, EMPTY)
+PECA_BRANCA = -1
+PECA_PRETA = 1
+ESPACO_VAZIO = 0
 ANIMACAO_SPEED = 25
 AUDIO_CLICKMOUSE = 'click.mp3'
 SOM_JOGO = 'beat.mp3'
+TEMPO_IA = 1.0 # Segundos de pesquisa por jogada do computador
+TAMANHO_TT = 200000 # Posições guardadas na tabela de transposição da IA
+LIVRO_ABERTURAS = 'opening_book.bin' # Livro de aberturas (python3 opening_book.py); opcional
+MOTOR_IA = 'alphabeta' # 'alphabeta' ou 'mcts'
+PROCESSOS_MCTS = 1 # Processos da pesquisa MCTS (use o nº de núcleos do CPU)
+PONDERAR = False # A IA continua a pensar durante a vez do jogador (ponderação)
+CACHE_IMAGENS = 'arquivos/cache' # Imagens de fundo já escaladas (refeitas se faltarem)
 
 
 XMARGEM = int((WIN_LARGURA - (LARGURA_QUAD * TAMANHO_ESPACO)) / 2)